@@ -0,0 +1,75 @@
+"""Chunking throughput of the index graph by worker process count.
+
+Splits a synthetic corpus with ``split_documents`` at increasing process
+counts and reports documents per second and speedup over a single process.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chunking
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from langchain_core.documents import Document
+
+from src.rag_agents.index_graph.chunking import split_documents
+
+
+def _corpus(n_docs, words_per_doc, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(5000)] + [",", ".", "(", ")"]
+    return [
+        Document(
+            page_content=" ".join(rng.choices(vocabulary, k=words_per_doc)),
+            metadata={"source_id": f"doc-{i}"},
+        )
+        for i in range(n_docs)
+    ]
+
+
+def main():
+    """Time chunking at each process count and write the table to stdout."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=4000)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--chunk-overlap", type=int, default=64)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, 8, 16, 32, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+
+    documents = _corpus(args.docs, args.words)
+    sys.stdout.write(
+        f"{args.docs} docs x {args.words} words, chunk {args.chunk_size}/"
+        f"{args.chunk_overlap}, {os.cpu_count()} CPUs\n"
+    )
+    sys.stdout.write(f"{'processes':>10}{'chunks':>10}{'docs/s':>12}{'speedup':>10}\n")
+    baseline = None
+    for processes in args.processes:
+        start = time.perf_counter()
+        chunks = sum(
+            1
+            for _ in split_documents(
+                documents,
+                chunk_size=args.chunk_size,
+                chunk_overlap=args.chunk_overlap,
+                processes=processes,
+            )
+        )
+        rate = args.docs / (time.perf_counter() - start)
+        baseline = baseline or rate
+        sys.stdout.write(
+            f"{processes:>10}{chunks:>10}{rate:>12.0f}{rate / baseline:>10.2f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
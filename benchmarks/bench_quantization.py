@@ -0,0 +1,102 @@
+"""Memory and recall@10 of the local vector index by storage mode.
+
+Indexes a clustered synthetic corpus at full precision, then with int8 and
+product-quantized codes whose float32 vectors live in a memory-mapped file.
+For each mode it reports resident vector memory, the compression ratio,
+recall@10 against exact search, query latency and whether recall stays
+within the tolerance. Quantized modes use the rescore depth picked by
+``tune_rescore`` on a separate set of tuning queries.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_quantization
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.shared_retrieval.local_index import LocalVectorIndex
+
+
+def _corpus(n_docs, dim, n_clusters=256, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.integers(n_clusters, size=n_docs)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n_docs, dim))
+    return vectors.astype(np.float32)
+
+
+def _build(vectors):
+    index = LocalVectorIndex()
+    ids = [str(i) for i in range(len(vectors))]
+    documents = [Document(page_content="", metadata={"uuid": i}) for i in ids]
+    index.add(ids, vectors, documents)
+    return index
+
+
+def _hits(index, queries, k):
+    return [
+        {document.metadata["uuid"] for document, _ in hits}
+        for hits in index.search(queries, k=k)
+    ]
+
+
+def main():
+    """Compare the memory and recall of each quantization mode on stdout."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    parser.add_argument("--pq-m", type=int, nargs="+", default=[192, 96])
+    args = parser.parse_args()
+
+    k = 10
+    vectors = _corpus(args.docs + 2 * args.queries, args.dim)
+    tuning = vectors[args.docs : args.docs + args.queries]
+    queries = vectors[args.docs + args.queries :]
+    vectors = vectors[: args.docs]
+
+    sys.stdout.write(
+        f"{args.docs} docs x {args.dim} dims, recall@{k}, tolerance {args.tolerance}\n"
+    )
+    sys.stdout.write(
+        f"{'mode':<10}{'MB':>9}{'ratio':>8}{'rescore':>9}{'recall':>9}"
+        f"{'ms/query':>10}{'ok':>5}\n"
+    )
+    index = _build(vectors)
+    full = index.nbytes
+    start = time.perf_counter()
+    truth = _hits(index, queries, k)
+    elapsed = (time.perf_counter() - start) / len(queries) * 1000
+    sys.stdout.write(
+        f"{'float32':<10}{full / 2**20:>9.1f}{1:>8.1f}{'-':>9}{1:>9.3f}"
+        f"{elapsed:>10.2f}\n"
+    )
+
+    modes = [("int8", None)] + [("pq", m) for m in args.pq_m]
+    with tempfile.TemporaryDirectory() as tmp:
+        for method, m in modes:
+            index = _build(vectors)
+            index.quantize(method, path=os.path.join(tmp, f"{method}{m}.f32"), m=m)
+            rescore, _ = index.tune_rescore(tuning, k=k, tolerance=args.tolerance)
+            start = time.perf_counter()
+            found = _hits(index, queries, k)
+            elapsed = (time.perf_counter() - start) / len(queries) * 1000
+            recall = np.mean([len(f & t) / k for f, t in zip(found, truth)])
+            name = method if m is None else f"pq m={m}"
+            sys.stdout.write(
+                f"{name:<10}{index.nbytes / 2**20:>9.1f}{full / index.nbytes:>8.1f}"
+                f"{rescore:>9}{recall:>9.3f}{elapsed:>10.2f}"
+                f"{'yes' if recall >= 1 - args.tolerance else 'no':>5}\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Checkpoint serializer cost: msgspec against the LangGraph default.
+
+Encodes and decodes realistic graph states with ``MsgspecSerializer`` and
+``JsonPlusSerializer`` and reports the time per round and the payload size.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.shared_utils.serialization import MsgspecSerializer
+
+
+@dataclass(kw_only=True)
+class EnrichmentState:
+    """Mirror of ``enrichment_agent.state.State``."""
+
+    topic: str
+    extraction_schema: Dict[str, Any]
+    info: Dict[str, Any] = field(default_factory=dict)
+    messages: List[AnyMessage] = field(default_factory=list)
+    loop_step: int = 0
+
+
+def _text(rng, words):
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choices(vocabulary, k=words))
+
+
+def _messages(rng, turns):
+    messages: List[AnyMessage] = [SystemMessage(content="You are a research agent.")]
+    for turn in range(turns):
+        call_id = f"call-{turn}"
+        messages += [
+            HumanMessage(content=_text(rng, 30), id=f"h{turn}"),
+            AIMessage(
+                content="",
+                id=f"a{turn}",
+                tool_calls=[
+                    {"name": "search", "args": {"query": _text(rng, 6)}, "id": call_id}
+                ],
+                response_metadata={
+                    "model_name": "gpt-4o",
+                    "finish_reason": "tool_calls",
+                },
+                usage_metadata={
+                    "input_tokens": 900,
+                    "output_tokens": 40,
+                    "total_tokens": 940,
+                },
+            ),
+            ToolMessage(content=_text(rng, 200), tool_call_id=call_id, id=f"t{turn}"),
+            AIMessage(content=_text(rng, 120), id=f"r{turn}"),
+        ]
+    return messages
+
+
+def _documents(rng, count):
+    return [
+        Document(
+            page_content=_text(rng, 250),
+            metadata={
+                "uuid": f"{i:032x}",
+                "source": f"docs/page-{i}.md",
+                "title": _text(rng, 5),
+                "score": rng.random(),
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def _states(turns, docs, seed=0):
+    rng = random.Random(seed)
+    messages = _messages(rng, turns)
+    return {
+        f"messages ({len(messages)})": messages,
+        f"documents ({docs})": _documents(rng, docs),
+        "enrichment state": EnrichmentState(
+            topic="LangGraph",
+            extraction_schema={
+                "type": "object",
+                "properties": {"x": {"type": "string"}},
+            },
+            info={"founded": 2023, "summary": _text(rng, 80)},
+            messages=messages,
+            loop_step=turns,
+        ),
+    }
+
+
+def _time(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    """Time both serializers on each state and write the table to stdout."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    serializers = {
+        "jsonplus": JsonPlusSerializer(),
+        "msgspec": MsgspecSerializer(),
+    }
+    sys.stdout.write(
+        f"{'state':<18}{'serializer':<11}{'encode ms':>11}{'decode ms':>11}"
+        f"{'bytes':>11}\n"
+    )
+    for name, state in _states(args.turns, args.docs).items():
+        for serde_name, serde in serializers.items():
+            payload = serde.dumps_typed(state)
+            encode = _time(lambda: serde.dumps_typed(state), args.rounds)
+            decode = _time(lambda: serde.loads_typed(payload), args.rounds)
+            sys.stdout.write(
+                f"{name:<18}{serde_name:<11}{encode:>11.2f}{decode:>11.2f}"
+                f"{len(payload[1]):>11}\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Worker startup time: mapping a snapshot versus rebuilding the indexes.
+
+Builds local vector and lexical indexes over a synthetic corpus, publishes a
+snapshot, then times how long a fresh worker process takes from start to its
+first vector and BM25 results, once rebuilding the indexes from the corpus and
+once mapping the snapshot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_snapshot
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.shared_retrieval.lexical_index import LocalLexicalIndex
+from src.shared_retrieval.local_index import LocalVectorIndex
+from src.shared_retrieval.snapshot import open_snapshot, write_snapshot
+
+_WORDS = np.array([f"term{i}" for i in range(20_000)])
+
+
+def build(n_docs, dim, seed=0):
+    """Return vector and lexical indexes over a synthetic corpus."""
+    rng = np.random.default_rng(seed)
+    ids = [f"doc-{i}" for i in range(n_docs)]
+    documents = [
+        Document(
+            page_content=" ".join(_WORDS[rng.integers(len(_WORDS), size=60)]),
+            metadata={"uuid": doc_id},
+        )
+        for doc_id in ids
+    ]
+    index = LocalVectorIndex()
+    index.add(ids, rng.normal(size=(n_docs, dim)).astype(np.float32), documents)
+    lexical = LocalLexicalIndex()
+    lexical.add(ids, documents)
+    return index, lexical
+
+
+def _worker(mode, n_docs, dim, path):
+    start = time.perf_counter()
+    if mode == "rebuild":
+        index, lexical = build(n_docs, dim)
+    else:
+        index, lexical, _ = open_snapshot(path)
+    index.search(np.ones(dim, dtype=np.float32), k=10)
+    lexical.search("term1 term2", k=10)
+    sys.stdout.write(f"{(time.perf_counter() - start) * 1000}\n")
+
+
+def main():
+    """Time a fresh worker rebuilding the indexes, then mapping the snapshot."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--worker", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker(args.worker[0], args.docs, args.dim, args.worker[1])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot")
+        index, lexical = build(args.docs, args.dim)
+        start = time.perf_counter()
+        write_snapshot(path, index, lexical)
+        sys.stdout.write(f"{args.docs} docs x {args.dim} dims\n")
+        sys.stdout.write(f"snapshot written in {time.perf_counter() - start:.2f} s\n")
+        for mode in ("rebuild", "snapshot"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_snapshot",
+                    f"--docs={args.docs}",
+                    f"--dim={args.dim}",
+                    "--worker",
+                    mode,
+                    path,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            sys.stdout.write(
+                f"{mode:<9} first results after {float(output):10.1f} ms\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Latency per k for the MongoDB and Pinecone retrievers against local stand-ins.
+
+Each stand-in sleeps for a simulated network round-trip, so the numbers show
+how query latency grows with k and how many round-trips a query costs with the
+retrievers' tuned cursor batch size versus the driver default.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_vector_search
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.shared_retrieval.mongodb_retriever import MongoRetriever
+from src.shared_retrieval.pinecone_retriever import PineconeRetriever
+from src.shared_retrieval.standins import LocalMongoCollection, LocalPineconeIndex
+
+
+class RandomEmbeddings:
+    """Returns random query vectors of a fixed dimensionality."""
+
+    def __init__(self, dim: int, seed: int = 0):
+        """Seed the generator of ``dim``-dimensional vectors."""
+        self.rng = np.random.default_rng(seed)
+        self.dim = dim
+
+    def embed_query(self, text):
+        """Return a random vector, whatever the text."""
+        return self.rng.normal(size=self.dim).tolist()
+
+    def embed_documents(self, texts):
+        """Return one random vector per text."""
+        return [self.embed_query(text) for text in texts]
+
+
+class DefaultBatchMongoRetriever(MongoRetriever):
+    """MongoRetriever that leaves the cursor batch size at the driver default."""
+
+    def _search(self, vector, k, filter=None):
+        cursor = self.collection.aggregate(self._build_pipeline(vector, k, filter))
+        return [self._to_document(record) for record in cursor]
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    """Time each backend at every ``k`` and write the table to stdout."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--ks", type=int, nargs="+", default=[4, 10, 50, 100, 200, 500])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(args.docs, args.dim)).astype(np.float32)
+    latency = args.latency_ms / 1000
+    embeddings = RandomEmbeddings(args.dim)
+
+    collection = LocalMongoCollection(round_trip_latency=latency)
+    collection.insert_many(
+        [
+            {"_id": i, "content": f"doc {i}", "title": f"t{i}", "embedding": v}
+            for i, v in enumerate(vectors)
+        ]
+    )
+    index = LocalPineconeIndex(round_trip_latency=latency)
+    index.upsert(
+        [(str(i), v, {"content": f"doc {i}"}) for i, v in enumerate(vectors)]
+    )
+
+    retrievers = {
+        "mongo (batchSize=k)": (
+            MongoRetriever(embeddings=embeddings, collection=collection),
+            collection,
+        ),
+        "mongo (default batch)": (
+            DefaultBatchMongoRetriever(embeddings=embeddings, collection=collection),
+            collection,
+        ),
+        "pinecone": (PineconeRetriever(embeddings=embeddings, index=index), index),
+    }
+
+    sys.stdout.write(
+        f"{args.docs} docs, dim {args.dim}, "
+        f"{args.latency_ms} ms simulated round-trip, mean of {args.repeat} queries\n"
+    )
+    sys.stdout.write(f"{'backend':<24}{'k':>6}{'ms/query':>12}{'round-trips':>14}\n")
+    for name, (retriever, backend) in retrievers.items():
+        for k in args.ks:
+            backend.round_trips = 0
+            ms = _time(lambda: retriever.get_relevant_documents("q", k=k), args.repeat)
+            trips = backend.round_trips / args.repeat
+            sys.stdout.write(f"{name:<24}{k:>6}{ms:>12.2f}{trips:>14.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
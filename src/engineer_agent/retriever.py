@@ -1,15 +1,20 @@
 from typing import Any, Dict, List
 
-from src.shared_retrieval.retriever_factory import create_retriever
+from src.shared_retrieval.registry import get_retriever
 
 
 class KnowledgeBaseRetriever:
     """Retriever for accessing knowledge base information."""
 
     def __init__(self, config: Dict[str, Any]):
-        """Initialize the retriever with configuration."""
-        self.retriever = create_retriever(config)
+        """Initialize the retriever with configuration.
+
+        The underlying retriever is shared across agents with the same config.
+        """
+        self.retriever = get_retriever(config)
 
     def retrieve(self, query: str) -> List[str]:
         """Retrieve relevant information from the knowledge base."""
-        return self.retriever.retrieve(query)
+        return [
+            doc.page_content for doc in self.retriever.get_relevant_documents(query)
+        ]
@@ -8,7 +8,7 @@ from langgraph.graph import StateGraph
 
 from src.enrichment_agent.configuration import EnrichmentAgentConfiguration
 from src.enrichment_agent.state import EnrichmentState
-from src.shared_retrieval.retriever_factory import create_retriever
+from src.shared_retrieval.registry import get_retriever, warmup_from_env
 from src.shared_utils.model_utils import load_chat_model
 
 
@@ -17,7 +17,7 @@ def create_agent(
 ) -> Runnable[EnrichmentState, List[BaseMessage]]:
     """Create the enrichment agent."""
     _ = load_chat_model(config.llm_model_name, temperature=config.llm_temperature)
-    _ = create_retriever(config.knowledge_base)
+    _ = get_retriever(config.knowledge_base)
     raise NotImplementedError
 
 
@@ -68,3 +68,6 @@ def create_graph() -> StateGraph:
 
 # Create and expose the graph
 graph = create_graph()
+
+# Open retriever connections at server startup when RETRIEVER_WARMUP is set.
+warmup_from_env()
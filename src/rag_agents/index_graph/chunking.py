@@ -0,0 +1,133 @@
+# src/rag_agents/index_graph/chunking.py
+"""Token-aware document chunking that runs in a process pool.
+
+Splitting is CPU-bound pure Python, so running it in the ingestion threads
+would hold the GIL and serialize the pipeline on one core. ``split_documents``
+ships batches of documents to worker processes instead and yields the chunks
+back in input order, keeping a bounded number of batches in flight so memory
+stays flat however long the input stream is.
+"""
+
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+from src.rag_agents.shared.text_splitting import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    Record,
+    check_sizes,
+    split_records,
+    split_text,
+)
+
+__all__ = [
+    "DEFAULT_CHUNK_OVERLAP",
+    "DEFAULT_CHUNK_SIZE",
+    "split_documents",
+    "split_text",
+]
+
+# Documents sent to a worker per task; amortizes pickling and scheduling.
+DEFAULT_TASK_SIZE = 64
+
+# Streams of at most this many documents are split in the calling thread:
+# starting the workers would take longer than splitting them.
+DEFAULT_POOL_THRESHOLD = 256
+
+
+def split_documents(
+    documents: Iterable[Document],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    encoding: Optional[str] = None,
+    processes: Optional[int] = None,
+    task_size: int = DEFAULT_TASK_SIZE,
+    id_key: str = "source_id",
+    pool_threshold: int = DEFAULT_POOL_THRESHOLD,
+) -> Iterator[Document]:
+    """Split a stream of documents into chunks using a process pool.
+
+    Each chunk carries its parent's metadata plus ``parent_uuid``,
+    ``chunk_index`` and its own ``uuid``, derived like ``reduce_docs`` ids
+    from an MD5 hash. Chunks are yielded in input order.
+
+    Args:
+        documents: Documents to split.
+        chunk_size: Maximum tokens per chunk.
+        chunk_overlap: Tokens shared by consecutive chunks.
+        encoding: Optional ``tiktoken`` encoding name; see ``split_text``.
+        processes: Worker processes; defaults to the CPU count. ``1`` splits
+            in the calling thread without a pool.
+        task_size: Documents per worker task.
+        id_key: Metadata key of the stable source id mixed into chunk ids;
+            the parent ``uuid`` is used when it is missing.
+        pool_threshold: Streams of at most this many documents are split in
+            the calling thread without starting a pool.
+    """
+    # Validate in the caller so bad settings fail fast, not inside a worker.
+    check_sizes(chunk_size, chunk_overlap)
+    options = (chunk_size, chunk_overlap, encoding, id_key)
+    processes = processes or os.cpu_count() or 1
+
+    def batches() -> Iterator[List[Record]]:
+        batch: List[Record] = []
+        for document in documents:
+            batch.append((document.page_content, document.metadata))
+            if len(batch) >= task_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def emit(results: List[List[Record]]) -> Iterator[Document]:
+        for chunks in results:
+            for text, metadata in chunks:
+                yield Document(page_content=text, metadata=metadata)
+
+    pending_batches = batches()
+    head: List[List[Record]] = []
+    if processes > 1:
+        # Read ahead until the stream is known to be worth a pool.
+        buffered = 0
+        for batch in pending_batches:
+            head.append(batch)
+            buffered += len(batch)
+            if buffered > pool_threshold:
+                break
+        else:
+            processes = 1
+    pending_batches = itertools.chain(head, pending_batches)
+
+    if processes == 1:
+        for batch in pending_batches:
+            yield from emit(split_records(batch, *options))
+        return
+
+    # The pool is started from an ingestion thread while other threads hold
+    # locks; forking such a process can deadlock the children, so workers
+    # start from a clean interpreter instead. They only import
+    # ``text_splitting``, not this package, whose ``__init__`` builds the
+    # graph.
+    start_method = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context(start_method)
+    ) as executor:
+        pending: Deque[Future] = deque()
+        for batch in pending_batches:
+            pending.append(executor.submit(split_records, batch, *options))
+            # Two tasks per worker keep every core busy without reading
+            # ahead of the consumer.
+            if len(pending) >= 2 * processes:
+                yield from emit(pending.popleft().result())
+        while pending:
+            yield from emit(pending.popleft().result())
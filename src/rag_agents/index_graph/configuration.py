@@ -3,13 +3,22 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Optional
 
-from shared.configuration import BaseConfiguration
+from src.rag_agents.index_graph.chunking import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+)
+from src.rag_agents.index_graph.dedup import DEFAULT_THRESHOLD
+from src.rag_agents.index_graph.ingest import DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_SIZE
+from src.rag_agents.index_graph.manifest import DEFAULT_SOURCE_ID_KEY
+from src.rag_agents.shared.configuration import BaseConfiguration
+from src.shared_retrieval.local_index import DEFAULT_INDEX_NAME
 
 # This file contains sample documents to index, based on the following LangChain and LangGraph documentation pages:
 # - https://python.langchain.com/v0.3/docs/concepts/
 # - https://langchain-ai.github.io/langgraph/concepts/low_level/
-DEFAULT_DOCS_FILE = "src/sample_docs.json"
+DEFAULT_DOCS_FILE = "src/rag_agents/sample_docs.json"
 
 
 @dataclass(kw_only=True)
@@ -23,6 +32,95 @@ class IndexConfiguration(BaseConfiguration):
     docs_file: str = field(
         default=DEFAULT_DOCS_FILE,
         metadata={
-            "description": "Path to a JSON file containing default documents to index."
+            "description": "Path to a JSON array or JSON Lines file containing default documents to index."
+        },
+    )
+
+    index_name: str = field(
+        default=DEFAULT_INDEX_NAME,
+        metadata={
+            "description": "Name of the index or collection the documents are written to."
+        },
+    )
+
+    manifest_path: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "SQLite manifest of previously indexed documents. When set, indexing the docs_file runs in delta mode: only new or changed documents are embedded and written, and documents that disappeared are deleted."
+        },
+    )
+
+    source_id_key: str = field(
+        default=DEFAULT_SOURCE_ID_KEY,
+        metadata={
+            "description": "Metadata key that identifies a document across versions in delta mode. Documents without it are identified by a hash of their content."
+        },
+    )
+
+    chunk_size: int = field(
+        default=DEFAULT_CHUNK_SIZE,
+        metadata={
+            "description": "Maximum tokens per indexed chunk. Set to 0 to index documents whole."
+        },
+    )
+
+    chunk_overlap: int = field(
+        default=DEFAULT_CHUNK_OVERLAP,
+        metadata={"description": "Tokens shared by consecutive chunks."},
+    )
+
+    chunk_encoding: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "tiktoken encoding used to count chunk tokens, e.g. 'cl100k_base'. By default words and punctuation marks are counted."
+        },
+    )
+
+    chunk_processes: int = field(
+        default=0,
+        metadata={
+            "description": "Worker processes used for chunking. 0 uses one per CPU core."
+        },
+    )
+
+    dedup_threshold: float = field(
+        default=DEFAULT_THRESHOLD,
+        metadata={
+            "description": "Estimated Jaccard similarity of word shingles at or above which a chunk is dropped as a near-duplicate of one already indexed in the same run. Set to 0 to keep near-duplicates."
+        },
+    )
+
+    dedup_report_path: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "JSON file receiving the clusters of near-duplicates collapsed during indexing."
+        },
+    )
+
+    snapshot_path: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "With the elastic-local providers, publish a memory-mapped snapshot of the local indexes here after indexing. Workers load it at startup from the LOCAL_INDEX_SNAPSHOT environment variable."
+        },
+    )
+
+    ingest_batch_size: int = field(
+        default=DEFAULT_BATCH_SIZE,
+        metadata={
+            "description": "Number of chunks embedded and written per batch during ingestion."
+        },
+    )
+
+    ingest_queue_size: int = field(
+        default=DEFAULT_QUEUE_SIZE,
+        metadata={
+            "description": "Number of batches buffered between ingestion stages. Bounds peak memory."
+        },
+    )
+
+    embed_workers: int = field(
+        default=1,
+        metadata={
+            "description": "Number of threads calling the embedding model concurrently during ingestion."
         },
     )
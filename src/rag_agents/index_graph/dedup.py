@@ -0,0 +1,271 @@
+# src/rag_agents/index_graph/dedup.py
+"""Index-time near-duplicate filtering with MinHash and LSH.
+
+``_generate_uuid`` only collapses byte-identical content. Versioned docs and
+mirrored READMEs differ by a few words, so they are caught here instead: each
+document is reduced to a MinHash signature of its word shingles, candidate
+matches are found through an LSH band index, and a candidate whose estimated
+Jaccard similarity reaches the threshold is dropped as a duplicate of the
+document kept first. Every collapse is recorded in a cluster report.
+
+A delta run only sees new and changed documents, so the signatures kept by
+earlier runs are ``preload``-ed from the manifest: a chunk is still dropped
+as a duplicate of an unchanged source that is skipped this run.
+"""
+
+import hashlib
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> List[str]:
+    """Return the distinct lowercase word ``size``-grams of a text.
+
+    Texts shorter than ``size`` words yield a single shingle of all words.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return list({" ".join(words[i : i + size]) for i in range(len(words) - size + 1)})
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Choose ``(bands, rows)`` with ``bands * rows <= num_perm`` for a threshold.
+
+    Minimizes the sum of the false positive and false negative probability
+    mass of the LSH S-curve around ``threshold``.
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        hit = 1.0 - (1.0 - grid**rows) ** bands
+        error = np.mean(np.where(grid < threshold, hit, 1.0 - hit))
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """Computes MinHash signatures with vectorized universal hashing."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        """Initialize ``num_perm`` random hash permutations."""
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """Return the ``uint32`` MinHash signature of a set of tokens."""
+        hashes = np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(token.encode(), digest_size=4).digest(), "little"
+                )
+                for token in tokens
+            ),
+            dtype=np.uint64,
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # uint64 products wrap around, which keeps the family universal
+        # enough for MinHash while staying fully vectorized.
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0).astype(np.uint32)
+
+
+class LSHIndex:
+    """Banded locality-sensitive hash index over MinHash signatures."""
+
+    def __init__(self, bands: int, rows: int):
+        """Initialize an empty index with ``bands`` bands of ``rows`` rows."""
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[bytes, List[str]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed signatures."""
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterator[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows].tobytes()
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        """Index a signature under ``key``."""
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def candidates(self, signature: np.ndarray) -> List[str]:
+        """Return the keys sharing at least one band with ``signature``."""
+        found: Dict[str, None] = {}
+        for band, band_key in self._band_keys(signature):
+            for key in self._buckets[band].get(band_key, ()):
+                found[key] = None
+        return list(found)
+
+    def similarity(self, key: str, signature: np.ndarray) -> float:
+        """Estimate the Jaccard similarity between ``key`` and ``signature``."""
+        return float(np.mean(self._signatures[key] == signature))
+
+
+@dataclass
+class DuplicateCluster:
+    """A kept document and the near-duplicates collapsed into it."""
+
+    kept: str
+    duplicates: List[Dict[str, object]] = field(default_factory=list)
+
+
+class NearDuplicateFilter:
+    """Drops documents that are near-duplicates of one already seen.
+
+    Use ``filter`` as a stage over a document stream; the first document of
+    each cluster is kept. It is not thread-safe, so give each stream its own
+    filter. The kept and preloaded signatures stay in memory for the whole
+    run (4 bytes per permutation per document).
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        """Initialize the filter.
+
+        Args:
+            threshold: Estimated Jaccard similarity of word shingles at or
+                above which a document counts as a duplicate.
+            num_perm: MinHash permutations; more is more accurate and slower.
+            shingle_size: Words per shingle.
+            seed: Seed of the hash permutations.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1].")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.index = LSHIndex(*optimal_bands(threshold, num_perm))
+        self.clusters: Dict[str, DuplicateCluster] = {}
+        self.kept = 0
+        self.dropped = 0
+        self._preloaded: Set[str] = set()
+        self._is_current: Callable[[str], bool] = lambda key: True
+
+    def preload(
+        self,
+        signatures: Iterable[Tuple[str, np.ndarray]],
+        is_current: Callable[[str], bool],
+    ) -> None:
+        """Index the signatures of documents kept by an earlier run.
+
+        Args:
+            signatures: ``(key, signature)`` pairs, e.g. from
+                ``IndexManifest.signatures``. Signatures computed with a
+                different number of permutations are ignored.
+            is_current: Whether a preloaded document is still indexed as it
+                was. It is asked when the document matches, so a match only
+                counts once its source is known to be unchanged.
+        """
+        for key, signature in signatures:
+            if len(signature) == self.hasher.num_perm:
+                self.index.add(key, signature)
+                self._preloaded.add(key)
+        self._is_current = is_current
+
+    def find_duplicate(self, document: Document) -> Tuple[Optional[str], np.ndarray]:
+        """Return the key of the best matching kept document and the signature."""
+        signature = self.hasher.signature(
+            shingles(document.page_content, self.shingle_size)
+        )
+        best, best_similarity = None, self.threshold
+        for key in self.index.candidates(signature):
+            if key in self._preloaded and not self._is_current(key):
+                continue
+            similarity = self.index.similarity(key, signature)
+            if similarity >= best_similarity:
+                best, best_similarity = key, similarity
+        return best, signature
+
+    def filter(
+        self,
+        documents: Iterable[Document],
+        on_drop: Optional[Callable[[Document], None]] = None,
+        on_keep: Optional[Callable[[Document, np.ndarray], None]] = None,
+    ) -> Iterator[Document]:
+        """Yield the documents that are not near-duplicates of earlier ones.
+
+        Args:
+            documents: The document stream.
+            on_drop: Called with every dropped document, e.g. so a manifest
+                does not count it as indexed.
+            on_keep: Called with every kept document and its signature, e.g.
+                so a manifest can ``preload`` it on the next run.
+        """
+        for document in documents:
+            key = str(document.metadata["uuid"])
+            duplicate_of, signature = self.find_duplicate(document)
+            if duplicate_of is None:
+                self.index.add(key, signature)
+                self._preloaded.discard(key)
+                self.kept += 1
+                if on_keep is not None:
+                    on_keep(document, signature)
+                yield document
+                continue
+            self.dropped += 1
+            if on_drop is not None:
+                on_drop(document)
+            cluster = self.clusters.setdefault(
+                duplicate_of, DuplicateCluster(kept=duplicate_of)
+            )
+            cluster.duplicates.append(
+                {
+                    "uuid": key,
+                    "source": document.metadata.get("source"),
+                    "similarity": round(
+                        self.index.similarity(duplicate_of, signature), 3
+                    ),
+                }
+            )
+
+    def report(self) -> Dict[str, object]:
+        """Summarize what was collapsed, largest clusters first."""
+        clusters = sorted(
+            self.clusters.values(), key=lambda c: len(c.duplicates), reverse=True
+        )
+        return {
+            "threshold": self.threshold,
+            "kept": self.kept,
+            "dropped": self.dropped,
+            "clusters": [
+                {"kept": cluster.kept, "duplicates": cluster.duplicates}
+                for cluster in clusters
+            ],
+        }
+
+    def write_report(self, path: str) -> None:
+        """Write ``report()`` to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
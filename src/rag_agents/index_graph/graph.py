@@ -1,66 +1,164 @@
 # src/rag_agents/index_graph/graph.py
-"""Graph definition for the indexing agent."""
-from typing import List
+"""Graph definition for the indexing agent.
 
-from langchain_core.messages import BaseMessage
-from langchain_core.runnables import Runnable
-from langgraph.graph import END, StateGraph
+The graph has a single node that streams documents through the ingestion
+pipeline in ``index_graph.ingest``: documents passed in the state are indexed
+as given, otherwise the configured ``docs_file`` is read incrementally. With a
+``manifest_path``, re-indexing the file only touches what changed.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+
+from src.rag_agents.index_graph.chunking import split_documents
 from src.rag_agents.index_graph.configuration import IndexConfiguration
+from src.rag_agents.index_graph.dedup import NearDuplicateFilter
+from src.rag_agents.index_graph.ingest import (
+    iter_json_records,
+    run_delta_pipeline,
+    run_pipeline,
+)
+from src.rag_agents.index_graph.manifest import IndexManifest
 from src.rag_agents.index_graph.state import IndexState
-from src.shared_retrieval.retriever_factory import create_retriever
-from src.shared_utils.model_utils import load_chat_model
+from src.rag_agents.index_graph.writers import LocalIndexWriter, create_writer
+from src.shared_retrieval.encoders import create_encoder
+from src.shared_retrieval.registry import warmup_from_env
+from src.shared_retrieval.snapshot import write_snapshot
 
+logger = logging.getLogger(__name__)
 
-def create_agent(
-    config: IndexConfiguration,
-) -> Runnable[IndexState, List[BaseMessage]]:
-    """Create the indexing agent."""
-    _ = load_chat_model(config.llm_model_name, temperature=config.llm_temperature)
-    _ = create_retriever(config.knowledge_base)
-    raise NotImplementedError
+# Retriever providers named differently in BaseConfiguration and the factory.
+_PROVIDER_TYPES = {"elastic": "elasticsearch"}
 
 
-def decide_if_add_knowledge(state: IndexState):
-    """Decide whether to add more knowledge."""
+def writer_config(configuration: IndexConfiguration) -> Dict[str, Any]:
+    """Return the retriever-factory config matching an index configuration."""
+    provider = configuration.retriever_provider
     return {
-        "get_relevant_knowledge": state.should_add_knowledge,
-        "END": not state.should_add_knowledge,
+        "type": _PROVIDER_TYPES.get(provider, provider),
+        "index_name": configuration.index_name,
     }
 
 
-def get_relevant_knowledge(state: IndexState):
-    """Get relevant knowledge based on the current state."""
-    raise NotImplementedError
-
-
-def generate_response(state: IndexState):
-    """Generate a response based on the current state."""
-    raise NotImplementedError
-
-
-def update_knowledge_base(state: IndexState):
-    """Update the knowledge base with new information."""
-    raise NotImplementedError
-
-
-def create_graph():
-    """Create the graph for the indexing agent."""
-    builder = StateGraph(IndexState)
-    builder.add_node("get_relevant_knowledge", get_relevant_knowledge)
-    builder.add_node("generate_response", generate_response)
-    builder.add_node("update_knowledge_base", update_knowledge_base)
-    builder.add_conditional_edges(
-        "get_relevant_knowledge",
-        {
-            "update_knowledge_base": lambda state: state.should_add_knowledge,
-            "generate_response": lambda state: not state.should_add_knowledge,
-        },
+def make_split(
+    configuration: IndexConfiguration,
+    dedup: Optional[NearDuplicateFilter],
+    manifest: Optional[IndexManifest] = None,
+) -> Optional[Callable[[Iterable[Document]], Iterator[Document]]]:
+    """Return the pipeline's split stage: chunking, then near-duplicate removal.
+
+    With a ``manifest``, the filter is preloaded with the signatures of the
+    chunks already indexed, and the chunks it keeps and drops are reported
+    back so the next delta run can do the same.
+    """
+    if not configuration.chunk_size and dedup is None:
+        return None
+
+    def split(documents: Iterable[Document]) -> Iterator[Document]:
+        if configuration.chunk_size:
+            documents = split_documents(
+                documents,
+                chunk_size=configuration.chunk_size,
+                chunk_overlap=configuration.chunk_overlap,
+                encoding=configuration.chunk_encoding,
+                processes=configuration.chunk_processes or None,
+                id_key=configuration.source_id_key,
+            )
+        if dedup is not None and manifest is not None:
+            dedup.preload(manifest.signatures(), manifest.is_unchanged)
+            documents = dedup.filter(
+                documents,
+                on_drop=manifest.record_dropped,
+                on_keep=manifest.record_signature,
+            )
+        elif dedup is not None:
+            documents = dedup.filter(documents)
+        yield from documents
+
+    return split
+
+
+def index_docs(
+    state: IndexState, *, config: Optional[RunnableConfig] = None
+) -> Dict[str, str]:
+    """Embed and write documents to the configured retriever backend.
+
+    Documents in the state are indexed directly. When there are none, the
+    configured ``docs_file`` is streamed instead of loaded into memory, in
+    delta mode if a ``manifest_path`` is configured. Unless ``chunk_size`` is
+    0, documents are split into token-bounded chunks in a process pool on the
+    way, and near-duplicate chunks are dropped unless ``dedup_threshold`` is
+    0. With a ``snapshot_path``, the local indexes are snapshotted at the
+    end. The indexed documents are cleared from the state afterwards.
+    """
+    configuration = IndexConfiguration.from_runnable_config(config)
+    embeddings = create_encoder(configuration.embedding_model)
+    writer = create_writer(writer_config(configuration))
+    options = {
+        "batch_size": configuration.ingest_batch_size,
+        "queue_size": configuration.ingest_queue_size,
+        "embed_workers": configuration.embed_workers,
+    }
+    dedup = (
+        NearDuplicateFilter(configuration.dedup_threshold)
+        if configuration.dedup_threshold
+        else None
     )
-    builder.add_edge("update_knowledge_base", "generate_response")
-    builder.add_edge("generate_response", END)
-    builder.set_entry_point("get_relevant_knowledge")
+    if state.docs:
+        options["split"] = make_split(configuration, dedup)
+        run_pipeline(state.docs, embeddings, writer, **options)
+    elif configuration.manifest_path:
+        manifest = IndexManifest(
+            configuration.manifest_path, source_id_key=configuration.source_id_key
+        )
+        options["split"] = make_split(configuration, dedup, manifest)
+        try:
+            run_delta_pipeline(
+                iter_json_records(configuration.docs_file),
+                embeddings,
+                writer,
+                manifest,
+                **options,
+            )
+        finally:
+            manifest.close()
+    else:
+        options["split"] = make_split(configuration, dedup)
+        run_pipeline(
+            iter_json_records(configuration.docs_file), embeddings, writer, **options
+        )
+    if dedup is not None:
+        logger.info(
+            "Dropped %d near-duplicate chunks in %d clusters",
+            dedup.dropped,
+            len(dedup.clusters),
+        )
+        if configuration.dedup_report_path:
+            dedup.write_report(configuration.dedup_report_path)
+    if configuration.snapshot_path and isinstance(writer, LocalIndexWriter):
+        write_snapshot(
+            configuration.snapshot_path,
+            writer.index,
+            writer.lexical_index,
+            name=configuration.index_name,
+        )
+    return {"docs": "delete"}
+
+
+def create_graph() -> StateGraph:
+    """Create the graph for the indexing agent."""
+    builder = StateGraph(IndexState, config_schema=IndexConfiguration)
+    builder.add_node("index_docs", index_docs)
+    builder.add_edge(START, "index_docs")
+    builder.add_edge("index_docs", END)
     return builder
 
 
-graph = create_graph()
+graph = create_graph().compile()
+graph.name = "IndexGraph"
+
+# Open retriever connections at server startup when RETRIEVER_WARMUP is set.
+warmup_from_env()
@@ -0,0 +1,323 @@
+# src/rag_agents/index_graph/ingest.py
+"""Streaming ingestion pipeline for the index graph.
+
+Documents flow through four stages that run concurrently in their own
+threads: read, split, embed and write. Adjacent stages are connected by
+bounded queues, so a slow stage (usually the embedding model or the backend)
+applies backpressure upstream instead of letting batches pile up in memory.
+Input files are parsed incrementally, so peak memory depends on the batch size
+and queue depth, never on the size of the corpus.
+"""
+
+import itertools
+import json
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.rag_agents.index_graph.manifest import IndexManifest
+from src.rag_agents.shared.state import _generate_uuid
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the input file per refill of the parse buffer.
+READ_CHUNK_SIZE = 1 << 16
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+def iter_json_records(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the records of a JSON array file or a JSON Lines file one by one.
+
+    A file whose first non-blank character is ``[`` is read as a single JSON
+    array; anything else is read as JSON Lines. Array elements are decoded
+    with ``JSONDecoder.raw_decode`` from a sliding buffer, so only the
+    element being decoded is held in memory.
+    """
+    with open(path, encoding="utf-8") as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            yield from _iter_json_lines(buffer, f)
+            return
+        yield from _iter_json_array(buffer[1:], f, chunk_size)
+
+
+def _iter_json_lines(head: str, f: Any) -> Iterator[Any]:
+    # Complete the last, possibly partial, line of the head before iterating.
+    for line in itertools.chain((head + f.readline()).splitlines(), f):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json_array(buffer: str, f: Any, chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    eof = False
+    pos = 0
+    while True:
+        # Skip whitespace and the separator before the next element.
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array.")
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+            # A value ending exactly at the buffer edge may be a truncated
+            # number or literal; only trust it once more input is known.
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield record
+            pos = end
+            continue
+        more = f.read(chunk_size)
+        eof = not more
+        buffer, pos = buffer[pos:] + more, 0
+
+
+def to_document(record: Union[str, Dict[str, Any], Document]) -> Document:
+    """Convert a parsed record into a Document with a ``uuid`` in its metadata.
+
+    Records follow the same shapes ``reduce_docs`` accepts: plain strings,
+    ``{"page_content": ..., "metadata": ...}`` dicts and Documents.
+    """
+    if isinstance(record, str):
+        record = Document(page_content=record)
+    elif isinstance(record, dict):
+        record = Document(
+            page_content=record.get("page_content", ""),
+            metadata=dict(record.get("metadata") or {}),
+        )
+    if not record.metadata.get("uuid"):
+        record.metadata["uuid"] = _generate_uuid(record.page_content)
+    return record
+
+
+@dataclass
+class IngestStats:
+    """Counters reported by ``run_pipeline``."""
+
+    documents: int = 0
+    chunks: int = 0
+    batches: int = 0
+    written: int = 0
+    skipped: int = 0
+    deleted: int = 0
+
+
+class _Aborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class _Stage(threading.Thread):
+    """Worker thread that stops the whole pipeline if it fails."""
+
+    def __init__(self, name: str, target: Callable[[], None], failed: threading.Event):
+        super().__init__(name=f"ingest-{name}", daemon=True)
+        self._target_fn = target
+        self._failed = failed
+        self.error: Optional[Exception] = None
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except Exception as e:
+            self.error = e
+            self._failed.set()
+
+
+def _put(q: "queue.Queue[Any]", item: Any, failed: threading.Event) -> None:
+    # Block for backpressure, but give up as soon as another stage failed.
+    while not failed.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise _Aborted
+
+
+def _get(q: "queue.Queue[Any]", failed: threading.Event) -> Any:
+    while not failed.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    raise _Aborted
+
+
+def run_pipeline(
+    records: Iterable[Union[str, Dict[str, Any], Document]],
+    embeddings: Embeddings,
+    writer: Any,
+    split: Optional[Callable[[Iterable[Document]], Iterable[Document]]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    embed_workers: int = 1,
+) -> IngestStats:
+    """Stream records through split, embed and write stages.
+
+    Args:
+        records: Source records, typically from ``iter_json_records``.
+        embeddings: Embeds each batch of chunk texts.
+        writer: Receives ``write(documents, vectors)`` calls, one per batch.
+        split: Maps a stream of documents to a stream of chunks. By default
+            documents are indexed whole.
+        batch_size: Chunks per embedding call and per write.
+        queue_size: Batches buffered between adjacent stages.
+        embed_workers: Threads calling the embedding model concurrently.
+
+    Returns:
+        Counts of documents read, chunks produced, batches and rows written.
+
+    Raises:
+        Exception: The first error raised by any stage, after all stages
+            have stopped.
+    """
+    stats = IngestStats()
+    failed = threading.Event()
+    documents: queue.Queue[Any] = queue.Queue(maxsize=queue_size * batch_size)
+    chunk_batches: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+    embedded: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+
+    def read() -> None:
+        for record in records:
+            _put(documents, to_document(record), failed)
+            stats.documents += 1
+        _put(documents, _DONE, failed)
+
+    def drain_documents() -> Iterator[Document]:
+        while (document := _get(documents, failed)) is not _DONE:
+            yield document
+
+    def split_stage() -> None:
+        chunks = split(drain_documents()) if split else drain_documents()
+        batch: List[Document] = []
+        for chunk in chunks:
+            batch.append(chunk)
+            stats.chunks += 1
+            if len(batch) >= batch_size:
+                _put(chunk_batches, batch, failed)
+                batch = []
+        if batch:
+            _put(chunk_batches, batch, failed)
+        for _ in range(embed_workers):
+            _put(chunk_batches, _DONE, failed)
+
+    def embed() -> None:
+        while (batch := _get(chunk_batches, failed)) is not _DONE:
+            vectors = embeddings.embed_documents([doc.page_content for doc in batch])
+            _put(embedded, (batch, vectors), failed)
+        _put(embedded, _DONE, failed)
+
+    def write() -> None:
+        remaining = embed_workers
+        while remaining:
+            item = _get(embedded, failed)
+            if item is _DONE:
+                remaining -= 1
+                continue
+            batch, vectors = item
+            writer.write(batch, vectors)
+            stats.batches += 1
+            stats.written += len(batch)
+
+    stages = [
+        _Stage("read", read, failed),
+        _Stage("split", split_stage, failed),
+        *(_Stage(f"embed-{i}", embed, failed) for i in range(embed_workers)),
+        _Stage("write", write, failed),
+    ]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+
+    errors = [
+        stage.error
+        for stage in stages
+        if stage.error is not None and not isinstance(stage.error, _Aborted)
+    ]
+    if errors:
+        raise errors[0]
+    logger.info(
+        "Indexed %d documents as %d chunks in %d batches",
+        stats.documents,
+        stats.chunks,
+        stats.batches,
+    )
+    return stats
+
+
+class _RecordingWriter:
+    """Passes batches to a writer and records them in a manifest."""
+
+    def __init__(self, writer: Any, manifest: IndexManifest):
+        self.writer = writer
+        self.manifest = manifest
+
+    def write(self, documents: List[Document], vectors: List[List[float]]) -> None:
+        self.writer.write(documents, vectors)
+        self.manifest.record(documents)
+
+
+def run_delta_pipeline(
+    records: Iterable[Union[str, Dict[str, Any], Document]],
+    embeddings: Embeddings,
+    writer: Any,
+    manifest: IndexManifest,
+    delete_batch_size: int = DEFAULT_BATCH_SIZE,
+    **kwargs: Any,
+) -> IngestStats:
+    """Re-index only what changed since the last run recorded in ``manifest``.
+
+    Documents whose content hash matches the manifest are skipped before they
+    are split or embedded. New and changed documents go through
+    ``run_pipeline``; afterwards, chunks of changed documents that were not
+    rewritten and chunks of documents missing from ``records`` are deleted
+    with ``writer.delete``. The manifest is committed once the deletes have
+    succeeded.
+
+    Args:
+        records: The complete current corpus.
+        embeddings: Embeds each batch of chunk texts.
+        writer: Provides ``write(documents, vectors)`` and ``delete(ids)``.
+        manifest: Manifest of the previous run; updated in place.
+        delete_batch_size: Ids per ``writer.delete`` call.
+        **kwargs: Passed on to ``run_pipeline``.
+    """
+    changed = manifest.diff(to_document(record) for record in records)
+    stats = run_pipeline(
+        changed, embeddings, _RecordingWriter(writer, manifest), **kwargs
+    )
+    stats.skipped = manifest.skipped
+    # Commit only after the deletes succeed, so the manifest keeps listing
+    # the stale chunks and the next run retries them if a delete fails.
+    stale = manifest.stale()
+    for start in range(0, len(stale), delete_batch_size):
+        writer.delete(stale[start : start + delete_batch_size])
+    manifest.finish()
+    stats.deleted = len(stale)
+    logger.info(
+        "Delta run skipped %d unchanged documents and deleted %d chunks",
+        stats.skipped,
+        stats.deleted,
+    )
+    return stats
@@ -0,0 +1,258 @@
+# src/rag_agents/index_graph/manifest.py
+"""Manifest of indexed sources for incremental re-indexing.
+
+The manifest remembers, for every source document, a hash of its content and
+the ids of the chunks it was written as. A delta run compares each incoming
+document against it: unchanged documents are skipped before they reach the
+embedding model, new and changed ones are re-indexed, and the chunks of
+changed or vanished sources that were not rewritten are returned for
+deletion. A source with chunks dropped as near-duplicates is recorded without
+a hash: its index content depends on other sources, so it is re-diffed as
+changed on every run until all its chunks are written.
+
+The MinHash signatures of the written chunks are kept too, so a delta run's
+``NearDuplicateFilter`` can ``preload`` them and still drop duplicates of
+unchanged sources it never sees. State lives in SQLite, so the bookkeeping
+for a run does not grow process memory with the size of the corpus.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+DEFAULT_SOURCE_ID_KEY = "source_id"
+
+
+def content_hash(document: Document) -> str:
+    """Return an MD5 hash of a document's content and metadata."""
+    metadata = {k: v for k, v in document.metadata.items() if k != "uuid"}
+    payload = json.dumps(
+        {"page_content": document.page_content, "metadata": metadata},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+class IndexManifest:
+    """SQLite-backed map of source id to content hash and chunk ids.
+
+    A run calls ``diff`` on the incoming documents and ``record`` for every
+    batch of chunks written. Once everything has been written, it deletes the
+    ``stale`` chunks and calls ``finish``. If a run fails before ``finish``,
+    the stored hashes are left untouched and the next run re-indexes the same
+    documents and deletes the same stale chunks. With near-duplicate filtering,
+    ``record_dropped`` and ``record_signature`` are called by the filter.
+    """
+
+    def __init__(
+        self, path: str = ":memory:", source_id_key: str = DEFAULT_SOURCE_ID_KEY
+    ):
+        """Open (or create) the manifest.
+
+        Args:
+            path: SQLite file holding the manifest.
+            source_id_key: Metadata key identifying a source across versions.
+                Documents without it are identified by their ``uuid``, so an
+                edit shows up as one new and one removed source.
+        """
+        self.source_id_key = source_id_key
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources "
+                "(source_id TEXT PRIMARY KEY, content_hash TEXT, chunk_ids TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS signatures "
+                "(chunk_id TEXT PRIMARY KEY, source_id TEXT, signature BLOB)"
+            )
+            self._conn.execute(
+                "CREATE TEMP TABLE run_seen "
+                "(source_id TEXT PRIMARY KEY, content_hash TEXT, changed INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE TEMP TABLE run_written (source_id TEXT, chunk_id TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX temp.run_written_source ON run_written (source_id)"
+            )
+            self._conn.execute(
+                "CREATE TEMP TABLE run_dropped (source_id TEXT PRIMARY KEY)"
+            )
+            self._conn.execute(
+                "CREATE TEMP TABLE run_signatures "
+                "(chunk_id TEXT PRIMARY KEY, source_id TEXT, signature BLOB)"
+            )
+
+    def __len__(self) -> int:
+        """Return the number of sources in the manifest."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+    def source_id(self, document: Document) -> str:
+        """Return the id identifying a document's source."""
+        return str(
+            document.metadata.get(self.source_id_key) or document.metadata["uuid"]
+        )
+
+    def diff(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Yield the documents that are new or changed since the last run.
+
+        Each yielded document gets its source id in ``metadata`` under
+        ``source_id_key``, so the chunks split from it can be attributed back.
+        """
+        self.skipped = 0
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM run_seen")
+            self._conn.execute("DELETE FROM run_written")
+            self._conn.execute("DELETE FROM run_dropped")
+            self._conn.execute("DELETE FROM run_signatures")
+        for document in documents:
+            source_id = self.source_id(document)
+            digest = content_hash(document)
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT content_hash FROM sources WHERE source_id = ?", (source_id,)
+                ).fetchone()
+                changed = row is None or row[0] != digest
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO run_seen VALUES (?, ?, ?)",
+                    (source_id, digest, int(changed)),
+                )
+            if not changed:
+                self.skipped += 1
+                continue
+            document.metadata[self.source_id_key] = source_id
+            yield document
+
+    def record(self, chunks: Sequence[Document]) -> None:
+        """Record chunks that have been written to the backend."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO run_written VALUES (?, ?)",
+                [
+                    (str(chunk.metadata[self.source_id_key]), chunk.metadata["uuid"])
+                    for chunk in chunks
+                ],
+            )
+
+    def record_dropped(self, chunk: Document) -> None:
+        """Record a chunk that was dropped as a near-duplicate, not written."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO run_dropped VALUES (?)",
+                (str(chunk.metadata[self.source_id_key]),),
+            )
+
+    def record_signature(self, chunk: Document, signature: np.ndarray) -> None:
+        """Record the MinHash signature of a chunk the dedup filter kept.
+
+        It is stored by ``finish`` once the chunk has been written.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO run_signatures VALUES (?, ?, ?)",
+                (
+                    chunk.metadata["uuid"],
+                    str(chunk.metadata[self.source_id_key]),
+                    signature.astype(np.uint32).tobytes(),
+                ),
+            )
+
+    def signatures(self) -> List[Tuple[str, np.ndarray]]:
+        """Return the chunk ids and MinHash signatures stored by earlier runs."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id, signature FROM signatures"
+            ).fetchall()
+        return [(chunk_id, np.frombuffer(blob, np.uint32)) for chunk_id, blob in rows]
+
+    def is_unchanged(self, chunk_id: str) -> bool:
+        """Return whether a stored chunk's source was seen unchanged this run.
+
+        Sources the current ``diff`` has not reached yet count as changed.
+        """
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM signatures g "
+                    "JOIN run_seen s ON s.source_id = g.source_id "
+                    "WHERE g.chunk_id = ? AND s.changed = 0",
+                    (chunk_id,),
+                ).fetchone()
+                is not None
+            )
+
+    def _stale(self) -> List[str]:
+        # Set-based statements keep a full first run out of Python memory.
+        return [
+            chunk_id
+            for (chunk_id,) in self._conn.execute(
+                "SELECT value FROM ("
+                "SELECT j.value FROM sources m, json_each(m.chunk_ids) j "
+                "WHERE m.source_id NOT IN (SELECT source_id FROM run_seen) "
+                "UNION "
+                "SELECT j.value FROM run_seen s "
+                "JOIN sources m ON m.source_id = s.source_id, "
+                "json_each(m.chunk_ids) j WHERE s.changed = 1"
+                ") WHERE value NOT IN (SELECT chunk_id FROM run_written)"
+            )
+        ]
+
+    def stale(self) -> List[str]:
+        """Return the chunk ids the run makes obsolete, without committing it.
+
+        These are the chunks of sources missing from this run and the chunks
+        of changed sources that were not written again. Delete them from the
+        backend before calling ``finish``: until then the manifest still
+        lists them, so a failed delete is retried by the next run.
+        """
+        with self._lock:
+            return self._stale()
+
+    def finish(self) -> List[str]:
+        """Commit the run and return the chunk ids that are now stale.
+
+        See ``stale``; after ``finish`` the manifest no longer lists them.
+        """
+        with self._lock, self._conn:
+            stale = self._stale()
+            self._conn.execute(
+                "DELETE FROM sources "
+                "WHERE source_id NOT IN (SELECT source_id FROM run_seen)"
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources "
+                "SELECT s.source_id, CASE WHEN s.source_id IN "
+                "(SELECT source_id FROM run_dropped) THEN NULL "
+                "ELSE s.content_hash END, "
+                "(SELECT json_group_array(DISTINCT w.chunk_id) FROM run_written w "
+                "WHERE w.source_id = s.source_id) "
+                "FROM run_seen s WHERE s.changed = 1"
+            )
+            self._conn.execute(
+                "DELETE FROM signatures WHERE source_id NOT IN "
+                "(SELECT source_id FROM run_seen WHERE changed = 0)"
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures SELECT * FROM run_signatures "
+                "WHERE chunk_id IN (SELECT chunk_id FROM run_written)"
+            )
+            self._conn.execute("DELETE FROM run_seen")
+            self._conn.execute("DELETE FROM run_written")
+            self._conn.execute("DELETE FROM run_dropped")
+            self._conn.execute("DELETE FROM run_signatures")
+        return stale
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
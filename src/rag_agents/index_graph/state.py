@@ -4,7 +4,8 @@ from dataclasses import dataclass
 from typing import Annotated
 
 from langchain_core.documents import Document
-from shared.state import reduce_docs
+
+from src.rag_agents.shared.state import reduce_docs
 
 
 # The index state defines the simple IO for the single-node index graph
@@ -0,0 +1,133 @@
+"""Tests for token-aware, multi-process chunking."""
+
+import subprocess
+import sys
+
+import pytest
+from langchain_core.documents import Document
+
+from src.shared_retrieval.encoders import HashingEncoder
+from src.shared_retrieval.local_index import LocalVectorIndex
+
+from . import chunking
+from .chunking import split_documents, split_text
+from .ingest import run_delta_pipeline
+from .manifest import IndexManifest
+from .writers import LocalIndexWriter
+
+
+def _words(n, prefix="w"):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_split_text_windows_with_overlap():
+    chunks = split_text(_words(25), chunk_size=10, chunk_overlap=3)
+
+    assert [chunk.split()[0] for chunk in chunks] == ["w0", "w7", "w14", "w21"]
+    assert all(len(chunk.split()) <= 10 for chunk in chunks)
+    assert chunks[0].split()[-3:] == chunks[1].split()[:3]
+    assert chunks[-1].split()[-1] == "w24"
+
+
+def test_split_text_counts_punctuation_and_keeps_formatting():
+    assert split_text("short text.", chunk_size=3, chunk_overlap=0) == ["short text."]
+    assert split_text("a, b\n\nc, d", chunk_size=3, chunk_overlap=0) == ["a, b", "c, d"]
+    assert split_text("   ") == []
+
+
+@pytest.mark.parametrize("size, overlap", [(0, 0), (10, 10), (10, -1)])
+def test_split_text_rejects_bad_sizes(size, overlap):
+    with pytest.raises(ValueError):
+        split_text("text", chunk_size=size, chunk_overlap=overlap)
+
+
+def test_split_documents_metadata_and_order():
+    documents = [
+        Document(page_content=_words(30, f"d{i}w"), metadata={"source": f"s{i}"})
+        for i in range(7)
+    ]
+
+    serial = list(
+        split_documents(documents, chunk_size=10, chunk_overlap=2, processes=1)
+    )
+    parallel = list(
+        split_documents(
+            documents,
+            chunk_size=10,
+            chunk_overlap=2,
+            processes=2,
+            task_size=2,
+            pool_threshold=0,
+        )
+    )
+
+    assert serial == parallel
+    assert [chunk.metadata["source"] for chunk in serial[:4]] == ["s0"] * 4
+    assert [chunk.metadata["chunk_index"] for chunk in serial[:5]] == [0, 1, 2, 3, 0]
+    assert len({chunk.metadata["uuid"] for chunk in serial}) == len(serial)
+    assert len({chunk.metadata["parent_uuid"] for chunk in serial}) == 7
+
+
+def test_small_streams_are_split_without_a_pool(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("started a process pool")
+
+    monkeypatch.setattr(chunking, "ProcessPoolExecutor", no_pool)
+    documents = [Document(page_content=_words(30)) for _ in range(10)]
+
+    chunks = list(
+        split_documents(documents, chunk_size=10, chunk_overlap=0, processes=4)
+    )
+
+    assert len(chunks) == 30
+
+
+def test_worker_module_does_not_import_the_graphs():
+    code = (
+        "import sys, src.rag_agents.shared.text_splitting; "
+        "print(sorted(m for m in sys.modules if m.startswith('src.')))"
+    )
+    modules = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert "index_graph" not in modules and "shared_retrieval" not in modules
+
+
+def test_unchanged_chunks_keep_ids_across_edits():
+    def chunk_ids(text):
+        document = Document(page_content=text, metadata={"source_id": "doc"})
+        return [
+            chunk.metadata["uuid"]
+            for chunk in split_documents(
+                [document], chunk_size=10, chunk_overlap=0, processes=1
+            )
+        ]
+
+    before = chunk_ids(_words(30))
+    after = chunk_ids(_words(20) + " edited")
+
+    assert before[:2] == after[:2]
+    assert before[2] != after[2]
+
+
+def test_delta_run_with_chunking_deletes_stale_chunks():
+    manifest = IndexManifest()
+    index = LocalVectorIndex()
+
+    def run(text):
+        return run_delta_pipeline(
+            [{"page_content": text, "metadata": {"source_id": "doc"}}],
+            HashingEncoder(dim=16),
+            LocalIndexWriter(index),
+            manifest,
+            split=lambda docs: split_documents(
+                docs, chunk_size=10, chunk_overlap=0, processes=1
+            ),
+        )
+
+    assert run(_words(30)).written == 3
+    stats = run(_words(20))
+
+    assert (stats.written, stats.deleted) == (2, 1)
+    assert len(index) == 2
@@ -0,0 +1,85 @@
+"""Tests for MinHash/LSH near-duplicate filtering."""
+
+import random
+
+import pytest
+from langchain_core.documents import Document
+
+from .dedup import MinHasher, NearDuplicateFilter, optimal_bands, shingles
+from .ingest import to_document
+
+
+def _text(seed, n=400):
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(10_000)}" for _ in range(n))
+
+
+def _edit(text, changes, seed=0):
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = "edited"
+    return " ".join(words)
+
+
+def test_shingles():
+    assert shingles("A b c", size=5) == ["a b c"]
+    assert sorted(shingles("a b c d", size=3)) == ["a b c", "b c d"]
+    assert shingles("  ") == []
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = set(shingles(_text(1)))
+    b = set(shingles(_edit(_text(1), 20)))
+    exact = len(a & b) / len(a | b)
+    estimate = float((hasher.signature(a) == hasher.signature(b)).mean())
+    assert estimate == pytest.approx(exact, abs=0.08)
+
+
+def test_optimal_bands_fit_num_perm():
+    for threshold in (0.5, 0.8, 0.95):
+        bands, rows = optimal_bands(threshold, 128)
+        assert bands * rows <= 128
+    # Stricter thresholds need longer bands.
+    assert optimal_bands(0.95, 128)[1] > optimal_bands(0.5, 128)[1]
+
+
+def test_filter_drops_near_duplicates_and_reports_clusters():
+    original = _text(1)
+    documents = [
+        to_document({"page_content": original, "metadata": {"source": "v1"}}),
+        to_document({"page_content": _edit(original, 2), "metadata": {"source": "v2"}}),
+        to_document({"page_content": _text(2), "metadata": {"source": "other"}}),
+        to_document(
+            {"page_content": _edit(original, 1, seed=5), "metadata": {"source": "v3"}}
+        ),
+    ]
+    dedup = NearDuplicateFilter(threshold=0.8)
+
+    kept = list(dedup.filter(documents))
+
+    assert [doc.metadata["source"] for doc in kept] == ["v1", "other"]
+    report = dedup.report()
+    assert (report["kept"], report["dropped"]) == (2, 2)
+    (cluster,) = report["clusters"]
+    assert cluster["kept"] == documents[0].metadata["uuid"]
+    assert [dup["source"] for dup in cluster["duplicates"]] == ["v2", "v3"]
+    assert all(dup["similarity"] >= 0.8 for dup in cluster["duplicates"])
+
+
+def test_filter_keeps_documents_below_threshold():
+    original = _text(3)
+    documents = [
+        Document(page_content=original, metadata={"uuid": "a"}),
+        Document(page_content=_edit(original, 60), metadata={"uuid": "b"}),
+    ]
+    assert len(list(NearDuplicateFilter(threshold=0.9).filter(documents))) == 2
+
+
+def test_write_report(tmp_path):
+    dedup = NearDuplicateFilter()
+    list(dedup.filter([Document(page_content="x", metadata={"uuid": "1"})]))
+    path = tmp_path / "report.json"
+    dedup.write_report(str(path))
+    assert '"kept": 1' in path.read_text()
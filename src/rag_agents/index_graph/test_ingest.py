@@ -0,0 +1,124 @@
+"""Tests for the streaming ingestion pipeline and backend writers."""
+
+import itertools
+import json
+
+import pytest
+from langchain_core.documents import Document
+
+from src.shared_retrieval.encoders import HashingEncoder
+from src.shared_retrieval.local_index import LocalVectorIndex
+from src.shared_retrieval.pinecone_retriever import PineconeRetriever
+from src.shared_retrieval.standins import LocalPineconeIndex
+
+from .ingest import iter_json_records, run_pipeline, to_document
+from .writers import ElasticsearchWriter, LocalIndexWriter, PineconeWriter
+
+RECORDS = [
+    {"page_content": "alpha " * 50, "metadata": {"source": "a"}},
+    {"page_content": "beta, with ] and [ inside", "metadata": {}},
+    "plain string",
+    123456,
+    {"page_content": "gamma", "metadata": {"uuid": "fixed"}},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_iter_json_array(tmp_path, chunk_size):
+    path = tmp_path / "docs.json"
+    path.write_text(json.dumps(RECORDS, indent=2))
+    assert list(iter_json_records(str(path), chunk_size=chunk_size)) == RECORDS
+
+
+def test_iter_json_lines(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in RECORDS) + "\n\n")
+    assert list(iter_json_records(str(path), chunk_size=5)) == RECORDS
+
+
+def test_iter_json_truncated_array(tmp_path):
+    path = tmp_path / "docs.json"
+    path.write_text('[{"page_content": "a"}, {"page_')
+    with pytest.raises(ValueError):
+        list(iter_json_records(str(path), chunk_size=4))
+
+
+def test_to_document_assigns_uuid():
+    document = to_document({"page_content": "hello", "metadata": {"source": "x"}})
+    assert document.metadata["source"] == "x"
+    assert document.metadata["uuid"] == to_document("hello").metadata["uuid"]
+    assert to_document(RECORDS[4]).metadata["uuid"] == "fixed"
+
+
+def test_run_pipeline_writes_every_chunk():
+    index = LocalVectorIndex()
+    records = [f"document number {i}" for i in range(100)]
+
+    def split(documents):
+        for document in documents:
+            for part in ("head", "tail"):
+                yield Document(
+                    page_content=f"{part} {document.page_content}",
+                    metadata={"uuid": f"{document.metadata['uuid']}-{part}"},
+                )
+
+    stats = run_pipeline(
+        records,
+        embeddings=HashingEncoder(dim=32),
+        writer=LocalIndexWriter(index),
+        split=split,
+        batch_size=16,
+        queue_size=2,
+        embed_workers=3,
+    )
+
+    assert (stats.documents, stats.chunks, stats.written) == (100, 200, 200)
+    assert stats.batches == 13
+    assert len(index) == 200
+
+
+def test_run_pipeline_stops_on_writer_error():
+    class FailingWriter:
+        def write(self, documents, vectors):
+            raise RuntimeError("backend down")
+
+    # An endless source only terminates if the failure stops the reader.
+    records = (f"doc {i}" for i in itertools.count())
+    with pytest.raises(RuntimeError, match="backend down"):
+        run_pipeline(
+            records, HashingEncoder(dim=8), FailingWriter(), batch_size=4, queue_size=1
+        )
+
+
+def test_pinecone_writer_round_trip():
+    encoder = HashingEncoder(dim=32)
+    index = LocalPineconeIndex()
+    run_pipeline(
+        ["reducers merge state", "namespaces isolate tenants"],
+        embeddings=encoder,
+        writer=PineconeWriter(index, namespace="docs", batch_size=1),
+    )
+
+    retriever = PineconeRetriever(
+        embeddings=encoder, index=index, namespace="docs", k=1
+    )
+    results = retriever.get_relevant_documents("reducers merge state")
+
+    assert results[0].page_content == "reducers merge state"
+    assert index.round_trips == 1
+
+
+def test_elasticsearch_actions():
+    writer = ElasticsearchWriter(client=None, index_name="docs")
+    document = to_document({"page_content": "text", "metadata": {"title": "t"}})
+
+    (action,) = writer._actions([document], [[0.5, 0.5]])
+
+    assert action["_index"] == "docs"
+    assert action["_id"] == document.metadata["uuid"]
+    assert action["_source"] == {
+        "title": "t",
+        "uuid": document.metadata["uuid"],
+        "content": "text",
+        "embedding": [0.5, 0.5],
+    }
@@ -0,0 +1,176 @@
+"""Tests for the index manifest and delta re-indexing."""
+
+import pytest
+from langchain_core.documents import Document
+
+from src.shared_retrieval.encoders import HashingEncoder
+from src.shared_retrieval.local_index import LocalVectorIndex
+
+from .configuration import IndexConfiguration
+from .dedup import NearDuplicateFilter
+from .graph import make_split
+from .ingest import run_delta_pipeline, to_document
+from .manifest import IndexManifest
+from .writers import LocalIndexWriter
+
+
+class CountingEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__(dim=16)
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def _corpus(**overrides):
+    docs = {f"s{i}": f"version one of document {i}" for i in range(10)}
+    docs.update(overrides)
+    return [
+        {"page_content": text, "metadata": {"source_id": source_id}}
+        for source_id, text in docs.items()
+        if text is not None
+    ]
+
+
+def _run(corpus, manifest, index):
+    encoder = CountingEncoder()
+    stats = run_delta_pipeline(
+        corpus, encoder, LocalIndexWriter(index), manifest, batch_size=4
+    )
+    return stats, encoder.embedded
+
+
+def test_first_run_indexes_everything(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "manifest.sqlite"))
+    index = LocalVectorIndex()
+
+    stats, embedded = _run(_corpus(), manifest, index)
+
+    assert (stats.written, stats.skipped, stats.deleted) == (10, 0, 0)
+    assert embedded == 10
+    assert len(index) == len(manifest) == 10
+
+
+def test_unchanged_run_embeds_nothing(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    index = LocalVectorIndex()
+    _run(_corpus(), IndexManifest(path), index)
+
+    stats, embedded = _run(_corpus(), IndexManifest(path), index)
+
+    assert (stats.written, stats.skipped, stats.deleted) == (0, 10, 0)
+    assert embedded == 0
+    assert len(index) == 10
+
+
+def test_delta_upserts_changed_and_deletes_removed(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    index = LocalVectorIndex()
+    _run(_corpus(), IndexManifest(path), index)
+    old_s1 = to_document(_corpus()[1]).metadata["uuid"]
+    old_s2 = to_document(_corpus()[2]).metadata["uuid"]
+
+    corpus = _corpus(s1="version two of document 1", s2=None, s10="a new document")
+    stats, embedded = _run(corpus, IndexManifest(path), index)
+
+    assert (stats.written, stats.skipped, stats.deleted) == (2, 8, 2)
+    assert embedded == 2
+    assert old_s1 not in index and old_s2 not in index
+    assert len(index) == 10
+    for text in ("version two of document 1", "a new document"):
+        assert to_document(text).metadata["uuid"] in index
+
+
+def test_failed_run_leaves_manifest_untouched():
+    manifest = IndexManifest()
+    documents = [to_document(Document(page_content="a", metadata={"source_id": "x"}))]
+
+    assert len(list(manifest.diff(documents))) == 1
+    # No finish(): the next run must treat the document as new again.
+    assert len(list(manifest.diff(documents))) == 1
+    manifest.record(documents)
+    assert manifest.finish() == []
+    assert list(manifest.diff(documents)) == []
+
+
+def test_failed_delete_is_retried_next_run(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    index = LocalVectorIndex()
+    _run(_corpus(), IndexManifest(path), index)
+    old_s2 = to_document(_corpus()[2]).metadata["uuid"]
+
+    class FailingWriter(LocalIndexWriter):
+        def delete(self, ids):
+            raise ConnectionError("backend unavailable")
+
+    with pytest.raises(ConnectionError):
+        run_delta_pipeline(
+            _corpus(s2=None), CountingEncoder(), FailingWriter(index), IndexManifest(path)
+        )
+    assert old_s2 in index
+
+    stats, _ = _run(_corpus(s2=None), IndexManifest(path), index)
+    assert stats.deleted == 1
+    assert old_s2 not in index
+
+
+def _dedup_run(path, index, corpus):
+    manifest = IndexManifest(path)
+    dedup = NearDuplicateFilter()
+    configuration = IndexConfiguration(chunk_size=0, dedup_threshold=0.9)
+    stats = run_delta_pipeline(
+        corpus,
+        CountingEncoder(),
+        LocalIndexWriter(index),
+        manifest,
+        split=make_split(configuration, dedup, manifest),
+    )
+    return stats, dedup.dropped
+
+
+_TEXT = " ".join(f"word{i}" for i in range(60))
+
+
+def test_dropped_duplicates_are_rechecked_next_run(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    index = LocalVectorIndex()
+    a = {"page_content": _TEXT, "metadata": {"source_id": "a"}}
+    b = {"page_content": _TEXT + " extra", "metadata": {"source_id": "b"}}
+
+    def run(corpus):
+        return _dedup_run(path, index, corpus)[0]
+
+    stats = run([a, b])
+    assert (stats.written, len(index)) == (1, 1)
+
+    # The kept twin is removed, so the dropped document must be indexed now.
+    stats = run([b])
+    assert (stats.written, stats.skipped, stats.deleted) == (1, 0, 1)
+    assert to_document(b).metadata["uuid"] in index
+    assert len(index) == 1
+
+    stats = run([b])
+    assert (stats.written, stats.skipped) == (0, 1)
+    assert len(index) == 1
+
+
+def test_duplicates_of_skipped_sources_stay_dropped(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    index = LocalVectorIndex()
+    a = {"page_content": _TEXT, "metadata": {"source_id": "a"}}
+    b = {"page_content": _TEXT + " extra", "metadata": {"source_id": "b"}}
+    c = {"page_content": "something else entirely", "metadata": {"source_id": "c"}}
+
+    for _ in range(3):
+        stats, dropped = _dedup_run(path, index, [a, b, c])
+        assert dropped == 1
+        assert to_document(b).metadata["uuid"] not in index
+        assert len(index) == 2
+
+    # A changed source is compared with its new chunks, not its stored ones.
+    a_v2 = {"page_content": _TEXT + " edited", "metadata": {"source_id": "a"}}
+    stats, dropped = _dedup_run(path, index, [a_v2, b, c])
+    assert (stats.written, stats.skipped, dropped) == (1, 1, 1)
+    assert len(index) == 2
@@ -0,0 +1,284 @@
+# src/rag_agents/index_graph/writers.py
+"""Batch writers that load embedded documents into each retriever backend.
+
+Every writer exposes ``write(documents, vectors)`` and ``delete(ids)`` and
+uses the backend's own bulk path: Elasticsearch ``parallel_bulk``, Pinecone ``upsert`` batches,
+MongoDB ``bulk_write`` and direct inserts into the in-process indexes. Record
+layouts match what the corresponding retrievers read back, and the document
+``uuid`` is the record id, so re-indexing a document replaces it.
+"""
+
+import os
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from elasticsearch.helpers import parallel_bulk
+from langchain_core.documents import Document
+from pymongo import ReplaceOne
+
+from src.shared_retrieval.clients import (
+    get_elasticsearch,
+    get_mongo_client,
+    get_pinecone_index,
+)
+from src.shared_retrieval.lexical_index import LocalLexicalIndex, get_lexical_index
+from src.shared_retrieval.local_index import (
+    DEFAULT_INDEX_NAME,
+    LocalVectorIndex,
+    get_local_index,
+)
+
+# Pinecone rejects upsert requests much larger than this many vectors.
+PINECONE_UPSERT_BATCH = 100
+
+
+def _document_id(document: Document) -> str:
+    return str(document.metadata["uuid"])
+
+
+class ElasticsearchWriter:
+    """Writes documents with the Elasticsearch ``parallel_bulk`` helper."""
+
+    def __init__(
+        self,
+        client: Any,
+        index_name: str,
+        thread_count: int = 4,
+        chunk_size: int = 500,
+        text_field: str = "content",
+        embedding_field: Optional[str] = "embedding",
+    ):
+        """Initialize the writer.
+
+        Args:
+            client: Elasticsearch client.
+            index_name: Index the documents are written to.
+            thread_count: Bulk requests in flight at once.
+            chunk_size: Documents per bulk request.
+            text_field: Field holding the page content.
+            embedding_field: Field holding the vector; ``None`` skips vectors.
+        """
+        self.client = client
+        self.index_name = index_name
+        self.thread_count = thread_count
+        self.chunk_size = chunk_size
+        self.text_field = text_field
+        self.embedding_field = embedding_field
+
+    def _actions(
+        self, documents: Sequence[Document], vectors: Sequence[List[float]]
+    ) -> Any:
+        for document, vector in zip(documents, vectors):
+            source: Dict[str, Any] = {
+                **document.metadata,
+                self.text_field: document.page_content,
+            }
+            if self.embedding_field:
+                source[self.embedding_field] = vector
+            yield {
+                "_index": self.index_name,
+                "_id": _document_id(document),
+                "_source": source,
+            }
+
+    def write(
+        self, documents: Sequence[Document], vectors: Sequence[List[float]]
+    ) -> None:
+        """Index a batch of documents, raising on the first failed item."""
+        # parallel_bulk is lazy; draining it with a zero-length deque sends
+        # every request without keeping the per-item results.
+        deque(
+            parallel_bulk(
+                self.client,
+                self._actions(documents, vectors),
+                thread_count=self.thread_count,
+                chunk_size=self.chunk_size,
+            ),
+            maxlen=0,
+        )
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete documents by id; ids that are already gone are ignored."""
+        deque(
+            parallel_bulk(
+                self.client,
+                (
+                    {"_op_type": "delete", "_index": self.index_name, "_id": doc_id}
+                    for doc_id in ids
+                ),
+                thread_count=self.thread_count,
+                chunk_size=self.chunk_size,
+                ignore_status=(404,),
+            ),
+            maxlen=0,
+        )
+
+
+class PineconeWriter:
+    """Upserts documents into a Pinecone namespace."""
+
+    def __init__(
+        self,
+        index: Any,
+        namespace: str = "",
+        text_field: str = "content",
+        batch_size: int = PINECONE_UPSERT_BATCH,
+    ):
+        """Initialize the writer.
+
+        Args:
+            index: Pinecone index handle.
+            namespace: Namespace the vectors are written to.
+            text_field: Metadata field holding the page content.
+            batch_size: Vectors per upsert request.
+        """
+        self.index = index
+        self.namespace = namespace
+        self.text_field = text_field
+        self.batch_size = batch_size
+
+    def write(
+        self, documents: Sequence[Document], vectors: Sequence[List[float]]
+    ) -> None:
+        """Upsert a batch of documents."""
+        records = [
+            (
+                _document_id(document),
+                list(vector),
+                {**document.metadata, self.text_field: document.page_content},
+            )
+            for document, vector in zip(documents, vectors)
+        ]
+        for start in range(0, len(records), self.batch_size):
+            self.index.upsert(
+                vectors=records[start : start + self.batch_size],
+                namespace=self.namespace,
+            )
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete vectors by id."""
+        ids = list(ids)
+        for start in range(0, len(ids), self.batch_size):
+            self.index.delete(
+                ids=ids[start : start + self.batch_size], namespace=self.namespace
+            )
+
+
+class MongoWriter:
+    """Upserts documents into a MongoDB collection with ``bulk_write``."""
+
+    def __init__(
+        self,
+        collection: Any,
+        text_field: str = "content",
+        embedding_field: str = "embedding",
+    ):
+        """Initialize the writer.
+
+        Args:
+            collection: Target collection.
+            text_field: Field holding the page content.
+            embedding_field: Field holding the vector.
+        """
+        self.collection = collection
+        self.text_field = text_field
+        self.embedding_field = embedding_field
+
+    def write(
+        self, documents: Sequence[Document], vectors: Sequence[List[float]]
+    ) -> None:
+        """Upsert a batch of documents in one unordered bulk request."""
+        operations = [
+            ReplaceOne(
+                {"_id": _document_id(document)},
+                {
+                    **document.metadata,
+                    self.text_field: document.page_content,
+                    self.embedding_field: list(vector),
+                },
+                upsert=True,
+            )
+            for document, vector in zip(documents, vectors)
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete documents by id."""
+        if ids:
+            self.collection.delete_many({"_id": {"$in": list(ids)}})
+
+
+class LocalIndexWriter:
+    """Adds documents to the in-process vector and lexical indexes."""
+
+    def __init__(
+        self,
+        index: LocalVectorIndex,
+        lexical_index: Optional[LocalLexicalIndex] = None,
+    ):
+        """Initialize the writer.
+
+        Args:
+            index: Vector index searched by the ``"elastic-local"`` provider.
+            lexical_index: Optional BM25 index updated alongside it.
+        """
+        self.index = index
+        self.lexical_index = lexical_index
+
+    def write(
+        self, documents: Sequence[Document], vectors: Sequence[List[float]]
+    ) -> None:
+        """Insert or replace a batch of documents."""
+        ids = [_document_id(document) for document in documents]
+        self.index.add(ids, vectors, documents)
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, documents)
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete documents by id."""
+        self.index.delete(ids)
+        if self.lexical_index is not None:
+            self.lexical_index.delete(ids)
+
+
+def create_writer(config: Dict[str, Any]) -> Any:
+    """Create the writer for a retriever config.
+
+    The config uses the same keys as ``create_retriever``, so documents are
+    written where the matching retriever searches.
+    """
+    writer_type = config.get("type", "elasticsearch")
+
+    if writer_type == "elasticsearch":
+        client = get_elasticsearch(
+            os.getenv("ELASTICSEARCH_URL"), os.getenv("ELASTICSEARCH_API_KEY")
+        )
+        return ElasticsearchWriter(
+            client, config.get("index_name") or DEFAULT_INDEX_NAME
+        )
+    if writer_type in ("elastic-local", "elastic-local-lexical"):
+        index_name = config.get("index_name") or DEFAULT_INDEX_NAME
+        return LocalIndexWriter(
+            get_local_index(index_name), lexical_index=get_lexical_index(index_name)
+        )
+    if writer_type == "pinecone":
+        index = get_pinecone_index(
+            os.getenv("PINECONE_API_KEY"), os.getenv("PINECONE_INDEX_NAME")
+        )
+        return PineconeWriter(
+            index,
+            namespace=config.get("namespace") or os.getenv("PINECONE_NAMESPACE") or "",
+        )
+    if writer_type == "mongodb":
+        client = get_mongo_client(os.getenv("MONGODB_URI"))
+        database = (
+            config.get("database_name") or os.getenv("MONGODB_DATABASE") or "langgraph"
+        )
+        collection = (
+            config.get("collection_name")
+            or os.getenv("MONGODB_COLLECTION")
+            or "documents"
+        )
+        return MongoWriter(client[database][collection])
+    raise ValueError(f"Unsupported writer type: {writer_type}")
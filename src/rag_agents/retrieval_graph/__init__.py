@@ -30,6 +30,6 @@ For detailed configuration options and usage instructions, refer to the AgentCon
 and individual component documentation within the retrieval_graph package.
 """  # noqa
 
-from retrieval_graph.graph import graph
+from src.rag_agents.retrieval_graph.graph import graph
 
 __all__ = ["graph"]
@@ -0,0 +1,106 @@
+# src/rag_agents/retrieval_graph/citations.py
+"""Incremental resolution of ``[n]`` citation markers in streamed answers.
+
+``RESPONSE_SYSTEM_PROMPT`` asks the model to cite the numbered sources of its
+context (``shared_utils.document_utils.pack_context``) as ``[n]``, or
+``[1, 3]`` for two. ``CitationResolver`` is fed the answer chunk by chunk as
+it streams and turns it into events for the graph's ``custom`` stream:
+
+* ``{"event": "token", "text": ...}`` carries the answer text, markers
+  included, in order.
+* ``{"event": "citation", "number": n, "document": {...}}`` follows the
+  marker that cites source ``n`` and identifies the document behind it.
+
+Text that could still become a marker, such as a trailing ``"[1"``, is held
+back until the next chunk decides it, so no marker is ever split across
+events. Everything else is emitted immediately.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+
+# Metadata copied into citation events to identify the cited document.
+CITATION_FIELDS = ("uuid", "source", "title", "url")
+
+# A held-back "[..." longer than this is plain text, not a marker.
+MAX_MARKER_LENGTH = 32
+
+_MARKER_RE = re.compile(r"\[\$?(\d+(?:\s*,\s*\$?\d+)*)\]")
+_PARTIAL_RE = re.compile(r"\[\$?[\d\s,$]*$")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def message_text(message: BaseMessage) -> str:
+    """Return the text of a message or streamed message chunk.
+
+    Providers return either a string or a list of content blocks; only text
+    blocks are kept.
+    """
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+
+class CitationResolver:
+    """Splits a streamed answer into token and citation events."""
+
+    def __init__(self, documents: Sequence[Document] = ()):
+        """Initialize the resolver.
+
+        Args:
+            documents: The sources in the order they were numbered in the
+                prompt, so ``[n]`` refers to ``documents[n - 1]``.
+        """
+        self.documents = list(documents)
+        self.cited: Dict[int, Document] = {}
+        self._pending = ""
+
+    def _citation(self, number: int) -> Optional[Dict[str, Any]]:
+        if not 1 <= number <= len(self.documents):
+            # The model cited a source it was not given; keep the text only.
+            return None
+        document = self.documents[number - 1]
+        self.cited.setdefault(number, document)
+        return {
+            "event": "citation",
+            "number": number,
+            "document": {
+                key: document.metadata[key]
+                for key in CITATION_FIELDS
+                if key in document.metadata
+            },
+        }
+
+    def _events(self, text: str) -> Iterable[Dict[str, Any]]:
+        start = 0
+        for match in _MARKER_RE.finditer(text):
+            yield {"event": "token", "text": text[start : match.end()]}
+            start = match.end()
+            for number in _NUMBER_RE.findall(match.group(1)):
+                citation = self._citation(int(number))
+                if citation is not None:
+                    yield citation
+        if start < len(text):
+            yield {"event": "token", "text": text[start:]}
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume the next chunk of the answer and return its events."""
+        text = self._pending + text
+        self._pending = ""
+        partial = _PARTIAL_RE.search(text)
+        if partial and len(text) - partial.start() <= MAX_MARKER_LENGTH:
+            text, self._pending = text[: partial.start()], text[partial.start() :]
+        return list(self._events(text))
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Return the events of any text still held back at the end."""
+        text, self._pending = self._pending, ""
+        return list(self._events(text))
@@ -3,11 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Annotated
+from typing import Annotated, Optional
 
-from shared.configuration import BaseConfiguration
-
-from retrieval_graph import prompts
+from src.rag_agents.retrieval_graph import prompts
+from src.rag_agents.shared.configuration import BaseConfiguration
 
 
 @dataclass(kw_only=True)
@@ -71,3 +70,72 @@ class AgentConfiguration(BaseConfiguration):
         default=prompts.RESPONSE_SYSTEM_PROMPT,
         metadata={"description": "The system prompt used for generating responses."},
     )
+
+    # context
+
+    context_max_tokens: int = field(
+        default=4000,
+        metadata={
+            "description": "Token budget of the researched documents in the response prompt. Duplicates are dropped and the least relevant documents trimmed to fit."
+        },
+    )
+
+    context_mmr_lambda: float = field(
+        default=0.7,
+        metadata={
+            "description": "Trade-off between relevance (1.0) and diversity (0.0) when ordering the documents of the response prompt."
+        },
+    )
+
+    # routing
+
+    local_router_path: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "A local router saved by retrieval_graph.router. Questions it classifies with at least local_router_threshold confidence are routed without calling the query model."
+        },
+    )
+
+    local_router_threshold: float = field(
+        default=0.9,
+        metadata={
+            "description": "Confidence the local router needs to route a question by itself."
+        },
+    )
+
+    router_log_path: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "JSONL file the query model's routing decisions are appended to, as training data for the local router."
+        },
+    )
+
+    # answer cache
+
+    answer_cache: bool = field(
+        default=False,
+        metadata={
+            "description": "Answer standalone questions from a semantic cache of earlier answers when a similar enough question was answered recently and the index has not changed since."
+        },
+    )
+
+    answer_cache_threshold: float = field(
+        default=0.92,
+        metadata={
+            "description": "Cosine similarity between question embeddings needed to serve a cached answer."
+        },
+    )
+
+    answer_cache_ttl: float = field(
+        default=3600.0,
+        metadata={"description": "Seconds a cached answer stays valid."},
+    )
+
+    # research
+
+    research_concurrency: int = field(
+        default=4,
+        metadata={
+            "description": "Maximum number of research plan steps researched at the same time, and of queries retrieved at the same time within each step."
+        },
+    )
@@ -1,62 +1,377 @@
 # src/rag_agents/retrieval_graph/graph.py
-"""Graph definition for the retrieval agent."""
-from typing import List
+"""Graph definition for the retrieval agent.
 
-from langchain_core.messages import BaseMessage
-from langchain_core.runnables import Runnable
-from langgraph.graph import StateGraph
+The agent classifies the user's question, and for LangChain questions writes
+a research plan and researches it before responding. Plan steps run as
+parallel ``conduct_research`` branches through ``Send``, each invoking the
+researcher subgraph, which in turn retrieves its queries in parallel. The
+documents of every branch are merged through the ``documents`` reducer, so a
+plan takes about as long as its slowest step instead of the sum of all steps.
 
+``research_concurrency`` caps the fan-out: steps are dispatched in waves of
+at most that many, and each step retrieves at most that many queries at a
+time.
+
+Answers are streamed. With ``stream_mode="custom"``, the graph's stream API
+yields each answer token as the model produces it, and a citation event as
+soon as a ``[n]`` marker is complete (see ``retrieval_graph.citations``).
+``stream_mode="messages"`` yields the raw model chunks instead.
+
+Routing of a conversation's first question tries the local classifier of
+``retrieval_graph.router`` first (with ``local_router_path`` set) and only
+calls the query model when it is not confident enough; the model's decisions
+can be logged to train it.
+
+With ``answer_cache`` enabled, a standalone question is first looked up in
+the semantic answer cache (``retrieval_graph.semantic_cache``); a hit is
+answered, and streamed, without any model call, and every researched answer
+is stored for later questions.
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Literal, Optional, Sequence, TypedDict, Union, cast
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, BaseMessage, message_chunk_to_message
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+
+from src.rag_agents.retrieval_graph.citations import CitationResolver, message_text
 from src.rag_agents.retrieval_graph.configuration import AgentConfiguration
-from src.rag_agents.retrieval_graph.state import AgentState
-from src.shared_retrieval.retriever_factory import create_retriever
-from src.shared_utils.model_utils import load_chat_model
+from src.rag_agents.retrieval_graph.researcher_graph.graph import (
+    graph as researcher_graph,
+)
+from src.rag_agents.retrieval_graph.router import get_local_router, get_router_log
+from src.rag_agents.retrieval_graph.semantic_cache import (
+    SemanticCache,
+    get_semantic_cache,
+    index_version,
+)
+from src.rag_agents.retrieval_graph.state import (
+    AgentState,
+    InputState,
+    Router,
+    StepState,
+)
+from src.rag_agents.shared.docstore import MissingDocumentsError, resolve_docs
+from src.rag_agents.shared.retrieval import make_retriever, retriever_config
+from src.rag_agents.shared.utils import load_chat_model
+from src.shared_retrieval.registry import registry_key, warmup_from_env
+from src.shared_utils.document_utils import pack_context
+
+logger = logging.getLogger(__name__)
+
+
+def _standalone_question(state: AgentState) -> Optional[str]:
+    """Return the user's question if it is the first of the conversation.
+
+    Follow-up questions depend on earlier turns, so they are never answered
+    from or stored in the answer cache.
+    """
+    questions = [message for message in state.messages if message.type == "human"]
+    return message_text(questions[0]) if len(questions) == 1 else None
+
+
+def _latest_question(state: AgentState) -> Optional[str]:
+    """Return the text of the user's latest message, if any."""
+    for message in reversed(state.messages):
+        if message.type == "human":
+            return message_text(message)
+    return None
+
+
+def _answer_cache(configuration: AgentConfiguration) -> SemanticCache:
+    """Return the answer cache for the retriever and response model in use."""
+    scope = "\x00".join(
+        (configuration.response_model, registry_key(retriever_config(configuration)))
+    )
+    return get_semantic_cache(configuration.embedding_model, scope)
+
+
+async def check_answer_cache(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, Any]:
+    """Answer from the semantic cache if a similar question was answered."""
+    configuration = AgentConfiguration.from_runnable_config(config)
+    question = _standalone_question(state)
+    if not configuration.answer_cache or question is None:
+        return {"answer_cached": False}
+    cached = await _answer_cache(configuration).alookup(
+        question,
+        version=index_version(make_retriever(config)),
+        threshold=configuration.answer_cache_threshold,
+        ttl=configuration.answer_cache_ttl,
+    )
+    if cached is None:
+        return {"answer_cached": False}
+    try:
+        sources = resolve_docs(cached.documents)
+    except MissingDocumentsError as error:
+        # The answer's sources were evicted, so its citations cannot be
+        # shown; research the question again.
+        logger.info("Skipping cached answer: %s", error)
+        return {"answer_cached": False}
+    # Stream the cached answer like a generated one.
+    writer = get_stream_writer()
+    resolver = CitationResolver(sources)
+    for event in resolver.feed(cached.answer) + resolver.flush():
+        writer(event)
+    return {
+        "messages": [AIMessage(content=cached.answer)],
+        "documents": cached.documents,
+        "sources": cached.documents,
+        "answer_cached": True,
+    }
+
+
+def route_answer_cache(
+    state: AgentState,
+) -> Literal["analyze_and_route_query", "__end__"]:
+    """End the run on a cache hit; otherwise classify the question."""
+    return END if state.answer_cached else "analyze_and_route_query"
+
+
+def _route_locally(path: str, question: str, threshold: float) -> Optional[Router]:
+    router = get_local_router(path)
+    return None if router is None else router.route(question, threshold)
+
+
+async def analyze_and_route_query(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, Router]:
+    """Classify the user's question to decide how to respond.
+
+    For the first question of a conversation, a confident local router
+    decides without the query model; otherwise the model classifies the
+    question and its decision is logged for training. Follow-ups always go to
+    the model, which sees the earlier turns they depend on.
+    """
+    configuration = AgentConfiguration.from_runnable_config(config)
+    question = _standalone_question(state)
+    if configuration.local_router_path and question is not None:
+        # Loading and classifying both block (file I/O, the centroid router's
+        # embedding model), so neither runs on the event loop.
+        decision = await asyncio.to_thread(
+            _route_locally,
+            configuration.local_router_path,
+            question,
+            configuration.local_router_threshold,
+        )
+        if decision is not None:
+            return {"router": decision}
+    model = load_chat_model(configuration.query_model)
+    messages = [
+        {"role": "system", "content": configuration.router_system_prompt}
+    ] + state.messages
+    response = cast(
+        Router, await model.with_structured_output(Router).ainvoke(messages, config)
+    )
+    if configuration.router_log_path and question is not None:
+        await asyncio.to_thread(
+            get_router_log(configuration.router_log_path).append,
+            question,
+            response["type"],
+        )
+    return {"router": response}
 
 
-def create_agent(
-    config: AgentConfiguration,
-) -> Runnable[AgentState, List[BaseMessage]]:
-    """Create the retrieval agent."""
-    _ = load_chat_model(config.llm_model_name, temperature=config.llm_temperature)
-    _ = create_retriever(config.knowledge_base)
-    raise NotImplementedError
+def route_query(
+    state: AgentState,
+) -> Literal["create_research_plan", "ask_for_more_info", "respond_to_general_query"]:
+    """Pick the next node from the router's classification."""
+    _type = state.router["type"]
+    if _type == "langchain":
+        return "create_research_plan"
+    elif _type == "more-info":
+        return "ask_for_more_info"
+    elif _type == "general":
+        return "respond_to_general_query"
+    else:
+        raise ValueError(f"Unknown router type {_type}")
 
 
-def retrieve_relevant_knowledge(state: AgentState):
-    """Retrieve relevant knowledge based on the current state."""
-    raise NotImplementedError
+async def stream_response(
+    model: Any,
+    messages: List[Any],
+    config: RunnableConfig,
+    documents: Optional[Sequence[Document]] = None,
+) -> BaseMessage:
+    """Stream a model response to the custom stream and return the message.
 
+    Every chunk is written as it arrives. With ``documents``, ``[n]``
+    citation markers are resolved against them on the way.
+    """
+    writer = get_stream_writer()
+    resolver = CitationResolver(documents or ())
+    response = None
+    async for chunk in model.astream(messages, config):
+        response = chunk if response is None else response + chunk
+        for event in resolver.feed(message_text(chunk)):
+            writer(event)
+    for event in resolver.flush():
+        writer(event)
+    if response is None:
+        raise ValueError("The model returned an empty stream.")
+    return message_chunk_to_message(response)
 
-def generate_response(state: AgentState):
-    """Generate a response based on the current state."""
-    raise NotImplementedError
 
+async def _respond_with_logic(
+    state: AgentState, config: RunnableConfig, system_prompt: str
+) -> dict[str, list[BaseMessage]]:
+    configuration = AgentConfiguration.from_runnable_config(config)
+    model = load_chat_model(configuration.query_model)
+    system_prompt = system_prompt.format(logic=state.router["logic"])
+    messages = [{"role": "system", "content": system_prompt}] + state.messages
+    response = await stream_response(model, messages, config)
+    return {"messages": [response]}
 
-def should_continue(state: AgentState) -> str:
-    """Determine whether to continue retrieving or respond."""
-    # This is a placeholder implementation - you'll need to implement
-    # the actual logic based on your agent's requirements
-    if not state.documents:
-        return "continue"
-    return "respond"
+
+async def ask_for_more_info(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, list[BaseMessage]]:
+    """Ask the user a follow-up question."""
+    configuration = AgentConfiguration.from_runnable_config(config)
+    return await _respond_with_logic(
+        state, config, configuration.more_info_system_prompt
+    )
+
+
+async def respond_to_general_query(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, list[BaseMessage]]:
+    """Answer a question that is not about LangChain."""
+    configuration = AgentConfiguration.from_runnable_config(config)
+    return await _respond_with_logic(state, config, configuration.general_system_prompt)
+
+
+async def create_research_plan(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, Union[list[str], str]]:
+    """Write a step-by-step research plan for the user's question."""
+
+    class Plan(TypedDict):
+        """Generate research plan."""
+
+        steps: list[str]
+
+    configuration = AgentConfiguration.from_runnable_config(config)
+    model = load_chat_model(configuration.query_model).with_structured_output(Plan)
+    messages = [
+        {"role": "system", "content": configuration.research_plan_system_prompt}
+    ] + state.messages
+    response = cast(Plan, await model.ainvoke(messages, config))
+    # Documents of the previous question would crowd out the new ones.
+    return {"steps": response["steps"], "documents": "delete"}
+
+
+def dispatch_research(
+    state: AgentState, *, config: RunnableConfig
+) -> Union[List[Send], Literal["respond"]]:
+    """Send the next wave of plan steps to parallel research branches."""
+    if not state.steps:
+        return "respond"
+    limit = AgentConfiguration.from_runnable_config(config).research_concurrency
+    return [
+        Send("conduct_research", StepState(question=step))
+        for step in state.steps[: max(1, limit)]
+    ]
+
+
+async def conduct_research(
+    state: StepState, *, config: RunnableConfig
+) -> dict[str, list[str]]:
+    """Research one plan step with the researcher subgraph."""
+    limit = AgentConfiguration.from_runnable_config(config).research_concurrency
+    result = await researcher_graph.ainvoke(
+        {"question": state.question}, {**config, "max_concurrency": max(1, limit)}
+    )
+    # The subgraph has already stored the documents; pass on their UUIDs.
+    return {"documents": list(result["documents"])}
+
+
+def finish_research_wave(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, list[str]]:
+    """Drop the plan steps researched by the wave that just finished."""
+    limit = AgentConfiguration.from_runnable_config(config).research_concurrency
+    return {"steps": state.steps[max(1, limit) :]}
+
+
+async def respond(
+    state: AgentState, *, config: RunnableConfig
+) -> dict[str, list[BaseMessage]]:
+    """Answer the user's question from the researched documents.
+
+    The documents are packed into ``context_max_tokens`` and numbered in the
+    prompt, so the answer's ``[n]`` citations can be resolved while it
+    streams.
+    """
+    configuration = AgentConfiguration.from_runnable_config(config)
+    model = load_chat_model(configuration.response_model)
+    context = pack_context(
+        resolve_docs(state.documents),
+        query=_latest_question(state),
+        max_tokens=configuration.context_max_tokens,
+        mmr_lambda=configuration.context_mmr_lambda,
+    )
+    prompt = configuration.response_system_prompt.format(context=context.text)
+    messages = [{"role": "system", "content": prompt}] + state.messages
+    response = await stream_response(model, messages, config, context.documents)
+    sources = [document.metadata["uuid"] for document in context.documents]
+    return {"messages": [response], "sources": sources}
+
+
+async def store_answer(state: AgentState, *, config: RunnableConfig) -> dict:
+    """Store the researched answer in the semantic answer cache."""
+    configuration = AgentConfiguration.from_runnable_config(config)
+    question = _standalone_question(state)
+    if configuration.answer_cache and question is not None:
+        await _answer_cache(configuration).astore(
+            question,
+            message_text(state.messages[-1]),
+            list(state.sources),
+            version=index_version(make_retriever(config)),
+        )
+    return {}
 
 
 def create_graph() -> StateGraph:
     """Create the graph for the retrieval agent."""
-    builder = StateGraph(AgentState)
-    builder.add_node("retrieve", retrieve_relevant_knowledge)
-    builder.add_node("generate", generate_response)
+    builder = StateGraph(AgentState, input_schema=InputState)
+    builder.add_node(check_answer_cache)
+    builder.add_node(analyze_and_route_query)
+    builder.add_node(ask_for_more_info)
+    builder.add_node(respond_to_general_query)
+    builder.add_node(create_research_plan)
+    builder.add_node(conduct_research)
+    builder.add_node(finish_research_wave)
+    builder.add_node(respond)
+    builder.add_node(store_answer)
 
-    # Convert the conditional edges to a proper Runnable
+    builder.add_edge(START, "check_answer_cache")
+    builder.add_conditional_edges("check_answer_cache", route_answer_cache)
+    builder.add_conditional_edges("analyze_and_route_query", route_query)
     builder.add_conditional_edges(
-        "retrieve",
-        lambda state: "continue" if not state.documents else "respond",
-        {"continue": "retrieve", "respond": "generate"},
+        "create_research_plan", dispatch_research, ["conduct_research", "respond"]
     )
-
-    builder.set_entry_point("retrieve")
-    builder.set_finish_point("generate")
+    # Branches of one wave join here before the next wave is dispatched.
+    builder.add_edge("conduct_research", "finish_research_wave")
+    builder.add_conditional_edges(
+        "finish_research_wave", dispatch_research, ["conduct_research", "respond"]
+    )
+    builder.add_edge("ask_for_more_info", END)
+    builder.add_edge("respond_to_general_query", END)
+    builder.add_edge("respond", "store_answer")
+    builder.add_edge("store_answer", END)
     return builder
 
 
 # Expose the graph instance
-graph = create_graph()
+graph = create_graph().compile()
+graph.name = "RetrievalGraph"
+
+# Open retriever connections at server startup when RETRIEVER_WARMUP is set.
+warmup_from_env()
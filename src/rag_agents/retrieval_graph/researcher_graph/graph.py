@@ -1,55 +1,108 @@
 # src/rag_agents/retrieval_graph/researcher_graph/graph.py
-"""Graph definition for the research agent."""
-from typing import List
+"""Graph definition for the research agent.
 
-from langchain_core.messages import BaseMessage
-from langchain_core.runnables import Runnable
-from langgraph.graph import StateGraph
+The researcher turns one step of the research plan into several search
+queries and retrieves documents for all of them in parallel. Backends with a
+native multi-query search, such as Elasticsearch's ``_msearch``, get all of
+a step's queries in one ``retrieve_batch`` call, which costs about one
+round-trip. With other backends every query is sent to its own
+``retrieve_documents`` branch, and the branches' documents are merged
+through the ``documents`` reducer. A step then takes about as long as its
+slowest query, and the number of branches running at once follows the
+``max_concurrency`` of the run config.
+"""
 
-from src.rag_agents.retrieval_graph.configuration import RetrievalAgentConfiguration
-from src.rag_agents.retrieval_graph.researcher_graph.state import ResearcherState
-from src.shared_retrieval.retriever_factory import create_retriever
-from src.shared_utils.model_utils import load_chat_model
+from typing import List, TypedDict, cast
 
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
 
-def create_agent(
-    config: RetrievalAgentConfiguration,
-) -> Runnable[ResearcherState, List[BaseMessage]]:
-    """Create the research agent."""
-    _ = load_chat_model(config.llm_model_name, temperature=config.llm_temperature)
-    _ = create_retriever(config.knowledge_base)
-    raise NotImplementedError
+from src.rag_agents.retrieval_graph.configuration import AgentConfiguration
+from src.rag_agents.retrieval_graph.researcher_graph.state import (
+    QueryBatchState,
+    QueryState,
+    ResearcherState,
+)
+from src.rag_agents.shared.retrieval import make_retriever
+from src.rag_agents.shared.utils import load_chat_model
+from src.shared_retrieval.base import BaseRetriever
 
 
-def generate_research_query(state: ResearcherState):
-    """Generate a research query based on the current state."""
-    raise NotImplementedError
+async def generate_queries(
+    state: ResearcherState, *, config: RunnableConfig
+) -> dict[str, list[str]]:
+    """Generate search queries for the research plan step in the state."""
 
+    class Response(TypedDict):
+        queries: list[str]
 
-def retrieve_relevant_documents(state: ResearcherState):
-    """Retrieve relevant documents based on the query."""
-    raise NotImplementedError
+    configuration = AgentConfiguration.from_runnable_config(config)
+    model = load_chat_model(configuration.query_model).with_structured_output(Response)
+    messages = [
+        {"role": "system", "content": configuration.generate_queries_system_prompt},
+        {"role": "human", "content": state.question},
+    ]
+    response = cast(Response, await model.ainvoke(messages, config))
+    return {"queries": response["queries"]}
 
 
-def generate_report(state: ResearcherState):
-    """Generate a report based on the retrieved documents."""
-    raise NotImplementedError
+def _batches_natively(retriever: object) -> bool:
+    # The default batch only gathers single-query calls, which the
+    # per-query branches already do under the run's concurrency limit.
+    batch = getattr(type(retriever), "aget_relevant_documents_batch", None)
+    default = BaseRetriever.aget_relevant_documents_batch
+    return batch is not None and batch is not default
 
 
-def should_continue_researching(state: ResearcherState):
-    """Determine whether to continue researching or report."""
-    raise NotImplementedError
+def retrieve_in_parallel(
+    state: ResearcherState, *, config: RunnableConfig
+) -> List[Send]:
+    """Send the generated queries to the retrieval nodes.
 
+    All queries go to one retrieve_batch call if the retriever has a native
+    batch search; otherwise each query gets its own retrieve_documents branch.
+    """
+    queries = list(dict.fromkeys(state.queries))
+    if len(queries) > 1 and _batches_natively(make_retriever(config)):
+        return [Send("retrieve_batch", QueryBatchState(queries=queries))]
+    return [Send("retrieve_documents", QueryState(query=query)) for query in queries]
 
-def create_graph() -> StateGraph[ResearcherState]:
+
+async def retrieve_documents(
+    state: QueryState, *, config: RunnableConfig
+) -> dict[str, list]:
+    """Retrieve the documents for one query."""
+    retriever = make_retriever(config)
+    documents = await retriever.aget_relevant_documents(state.query)
+    return {"documents": documents}
+
+
+async def retrieve_batch(
+    state: QueryBatchState, *, config: RunnableConfig
+) -> dict[str, list]:
+    """Retrieve the merged documents for all queries in one batch search."""
+    retriever = make_retriever(config)
+    documents = await retriever.aget_relevant_documents_batch(state.queries)
+    return {"documents": documents}
+
+
+def create_graph() -> StateGraph:
     """Create the graph for the research agent."""
     builder = StateGraph(ResearcherState)
-    builder.add_node("generate_query", generate_research_query)
-    builder.add_node("retrieve_docs", retrieve_relevant_documents)
-    builder.add_node("generate_report", generate_report)
+    builder.add_node(generate_queries)
+    builder.add_node(retrieve_documents)
+    builder.add_node(retrieve_batch)
+    builder.add_edge(START, "generate_queries")
     builder.add_conditional_edges(
-        should_continue_researching,
-        {"continue": "generate_query", "report": "generate_report"},
+        "generate_queries",
+        retrieve_in_parallel,
+        ["retrieve_documents", "retrieve_batch"],
     )
-    builder.set_entry_point("generate_query")
+    builder.add_edge("retrieve_documents", END)
+    builder.add_edge("retrieve_batch", END)
     return builder
+
+
+graph = create_graph().compile()
+graph.name = "ResearcherGraph"
@@ -6,8 +6,7 @@ This module defines the state structures used in the researcher graph.
 from dataclasses import dataclass, field
 from typing import Annotated
 
-from langchain_core.documents import Document
-from shared.state import reduce_docs
+from src.rag_agents.shared.docstore import reduce_doc_refs
 
 
 @dataclass(kw_only=True)
@@ -17,6 +16,13 @@ class QueryState:
     query: str
 
 
+@dataclass(kw_only=True)
+class QueryBatchState:
+    """Private state for the retrieve_batch node in the researcher graph."""
+
+    queries: list[str]
+
+
 @dataclass(kw_only=True)
 class ResearcherState:
     """State of the researcher graph / agent."""
@@ -25,8 +31,11 @@ class ResearcherState:
     """A step in the research plan generated by the retriever agent."""
     queries: list[str] = field(default_factory=list)
     """A list of search queries based on the question that the researcher generates."""
-    documents: Annotated[list[Document], reduce_docs] = field(default_factory=list)
-    """Populated by the retriever. This is a list of documents that the agent can reference."""
+    documents: Annotated[list[str], reduce_doc_refs] = field(default_factory=list)
+    """Populated by the retriever. UUIDs of documents the agent can reference.
+
+    Nodes return Documents; the reducer stores them in the docstore and keeps
+    only their UUIDs here. Use ``resolve_docs`` to load the content."""
 
     # Feel free to add additional attributes to your state as needed.
     # Common examples include retrieved documents, extracted entities, API connections, etc.
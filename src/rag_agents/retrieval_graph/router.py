@@ -0,0 +1,359 @@
+# src/rag_agents/retrieval_graph/router.py
+"""Local query router that runs before the LLM classifier.
+
+Routing a turn to ``more-info``, ``langchain`` or ``general`` costs a full
+query model round-trip, yet most questions are easy to classify. A
+``LocalRouter`` is trained from logged router decisions and answers in
+microseconds; ``analyze_and_route_query`` uses its route when the confidence
+clears ``local_router_threshold`` and defers to the LLM otherwise.
+
+Two routers are provided:
+
+* ``LinearRouter``: multinomial logistic regression over hashed unigram and
+  bigram features. Needs no embedding model.
+* ``CentroidRouter``: nearest class centroid of question embeddings, with a
+  softmax over cosine similarities as confidence.
+
+Other routers subclass ``LocalRouter`` and register a ``kind`` in
+``ROUTER_KINDS`` so ``load_router`` can restore them.
+
+Only the first question of a conversation is routed locally and logged: a
+follow-up such as "what about the second one?" cannot be classified without
+the earlier turns, so the LLM router, which sees them, always handles it.
+
+The loop is: set ``router_log_path`` so LLM decisions are appended to a JSONL
+log (``RouterLog``), train with ``train_router`` and ``save`` the result, then
+point ``local_router_path`` at the saved file.
+"""
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, get_args
+
+import numpy as np
+
+from src.rag_agents.retrieval_graph.state import Router
+from src.shared_retrieval.encoders import (
+    DEFAULT_EMBEDDING_MODEL,
+    HashingEncoder,
+    create_encoder,
+)
+
+logger = logging.getLogger(__name__)
+
+ROUTES: Tuple[str, ...] = get_args(Router.__annotations__["type"])
+
+DEFAULT_THRESHOLD = 0.9
+
+
+class LocalRouter(ABC):
+    """Classifies a question into a route with a confidence."""
+
+    kind = ""
+
+    def __init__(self) -> None:
+        """Initialize an untrained router."""
+        self.routes: List[str] = []
+
+    @abstractmethod
+    def fit(self, questions: Sequence[str], routes: Sequence[str]) -> "LocalRouter":
+        """Train the router on questions and the routes they were given."""
+
+    @abstractmethod
+    def predict_proba(self, question: str) -> Dict[str, float]:
+        """Return the probability of every route for a question."""
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trained parameters as JSON-compatible data."""
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LocalRouter":
+        """Restore a router from ``to_dict`` data."""
+
+    def route(
+        self, question: str, threshold: float = DEFAULT_THRESHOLD
+    ) -> Optional[Router]:
+        """Return the route of a question, or ``None`` if not confident enough."""
+        if not self.routes:
+            return None
+        probabilities = self.predict_proba(question)
+        route, confidence = max(probabilities.items(), key=lambda item: item[1])
+        if confidence < threshold:
+            return None
+        return Router(
+            type=route,  # type: ignore[typeddict-item]
+            logic=(
+                f"A classifier trained on earlier routing decisions classified "
+                f"this as `{route}` with confidence {confidence:.2f}."
+            ),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the router to a JSON file."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"kind": self.kind, **self.to_dict()}, f)
+        os.replace(tmp, path)
+
+
+def _check_training_data(questions: Sequence[str], routes: Sequence[str]) -> List[str]:
+    if len(questions) != len(routes):
+        raise ValueError("questions and routes must have the same length.")
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        raise ValueError(f"Unknown routes {sorted(unknown)}; expected {ROUTES}.")
+    labels = sorted(set(routes))
+    if len(labels) < 2:
+        raise ValueError("Training data needs at least two different routes.")
+    return labels
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class LinearRouter(LocalRouter):
+    """Logistic regression over hashed unigram and bigram features."""
+
+    kind = "linear"
+
+    def __init__(
+        self,
+        dim: int = 1024,
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4,
+    ):
+        """Initialize an untrained router.
+
+        Args:
+            dim: Number of hashed feature buckets.
+            epochs: Full-batch gradient descent steps.
+            learning_rate: Step size of gradient descent.
+            l2: Weight decay.
+        """
+        super().__init__()
+        self.dim = dim
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self._encoder = HashingEncoder(dim)
+        self.weights = np.zeros((dim, 0), dtype=np.float32)
+        self.bias = np.zeros(0, dtype=np.float32)
+
+    def _features(self, questions: Sequence[str]) -> np.ndarray:
+        return np.asarray(self._encoder.embed_documents(list(questions)), np.float32)
+
+    def fit(self, questions: Sequence[str], routes: Sequence[str]) -> "LinearRouter":
+        """Train the router on questions and the routes they were given."""
+        self.routes = _check_training_data(questions, routes)
+        features = self._features(questions)
+        targets = np.zeros((len(routes), len(self.routes)), dtype=np.float32)
+        targets[np.arange(len(routes)), [self.routes.index(r) for r in routes]] = 1.0
+        self.weights = np.zeros((self.dim, len(self.routes)), dtype=np.float32)
+        self.bias = np.zeros(len(self.routes), dtype=np.float32)
+        for _ in range(self.epochs):
+            error = _softmax(features @ self.weights + self.bias) - targets
+            gradient = features.T @ error / len(routes) + self.l2 * self.weights
+            self.weights -= self.learning_rate * gradient
+            self.bias -= self.learning_rate * error.mean(axis=0)
+        return self
+
+    def predict_proba(self, question: str) -> Dict[str, float]:
+        """Return the probability of every route for a question."""
+        logits = self._features([question])[0] @ self.weights + self.bias
+        return dict(zip(self.routes, _softmax(logits).tolist()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trained parameters as JSON-compatible data."""
+        return {
+            "dim": self.dim,
+            "routes": self.routes,
+            "weights": self.weights.tolist(),
+            "bias": self.bias.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LinearRouter":
+        """Restore a router from ``to_dict`` data."""
+        router = cls(dim=data["dim"])
+        router.routes = list(data["routes"])
+        router.weights = np.asarray(data["weights"], dtype=np.float32)
+        router.bias = np.asarray(data["bias"], dtype=np.float32)
+        return router
+
+
+class CentroidRouter(LocalRouter):
+    """Nearest class centroid of question embeddings."""
+
+    kind = "centroid"
+
+    def __init__(
+        self, embedding_model: str = DEFAULT_EMBEDDING_MODEL, temperature: float = 0.05
+    ):
+        """Initialize an untrained router.
+
+        Args:
+            embedding_model: Encoder of the questions, as ``provider/model``.
+            temperature: Softmax temperature over the cosine similarities;
+                lower values give more confident routes.
+        """
+        super().__init__()
+        self.embedding_model = embedding_model
+        self.temperature = temperature
+        self._encoder = create_encoder(embedding_model)
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+
+    def _embed(self, questions: Sequence[str]) -> np.ndarray:
+        vectors = np.asarray(self._encoder.embed_documents(list(questions)), np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def fit(self, questions: Sequence[str], routes: Sequence[str]) -> "CentroidRouter":
+        """Train the router on questions and the routes they were given."""
+        self.routes = _check_training_data(questions, routes)
+        vectors = self._embed(questions)
+        labels = np.asarray(routes)
+        centroids = np.stack([vectors[labels == r].mean(axis=0) for r in self.routes])
+        self.centroids = centroids / np.maximum(
+            np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12
+        )
+        return self
+
+    def predict_proba(self, question: str) -> Dict[str, float]:
+        """Return the probability of every route for a question."""
+        similarities = self.centroids @ self._embed([question])[0]
+        return dict(
+            zip(self.routes, _softmax(similarities / self.temperature).tolist())
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trained parameters as JSON-compatible data."""
+        return {
+            "embedding_model": self.embedding_model,
+            "temperature": self.temperature,
+            "routes": self.routes,
+            "centroids": self.centroids.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CentroidRouter":
+        """Restore a router from ``to_dict`` data."""
+        router = cls(data["embedding_model"], data["temperature"])
+        router.routes = list(data["routes"])
+        router.centroids = np.asarray(data["centroids"], dtype=np.float32)
+        return router
+
+
+ROUTER_KINDS: Dict[str, Type[LocalRouter]] = {
+    LinearRouter.kind: LinearRouter,
+    CentroidRouter.kind: CentroidRouter,
+}
+
+
+def load_router(path: str) -> LocalRouter:
+    """Load a router written by ``LocalRouter.save``."""
+    with open(path) as f:
+        data = json.load(f)
+    kind = data.pop("kind", None)
+    if kind not in ROUTER_KINDS:
+        raise ValueError(f"Unknown router kind {kind!r} in {path}.")
+    return ROUTER_KINDS[kind].from_dict(data)
+
+
+class RouterLog:
+    """Append-only JSONL log of router decisions, used as training data."""
+
+    def __init__(self, path: str):
+        """Initialize the log; the file is created on the first ``append``."""
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, question: str, route: str) -> None:
+        """Record the route the LLM picked for a question."""
+        line = json.dumps({"question": question, "type": route})
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+    def read(self) -> Tuple[List[str], List[str]]:
+        """Return the logged questions and their routes."""
+        questions, routes = [], []
+        if not os.path.exists(self.path):
+            return questions, routes
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    questions.append(record["question"])
+                    routes.append(record["type"])
+        return questions, routes
+
+
+def train_router(
+    log_path: str, kind: str = LinearRouter.kind, **kwargs: Any
+) -> LocalRouter:
+    """Train a router of the given kind on a ``RouterLog``.
+
+    Args:
+        log_path: The JSONL log of router decisions.
+        kind: A key of ``ROUTER_KINDS``.
+        **kwargs: Passed on to the router's constructor.
+    """
+    if kind not in ROUTER_KINDS:
+        raise ValueError(
+            f"Unknown router kind {kind!r}; expected {list(ROUTER_KINDS)}."
+        )
+    questions, routes = RouterLog(log_path).read()
+    return ROUTER_KINDS[kind](**kwargs).fit(questions, routes)
+
+
+_routers: Dict[str, Tuple[Optional[float], Optional[LocalRouter]]] = {}
+_logs: Dict[str, RouterLog] = {}
+_registry_lock = threading.Lock()
+
+
+def get_local_router(path: str) -> Optional[LocalRouter]:
+    """Return the router saved at ``path``, reloading it when the file changes.
+
+    Returns ``None``, so the LLM routes, while the file is missing or cannot
+    be loaded. The problem is logged once per version of the file.
+    """
+    try:
+        mtime: Optional[float] = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    with _registry_lock:
+        cached = _routers.get(path)
+        if cached is None or cached[0] != mtime:
+            router = None
+            if mtime is None:
+                logger.warning("No local router at %s; the LLM routes instead", path)
+            else:
+                try:
+                    router = load_router(path)
+                except (OSError, ValueError, KeyError, TypeError) as error:
+                    logger.warning("Cannot load the local router at %s: %s", path, error)
+            cached = _routers[path] = (mtime, router)
+        return cached[1]
+
+
+def get_router_log(path: str) -> RouterLog:
+    """Return the process-wide log writing to ``path``."""
+    with _registry_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = _logs[path] = RouterLog(path)
+        return log
+
+
+def clear_local_routers() -> None:
+    """Forget every loaded router and open log."""
+    with _registry_lock:
+        _routers.clear()
+        _logs.clear()
@@ -0,0 +1,266 @@
+# src/rag_agents/retrieval_graph/semantic_cache.py
+"""Semantic answer cache for the retrieval graph.
+
+Many questions are rephrasings of ones already answered. ``SemanticCache``
+embeds each answered question into an in-process ``LocalVectorIndex``, and a
+new question whose nearest cached question is similar enough is answered from
+the cache, skipping the router, planner, research and response calls.
+
+An entry is served only if:
+
+* its cosine similarity to the question reaches the threshold,
+* it is younger than the TTL, and
+* the retrieval index has not changed since it was stored. Retrievers over
+  in-process indexes report a version for this (see ``index_version``);
+  for remote backends the TTL bounds staleness, and ``clear`` drops
+  everything after a re-index.
+
+Expired and stale entries are deleted when a lookup meets them.
+
+Answers depend on more than the question: which index, filters and response
+model produced them. ``get_semantic_cache`` therefore keeps a separate cache
+per ``scope``, so an answer built from one tenant's filtered documents is
+never served under another configuration.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.shared_retrieval.cache import CacheStats
+from src.shared_retrieval.encoders import create_encoder
+from src.shared_retrieval.local_index import LocalVectorIndex
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 3600.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Nearest cached questions inspected per lookup, so an expired or stale best
+# match does not hide a valid runner-up.
+LOOKUP_DEPTH = 4
+
+
+@dataclass
+class CachedAnswer:
+    """An answer served from the cache."""
+
+    question: str
+    answer: str
+    documents: List[str] = field(default_factory=list)
+    similarity: float = 1.0
+
+
+def index_version(retriever: Any) -> Optional[str]:
+    """Return a token that changes whenever the retriever's indexes change.
+
+    Wrappers (``retriever``), hybrid sides (``lexical``, ``vector``) and
+    in-process indexes (``index`` with a ``version``) are followed. Returns
+    ``None`` when no index reports a version, as for remote backends.
+    """
+    versions: List[str] = []
+
+    def visit(obj: Any) -> None:
+        index = getattr(obj, "index", None)
+        if index is not None and hasattr(index, "version"):
+            # Snapshot loads replace the index object, so it is part of the
+            # token too.
+            versions.append(f"{id(index)}:{index.version}")
+        for name in ("retriever", "lexical", "vector"):
+            inner = getattr(obj, name, None)
+            if inner is not None:
+                visit(inner)
+
+    visit(retriever)
+    return "|".join(versions) or None
+
+
+class SemanticCache:
+    """Caches answers by the embedding of the question they answer."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            embeddings: Encodes questions.
+            threshold: Cosine similarity a cached question needs to reach.
+            ttl: Seconds an entry stays valid.
+            max_entries: Entries kept; the oldest are evicted first.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._index = LocalVectorIndex()
+        self._entries: OrderedDict[str, Tuple[float, Optional[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached answers."""
+        return len(self._entries)
+
+    def _lookup(
+        self,
+        vector: Sequence[float],
+        version: Optional[str],
+        threshold: Optional[float],
+        ttl: Optional[float],
+    ) -> Optional[CachedAnswer]:
+        threshold = self.threshold if threshold is None else threshold
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            hits = (
+                self._index.search([vector], LOOKUP_DEPTH)[0] if self._entries else []
+            )
+            stale = []
+            found = None
+            for document, similarity in hits:
+                if similarity < threshold:
+                    break
+                entry_id = document.metadata["entry_id"]
+                created_at, entry_version = self._entries[entry_id]
+                if now - created_at >= ttl or entry_version != version:
+                    stale.append(entry_id)
+                    continue
+                found = CachedAnswer(
+                    question=document.page_content,
+                    answer=document.metadata["answer"],
+                    documents=list(document.metadata["documents"]),
+                    similarity=similarity,
+                )
+                break
+            self._remove(stale)
+            if found is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+            return found
+
+    def _store(
+        self,
+        question: str,
+        vector: Sequence[float],
+        answer: str,
+        documents: Sequence[str],
+        version: Optional[str],
+    ) -> None:
+        entry_id = uuid.uuid4().hex
+        document = Document(
+            page_content=question,
+            metadata={
+                "entry_id": entry_id,
+                "answer": answer,
+                "documents": list(documents),
+            },
+        )
+        with self._lock:
+            self._index.add([entry_id], [vector], [document])
+            self._entries[entry_id] = (time.time(), version)
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._remove(list(self._entries)[:overflow])
+
+    def _remove(self, entry_ids: Sequence[str]) -> None:
+        if entry_ids:
+            self._index.delete(entry_ids)
+            for entry_id in entry_ids:
+                self._entries.pop(entry_id, None)
+
+    def lookup(
+        self,
+        question: str,
+        version: Optional[str] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> Optional[CachedAnswer]:
+        """Return the cached answer to the most similar question, if valid.
+
+        Args:
+            question: The question to answer.
+            version: The current ``index_version`` of the retriever.
+            threshold: Override the similarity threshold for this lookup.
+            ttl: Override the TTL for this lookup.
+        """
+        vector = self.embeddings.embed_query(question)
+        return self._lookup(vector, version, threshold, ttl)
+
+    async def alookup(
+        self,
+        question: str,
+        version: Optional[str] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> Optional[CachedAnswer]:
+        """Asynchronously return the cached answer; see ``lookup``."""
+        vector = await self.embeddings.aembed_query(question)
+        return self._lookup(vector, version, threshold, ttl)
+
+    def store(
+        self,
+        question: str,
+        answer: str,
+        documents: Sequence[str] = (),
+        version: Optional[str] = None,
+    ) -> None:
+        """Cache the answer to a question with the UUIDs of its documents."""
+        vector = self.embeddings.embed_query(question)
+        self._store(question, vector, answer, documents, version)
+
+    async def astore(
+        self,
+        question: str,
+        answer: str,
+        documents: Sequence[str] = (),
+        version: Optional[str] = None,
+    ) -> None:
+        """Asynchronously cache an answer; see ``store``."""
+        vector = await self.embeddings.aembed_query(question)
+        self._store(question, vector, answer, documents, version)
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        with self._lock:
+            self._index = LocalVectorIndex()
+            self._entries.clear()
+
+
+_caches: Dict[Tuple[str, str], SemanticCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(embedding_model: str, scope: str = "") -> SemanticCache:
+    """Return the process-wide cache for a scope.
+
+    Args:
+        embedding_model: Encoder of the questions, as ``provider/model``.
+        scope: Identifies everything besides the question an answer depends
+            on, such as the retriever config and the response model. Caches
+            of different scopes share no entries.
+    """
+    key = (embedding_model, scope)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = SemanticCache(create_encoder(embedding_model))
+        return cache
+
+
+def clear_semantic_caches() -> None:
+    """Forget every process-wide cache."""
+    with _caches_lock:
+        _caches.clear()
@@ -7,10 +7,10 @@ definitions for agent state, input state, and router classification schema.
 from dataclasses import dataclass, field
 from typing import Annotated, Literal, TypedDict
 
-from langchain_core.documents import Document
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
-from shared.state import reduce_docs
+
+from src.rag_agents.shared.docstore import reduce_doc_refs
 
 
 # Optional, the InputState is a restricted version of the State that is used to
@@ -64,6 +64,14 @@ class Router(TypedDict):
     type: Literal["more-info", "langchain", "general"]
 
 
+@dataclass(kw_only=True)
+class StepState:
+    """Private state for one conduct_research branch of the retrieval graph."""
+
+    question: str
+    """The research plan step this branch researches."""
+
+
 # This is the primary state of your agent, where you can store any information
 
 
@@ -74,9 +82,17 @@ class AgentState(InputState):
     router: Router = field(default_factory=lambda: Router(type="general", logic=""))
     """The router's classification of the user's query."""
     steps: list[str] = field(default_factory=list)
-    """A list of steps in the research plan."""
-    documents: Annotated[list[Document], reduce_docs] = field(default_factory=list)
-    """Populated by the retriever. This is a list of documents that the agent can reference."""
+    """The steps of the research plan that have not been researched yet."""
+    documents: Annotated[list[str], reduce_doc_refs] = field(default_factory=list)
+    """Populated by the retriever. UUIDs of documents the agent can reference.
+
+    Nodes return Documents; the reducer stores them in the docstore and keeps
+    only their UUIDs here. Use ``resolve_docs`` to load the content."""
+    sources: list[str] = field(default_factory=list)
+    """UUIDs of the documents numbered in the last answer's context, in order;
+    its ``[n]`` citations refer to ``sources[n - 1]``."""
+    answer_cached: bool = False
+    """Whether the last answer was served from the semantic answer cache."""
 
     # Feel free to add additional attributes to your state as needed.
     # Common examples include retrieved documents, extracted entities, API connections, etc.
@@ -0,0 +1,70 @@
+"""Tests for the incremental citation resolver."""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessageChunk
+
+from src.shared_utils.document_utils import format_sources
+
+from .citations import CitationResolver, message_text
+
+DOCUMENTS = [
+    Document(page_content="first", metadata={"uuid": "u1", "source": "a.md"}),
+    Document(page_content="second", metadata={"uuid": "u2", "other": 1}),
+]
+
+
+def _run(resolver, chunks):
+    events = [event for chunk in chunks for event in resolver.feed(chunk)]
+    return events + resolver.flush()
+
+
+def _text(events):
+    return "".join(event["text"] for event in events if event["event"] == "token")
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ["Reducers merge state [1]. Channels [1, 2]", " hold it."],
+        ["Reducers merge state [", "1]. Channels [1", ",", " 2] hold it."],
+        list("Reducers merge state [1]. Channels [1, 2] hold it."),
+    ],
+)
+def test_resolves_markers_across_chunk_boundaries(chunks):
+    resolver = CitationResolver(DOCUMENTS)
+
+    events = _run(resolver, chunks)
+
+    assert _text(events) == "Reducers merge state [1]. Channels [1, 2] hold it."
+    citations = [event for event in events if event["event"] == "citation"]
+    assert [event["number"] for event in citations] == [1, 1, 2]
+    assert citations[0]["document"] == {"uuid": "u1", "source": "a.md"}
+    assert citations[2]["document"] == {"uuid": "u2"}
+    # Each citation directly follows the token that closes its marker.
+    first = events.index(citations[0])
+    assert events[first - 1]["text"].endswith("[1]")
+    assert list(resolver.cited) == [1, 2]
+
+
+def test_passes_through_text_that_is_not_a_citation():
+    resolver = CitationResolver(DOCUMENTS)
+
+    events = _run(resolver, ["see [7] and [link", "](x) and a[0] or [", "2"])
+
+    assert _text(events) == "see [7] and [link](x) and a[0] or [2"
+    assert not [event for event in events if event["event"] == "citation"]
+
+
+def test_emits_plain_text_immediately():
+    resolver = CitationResolver(DOCUMENTS)
+    assert resolver.feed("Hello") == [{"event": "token", "text": "Hello"}]
+    assert resolver.feed(" [") == [{"event": "token", "text": " "}]
+
+
+def test_helpers():
+    assert format_sources(DOCUMENTS) == "[1] first\n\n[2] second"
+    blocks = AIMessageChunk(
+        content=[{"type": "text", "text": "a"}, {"type": "tool_use", "id": "t"}, "b"]
+    )
+    assert message_text(blocks) == "ab"
@@ -0,0 +1,323 @@
+"""Tests for the research fan-out and answer streaming of the retrieval graph."""
+
+import asyncio
+import importlib
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.rag_agents.retrieval_graph.router import (
+    LinearRouter,
+    RouterLog,
+    clear_local_routers,
+)
+from src.rag_agents.retrieval_graph.semantic_cache import clear_semantic_caches
+from src.rag_agents.shared.docstore import InMemoryDocStore, resolve_docs, set_docstore
+
+graph_module = importlib.import_module("src.rag_agents.retrieval_graph.graph")
+researcher_module = importlib.import_module(
+    "src.rag_agents.retrieval_graph.researcher_graph.graph"
+)
+
+PLAN = ["step a", "step b", "step c"]
+
+ANSWER = ["Reducers merge ", "state [", "1]. They run per ", "key [2", "]."]
+
+
+class FakeModel:
+    """Chat model answering every structured output schema the graph uses."""
+
+    def __init__(self, schema=None):
+        self.schema = schema
+
+    def with_structured_output(self, schema):
+        return FakeModel(schema)
+
+    async def ainvoke(self, messages, config=None):
+        name = getattr(self.schema, "__name__", None)
+        if name == "Router":
+            return {"type": "langchain", "logic": "about langchain"}
+        if name == "Plan":
+            return {"steps": PLAN}
+        if name == "Response":
+            question = messages[-1]["content"]
+            return {"queries": [f"{question} q1", f"{question} q2"]}
+        raise AssertionError("Responses must be streamed.")
+
+    async def astream(self, messages, config=None):
+        for text in ANSWER:
+            yield AIMessageChunk(content=text)
+
+
+class SlowRetriever:
+    """Retriever that records how many searches overlap."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.queries = []
+
+    async def aget_relevant_documents(self, query):
+        self.queries.append(query)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return [Document(page_content=f"about {query}")]
+
+
+class BatchRetriever(SlowRetriever):
+    """Retriever with a native multi-query search."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def aget_relevant_documents_batch(self, queries):
+        self.batches.append(list(queries))
+        return [Document(page_content=f"about {query}") for query in queries]
+
+
+@pytest.fixture
+def retriever(monkeypatch):
+    retriever = SlowRetriever()
+    for module in (graph_module, researcher_module):
+        monkeypatch.setattr(module, "load_chat_model", lambda name: FakeModel())
+    monkeypatch.setattr(researcher_module, "make_retriever", lambda config: retriever)
+    monkeypatch.setattr(graph_module, "make_retriever", lambda config: retriever)
+    set_docstore(InMemoryDocStore())
+    yield retriever
+    set_docstore(None)
+    clear_semantic_caches()
+    clear_local_routers()
+
+
+def _run(concurrency):
+    return asyncio.run(
+        graph_module.graph.ainvoke(
+            {"messages": [("user", "how do reducers work?")]},
+            {"configurable": {"research_concurrency": concurrency}},
+        )
+    )
+
+
+def test_plan_steps_and_queries_run_in_parallel(retriever):
+    result = _run(concurrency=4)
+
+    assert retriever.peak == len(PLAN) * 2
+    assert sorted(doc.page_content for doc in resolve_docs(result["documents"])) == [
+        f"about {step} {q}" for step in PLAN for q in ("q1", "q2")
+    ]
+    assert result["steps"] == []
+    assert result["messages"][-1] == AIMessage(
+        content="".join(ANSWER), id=result["messages"][-1].id
+    )
+
+
+def test_concurrency_limit_caps_the_fan_out(retriever):
+    result = _run(concurrency=1)
+
+    assert retriever.peak == 1
+    assert len(retriever.queries) == len(PLAN) * 2
+    assert len(result["documents"]) == len(PLAN) * 2
+
+
+def test_native_batch_search_gets_each_steps_queries_at_once(retriever, monkeypatch):
+    batch_retriever = BatchRetriever()
+    monkeypatch.setattr(
+        researcher_module, "make_retriever", lambda config: batch_retriever
+    )
+
+    result = _run(concurrency=4)
+
+    assert sorted(batch_retriever.batches) == [
+        [f"{step} q1", f"{step} q2"] for step in PLAN
+    ]
+    assert batch_retriever.queries == []
+    assert len(result["documents"]) == len(PLAN) * 2
+
+
+def test_streams_tokens_and_resolves_citations(retriever):
+    async def stream():
+        return [
+            event
+            async for event in graph_module.graph.astream(
+                {"messages": [("user", "how do reducers work?")]},
+                stream_mode="custom",
+            )
+        ]
+
+    events = asyncio.run(stream())
+
+    tokens = [event["text"] for event in events if event["event"] == "token"]
+    assert "".join(tokens) == "".join(ANSWER)
+    # Tokens arrive as the model streams them, not as one final message.
+    assert len(tokens) > 1
+    citations = [event for event in events if event["event"] == "citation"]
+    assert [event["number"] for event in citations] == [1, 2]
+    assert all(event["document"]["uuid"] for event in citations)
+
+
+def test_answer_cache_skips_research_for_rephrased_questions(retriever, monkeypatch):
+    config = {
+        "configurable": {
+            "answer_cache": True,
+            "answer_cache_threshold": 0.8,
+            "embedding_model": "local/hashing",
+        }
+    }
+
+    async def ask(question):
+        events, state = [], None
+        async for mode, chunk in graph_module.graph.astream(
+            {"messages": [("user", question)]},
+            config,
+            stream_mode=["custom", "values"],
+        ):
+            if mode == "custom":
+                events.append(chunk)
+            else:
+                state = chunk
+        return events, state
+
+    first_events, first = asyncio.run(ask("How do reducers work?"))
+    searches = len(retriever.queries)
+
+    def no_model(name):
+        raise AssertionError("Cached answers must not call a model.")
+
+    monkeypatch.setattr(graph_module, "load_chat_model", no_model)
+    events, result = asyncio.run(ask("how do reducers work"))
+
+    assert len(retriever.queries) == searches
+    assert result["answer_cached"] is True
+    assert result["messages"][-1].content == "".join(ANSWER)
+    assert result["sources"] == first["sources"]
+    citations = [e for e in events if e["event"] == "citation"]
+    assert [e["number"] for e in citations] == [1, 2]
+    assert citations == [e for e in first_events if e["event"] == "citation"]
+
+
+def test_answer_cache_misses_when_sources_were_evicted(retriever):
+    config = {
+        "configurable": {"answer_cache": True, "embedding_model": "local/hashing"}
+    }
+
+    def ask():
+        return asyncio.run(
+            graph_module.graph.ainvoke(
+                {"messages": [("user", "how do reducers work?")]}, config
+            )
+        )
+
+    ask()
+    searches = len(retriever.queries)
+    # A fresh store has lost every document the cached answer cites.
+    set_docstore(InMemoryDocStore())
+    result = ask()
+
+    assert result["answer_cached"] is False
+    assert len(retriever.queries) == 2 * searches
+    assert len(resolve_docs(result["sources"])) == len(result["sources"])
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {"search_kwargs": {"filter": {"tenant": "b"}}},
+        {"response_model": "anthropic/another-model"},
+    ],
+)
+def test_answer_cache_is_scoped_by_retriever_and_model(retriever, override):
+    configurable = {
+        "answer_cache": True,
+        "embedding_model": "local/hashing",
+        "search_kwargs": {"filter": {"tenant": "a"}},
+    }
+
+    def ask(configurable):
+        return asyncio.run(
+            graph_module.graph.ainvoke(
+                {"messages": [("user", "how do reducers work?")]},
+                {"configurable": configurable},
+            )
+        )
+
+    ask(configurable)
+    assert ask(configurable)["answer_cached"] is True
+    assert ask({**configurable, **override})["answer_cached"] is False
+
+
+def test_confident_local_router_skips_the_llm_router(retriever, tmp_path, monkeypatch):
+    routed = []
+    ainvoke = FakeModel.ainvoke
+
+    async def counting_ainvoke(self, messages, config=None):
+        routed.append(getattr(self.schema, "__name__", None))
+        return await ainvoke(self, messages, config)
+
+    monkeypatch.setattr(FakeModel, "ainvoke", counting_ainvoke)
+    router_path = str(tmp_path / "router.json")
+    LinearRouter().fit(
+        ["how do reducers work?", "tell me a joke", "it is broken"],
+        ["langchain", "general", "more-info"],
+    ).save(router_path)
+    log_path = str(tmp_path / "router.jsonl")
+
+    def run(threshold):
+        return asyncio.run(
+            graph_module.graph.ainvoke(
+                {"messages": [("user", "how do reducers work?")]},
+                {
+                    "configurable": {
+                        "local_router_path": router_path,
+                        "local_router_threshold": threshold,
+                        "router_log_path": log_path,
+                    }
+                },
+            )
+        )
+
+    result = run(threshold=0.5)
+    assert "Router" not in routed
+    assert result["router"]["type"] == "langchain"
+    assert RouterLog(log_path).read() == ([], [])
+
+    run(threshold=1.0)
+    assert routed.count("Router") == 1
+    assert RouterLog(log_path).read() == (["how do reducers work?"], ["langchain"])
+
+    # Follow-ups depend on earlier turns: always the LLM, never logged.
+    asyncio.run(
+        graph_module.graph.ainvoke(
+            {
+                "messages": [
+                    ("user", "tell me a joke"),
+                    ("assistant", "No."),
+                    ("user", "how do reducers work?"),
+                ]
+            },
+            {
+                "configurable": {
+                    "local_router_path": router_path,
+                    "local_router_threshold": 0.5,
+                    "router_log_path": log_path,
+                }
+            },
+        )
+    )
+    assert routed.count("Router") == 2
+    assert len(RouterLog(log_path).read()[0]) == 1
+
+
+def test_missing_local_router_falls_back_to_the_llm(retriever, tmp_path):
+    result = asyncio.run(
+        graph_module.graph.ainvoke(
+            {"messages": [("user", "how do reducers work?")]},
+            {"configurable": {"local_router_path": str(tmp_path / "none.json")}},
+        )
+    )
+
+    assert result["router"] == {"type": "langchain", "logic": "about langchain"}
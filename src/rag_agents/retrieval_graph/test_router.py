@@ -0,0 +1,125 @@
+"""Tests for the local query router."""
+
+import os
+
+import pytest
+
+from src.rag_agents.retrieval_graph.router import (
+    CentroidRouter,
+    LinearRouter,
+    LocalRouter,
+    RouterLog,
+    clear_local_routers,
+    get_local_router,
+    load_router,
+    train_router,
+)
+
+LOG = [
+    ("how do I use a retriever in langchain", "langchain"),
+    ("how do I stream tokens from a langchain chat model", "langchain"),
+    ("what is a langchain output parser", "langchain"),
+    ("how do langchain agents call tools", "langchain"),
+    ("my code is broken", "more-info"),
+    ("it is not working, please help", "more-info"),
+    ("I get an error", "more-info"),
+    ("something is broken and I get an error", "more-info"),
+    ("what is the capital of france", "general"),
+    ("tell me a joke", "general"),
+    ("what is the weather like today", "general"),
+    ("who won the football game", "general"),
+]
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    log = RouterLog(str(tmp_path / "router.jsonl"))
+    for question, route in LOG:
+        log.append(question, route)
+    yield log.path
+    clear_local_routers()
+
+
+@pytest.mark.parametrize("router_class", [LinearRouter, CentroidRouter])
+def test_routes_questions_like_the_logged_ones(router_class):
+    router = router_class().fit(*zip(*LOG))
+
+    assert router.route("how do I use a langchain retriever", 0.0)["type"] == (
+        "langchain"
+    )
+    assert router.route("my code is not working", 0.0)["type"] == "more-info"
+    assert router.route("tell me a joke about france", 0.0)["type"] == "general"
+
+
+def test_defers_below_the_threshold():
+    router = LinearRouter().fit(*zip(*LOG))
+
+    assert router.route("how do I use a langchain retriever", 0.5) is not None
+    assert router.route("how do I use a langchain retriever", 1.0) is None
+    assert LinearRouter().route("anything", 0.0) is None
+
+
+def test_incomplete_routers_cannot_be_instantiated():
+    class Incomplete(LocalRouter):
+        def fit(self, questions, routes):
+            return self
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_rejects_unknown_routes():
+    with pytest.raises(ValueError, match="Unknown routes"):
+        LinearRouter().fit(["a", "b"], ["langchain", "weather"])
+
+
+@pytest.mark.parametrize("kind", ["linear", "centroid"])
+def test_save_and_load_round_trip(log_path, tmp_path, kind):
+    router = train_router(log_path, kind)
+    path = str(tmp_path / "router.json")
+    router.save(path)
+
+    loaded = load_router(path)
+
+    assert type(loaded) is type(router)
+    question = "how do I use a langchain retriever"
+    assert loaded.predict_proba(question) == pytest.approx(
+        router.predict_proba(question)
+    )
+
+
+def test_get_local_router_reloads_changed_files(log_path, tmp_path):
+    path = str(tmp_path / "router.json")
+    train_router(log_path).save(path)
+    first = get_local_router(path)
+    assert get_local_router(path) is first
+
+    train_router(log_path, "centroid").save(path)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+    assert isinstance(get_local_router(path), CentroidRouter)
+
+
+def test_get_local_router_falls_back_while_the_file_is_unusable(
+    log_path, tmp_path, caplog
+):
+    path = str(tmp_path / "router.json")
+
+    assert get_local_router(path) is None
+    assert get_local_router(path) is None
+    (tmp_path / "router.json").write_text("{not json")
+    assert get_local_router(path) is None
+    assert len(caplog.records) == 2
+
+    train_router(log_path).save(path)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+    assert isinstance(get_local_router(path), LinearRouter)
+
+
+def test_log_reads_back_decisions(log_path):
+    questions, routes = RouterLog(log_path).read()
+
+    assert list(zip(questions, routes)) == LOG
+    assert RouterLog(log_path + ".missing").read() == ([], [])
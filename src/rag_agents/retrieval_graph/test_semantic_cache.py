@@ -0,0 +1,77 @@
+"""Tests for the semantic answer cache."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from src.rag_agents.retrieval_graph.semantic_cache import SemanticCache, index_version
+from src.shared_retrieval.encoders import HashingEncoder
+from src.shared_retrieval.local_index import LocalVectorIndex
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(HashingEncoder(), threshold=0.8, ttl=60.0)
+
+
+def test_serves_answers_to_rephrased_questions(cache):
+    cache.store("How do reducers work?", "They merge state [1].", ["doc-1"])
+
+    hit = cache.lookup("how do reducers work")
+
+    assert hit.answer == "They merge state [1]."
+    assert hit.documents == ["doc-1"]
+    assert hit.similarity >= 0.8
+    assert cache.lookup("What is a vector store?") is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_expired_entries_are_dropped(cache, monkeypatch):
+    cache.store("How do reducers work?", "answer")
+    later = time.time() + 61.0
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.lookup("How do reducers work?") is None
+    assert len(cache) == 0
+
+
+def test_entries_of_another_index_version_are_stale(cache):
+    cache.store("How do reducers work?", "old answer", version="v1")
+
+    assert cache.lookup("How do reducers work?", version="v2") is None
+    assert len(cache) == 0
+    cache.store("How do reducers work?", "new answer", version="v2")
+    assert cache.lookup("How do reducers work?", version="v2").answer == "new answer"
+
+
+def test_oldest_entries_are_evicted():
+    cache = SemanticCache(HashingEncoder(), max_entries=2)
+    for question in ("first question", "second question", "third question"):
+        cache.store(question, question.upper())
+
+    assert len(cache) == 2
+    assert cache.lookup("first question") is None
+    assert cache.lookup("third question").answer == "THIRD QUESTION"
+
+
+def test_async_lookup_and_store(cache):
+    async def run():
+        await cache.astore("How do reducers work?", "answer")
+        return await cache.alookup("How do reducers work?")
+
+    assert asyncio.run(run()).answer == "answer"
+
+
+def test_index_version_follows_wrapped_indexes():
+    index = LocalVectorIndex()
+    retriever = SimpleNamespace(retriever=SimpleNamespace(index=index))
+    before = index_version(retriever)
+
+    index.add(["a"], [[1.0, 0.0]], [Document(page_content="a")])
+
+    assert before is not None
+    assert index_version(retriever) != before
+    assert index_version(SimpleNamespace()) is None
@@ -0,0 +1,305 @@
+"""Content-addressed document store for graph state.
+
+Graph state that holds whole ``Document`` objects is serialized again by the
+checkpointer at every super-step. With the reducer in this module, the state
+holds only document UUIDs, the same ``_generate_uuid`` content hashes used by
+``reduce_docs``. The content is written once to a ``DocStore``, and nodes
+resolve references to documents only when they need the text.
+
+The process-wide store returned by ``get_docstore`` is SQLite-backed when the
+``DOCSTORE_PATH`` environment variable is set and in-memory otherwise. Use a
+file whenever checkpoints must outlive the process or be resumed by another
+worker. The in-memory store keeps at most ``DEFAULT_MAX_DOCUMENTS``, evicting
+the least recently used, so a long-running server should set
+``DOCSTORE_PATH``: references to evicted documents no longer resolve, and
+``resolve_docs`` raises ``MissingDocumentsError`` for them rather than
+answering from fewer documents than were retrieved.
+"""
+
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Union
+
+from langchain_core.documents import Document
+
+from src.rag_agents.shared.state import SharedSequence, _build_document, _item_id
+
+logger = logging.getLogger(__name__)
+
+# Documents kept by the default in-memory store.
+DEFAULT_MAX_DOCUMENTS = 100_000
+
+
+class MissingDocumentsError(KeyError):
+    """Raised when document references are not in the docstore."""
+
+    def __init__(self, ids: Sequence[str]):
+        """Initialize the error with the missing references."""
+        self.ids = list(ids)
+        super().__init__(
+            f"{len(self.ids)} document references not found in the docstore, "
+            "e.g. evicted from an in-memory store; set DOCSTORE_PATH to keep "
+            f"them: {self.ids[:5]}"
+        )
+
+
+class DocStore(ABC):
+    """Maps document UUIDs to documents; subclasses provide the storage."""
+
+    @abstractmethod
+    def put_many(self, documents: Sequence[Document]) -> None:
+        """Store documents under their ``metadata["uuid"]``."""
+
+    @abstractmethod
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Document]:
+        """Return the stored documents for the ids that are present."""
+
+    def add(self, items: Iterable[Union[Document, Dict[str, Any]]]) -> List[str]:
+        """Store documents or document dicts and return their UUIDs.
+
+        Items without a UUID are stamped with the ``_generate_uuid`` hash of
+        their content, as ``reduce_docs`` does.
+        """
+        documents = [_build_document(_item_id(item), item) for item in items]
+        self.put_many(documents)
+        return [document.metadata["uuid"] for document in documents]
+
+
+class InMemoryDocStore(DocStore):
+    """Docstore held in process memory.
+
+    With a ``maxsize`` the least recently stored or read documents are
+    evicted first. Checkpoints and the answer cache may still refer to
+    evicted documents, which ``resolve_docs`` then reports as missing, so use
+    ``SQLiteDocStore`` in production.
+    """
+
+    def __init__(self, maxsize: Optional[int] = DEFAULT_MAX_DOCUMENTS):
+        """Initialize an empty store holding at most ``maxsize`` documents."""
+        self.maxsize = maxsize
+        self._documents: OrderedDict[str, Document] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of stored documents."""
+        return len(self._documents)
+
+    def put_many(self, documents: Sequence[Document]) -> None:
+        """Store documents under their ``metadata["uuid"]``."""
+        with self._lock:
+            for document in documents:
+                doc_id = document.metadata["uuid"]
+                self._documents.setdefault(doc_id, document)
+                self._documents.move_to_end(doc_id)
+            if self.maxsize is not None:
+                while len(self._documents) > self.maxsize:
+                    self._documents.popitem(last=False)
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Document]:
+        """Return the stored documents for the ids that are present."""
+        with self._lock:
+            found = {
+                doc_id: self._documents[doc_id]
+                for doc_id in ids
+                if doc_id in self._documents
+            }
+            for doc_id in found:
+                self._documents.move_to_end(doc_id)
+            return found
+
+
+class SQLiteDocStore(DocStore):
+    """Docstore persisted in a SQLite file.
+
+    Content is addressed by hash, so rows are immutable once written and
+    storing a document that is already present is a no-op.
+    """
+
+    # SQLite limits the number of bound parameters per statement.
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        """Open (or create) the store at ``path``."""
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(uuid TEXT PRIMARY KEY, page_content TEXT, metadata TEXT)"
+            )
+
+    def __len__(self) -> int:
+        """Return the number of stored documents."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def put_many(self, documents: Sequence[Document]) -> None:
+        """Store documents under their ``metadata["uuid"]``."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO documents VALUES (?, ?, ?)",
+                [
+                    (
+                        document.metadata["uuid"],
+                        document.page_content,
+                        json.dumps(document.metadata, default=str),
+                    )
+                    for document in documents
+                ],
+            )
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Document]:
+        """Return the stored documents for the ids that are present."""
+        found: Dict[str, Document] = {}
+        ids = list(ids)
+        with self._lock:
+            for start in range(0, len(ids), self._LOOKUP_CHUNK):
+                chunk = ids[start : start + self._LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT uuid, page_content, metadata FROM documents WHERE uuid IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for doc_id, page_content, metadata in rows:
+                    found[doc_id] = Document(
+                        page_content=page_content, metadata=json.loads(metadata)
+                    )
+        return found
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+_docstore: Optional[DocStore] = None
+_docstore_lock = threading.Lock()
+
+
+def get_docstore() -> DocStore:
+    """Return the process-wide docstore, creating it on first use."""
+    global _docstore
+    with _docstore_lock:
+        if _docstore is None:
+            path = os.getenv("DOCSTORE_PATH")
+            _docstore = SQLiteDocStore(path) if path else InMemoryDocStore()
+        return _docstore
+
+
+def set_docstore(store: Optional[DocStore]) -> None:
+    """Replace the process-wide docstore; ``None`` resets it to the default."""
+    global _docstore
+    with _docstore_lock:
+        _docstore = store
+
+
+class DocumentRefs(SharedSequence):
+    """Insertion-ordered sequence of unique document UUIDs.
+
+    Membership is checked against the position index of a ``SharedSequence``
+    log, and ``copy.copy`` shares the log, so merging ``n`` references into
+    a copy costs O(n) however many are already held. Add references with
+    ``append`` or ``extend``.
+    """
+
+    __slots__ = ()
+
+    _field = "refs"
+
+    def __init__(self, refs: Iterable[str] = ()):
+        """Initialize the sequence with ``refs``, dropping repeats."""
+        super().__init__()
+        self.extend(refs)
+
+    def __contains__(self, ref: object) -> bool:
+        """Return whether ``ref`` is held."""
+        return self._position(ref) is not None
+
+    def extend(self, refs: Iterable[str]) -> None:
+        """Append each reference that is not held yet."""
+        for ref in refs:
+            if self._position(ref) is None:
+                self._append(ref, ref)
+
+    def append(self, ref: str) -> None:
+        """Append ``ref`` unless it is already held."""
+        self.extend((ref,))
+
+
+def reduce_doc_refs(
+    existing: Optional[List[str]],
+    new: Union[
+        List[Document],
+        List[Dict[str, Any]],
+        List[str],
+        Document,
+        str,
+        Literal["delete"],
+    ],
+) -> DocumentRefs:
+    """Store new documents in the docstore and merge their UUIDs into the state.
+
+    Documents and document dicts are written to ``get_docstore()`` and
+    replaced by their UUIDs. Strings are taken to be UUIDs that are already
+    stored, such as the references a subgraph returns to its parent. The
+    literal ``"delete"`` clears the references; the documents stay in the
+    store, where other threads may still refer to them. The result is always
+    a new ``DocumentRefs``: the existing one may already be held by a
+    checkpoint or a streamed snapshot, so it is never extended in place. The
+    copy shares its references (see ``SharedSequence``), so a merge costs
+    O(new) however many references are already held.
+
+    Args:
+        existing: The references in the state, if any.
+        new: Documents, dicts or UUIDs to merge, or the literal "delete".
+    """
+    if new == "delete":
+        return DocumentRefs()
+    refs = (
+        copy.copy(existing)
+        if isinstance(existing, DocumentRefs)
+        else DocumentRefs(existing or ())
+    )
+    items = new if isinstance(new, list) else [new]
+    documents = [item for item in items if not isinstance(item, str)]
+    stored = iter(get_docstore().add(documents)) if documents else iter(())
+    # Keep the caller's order across mixed inputs.
+    refs.extend(item if isinstance(item, str) else next(stored) for item in items)
+    return refs
+
+
+def resolve_docs(
+    refs: Sequence[Union[str, Document]],
+    store: Optional[DocStore] = None,
+    missing: Literal["raise", "skip"] = "raise",
+) -> List[Document]:
+    """Return the documents behind a list of references.
+
+    Documents in ``refs`` are passed through, so nodes work with either
+    state layout.
+
+    Args:
+        refs: UUIDs or documents.
+        store: The docstore to read; defaults to ``get_docstore()``.
+        missing: ``"raise"`` raises ``MissingDocumentsError`` if any reference
+            is not in the store; ``"skip"`` leaves those references out.
+    """
+    store = store or get_docstore()
+    ids = [ref for ref in refs if isinstance(ref, str)]
+    found = store.get_many(list(dict.fromkeys(ids))) if ids else {}
+    unknown = [ref for ref in dict.fromkeys(ids) if ref not in found]
+    if unknown:
+        if missing == "raise":
+            raise MissingDocumentsError(unknown)
+        logger.warning("%d document references not found in the docstore", len(unknown))
+    return [
+        ref if isinstance(ref, Document) else found[ref]
+        for ref in refs
+        if not isinstance(ref, str) or ref in found
+    ]
@@ -1,2 +1,40 @@
 # src/rag_agents/shared/retrieval.py
-"""Shared retrieval logic."""
+"""Shared retrieval logic.
+
+Graph nodes get their retriever from ``make_retriever``, which maps the graph
+configuration to a retriever-factory config and returns the process-wide
+instance from the registry, so clients and encoders are built once and
+shared by every concurrent branch.
+"""
+
+from typing import Any, Dict
+
+from langchain_core.runnables import RunnableConfig
+
+from src.rag_agents.shared.configuration import BaseConfiguration
+from src.shared_retrieval.base import BaseRetriever
+from src.shared_retrieval.registry import get_retriever
+
+# Retriever providers named differently in BaseConfiguration and the factory.
+PROVIDER_TYPES = {"elastic": "elasticsearch"}
+
+
+def retriever_config(configuration: BaseConfiguration) -> Dict[str, Any]:
+    """Return the retriever-factory config matching a graph configuration."""
+    provider = configuration.retriever_provider
+    config: Dict[str, Any] = {
+        "type": PROVIDER_TYPES.get(provider, provider),
+        "embedding_model": configuration.embedding_model,
+    }
+    index_name = getattr(configuration, "index_name", None)
+    if index_name:
+        config["index_name"] = index_name
+    if configuration.search_kwargs:
+        config["search_kwargs"] = configuration.search_kwargs
+    return config
+
+
+def make_retriever(config: RunnableConfig) -> BaseRetriever:
+    """Return the shared retriever for the configuration in ``config``."""
+    configuration = BaseConfiguration.from_runnable_config(config)
+    return get_retriever(retriever_config(configuration))
@@ -1,8 +1,11 @@
 """Shared functions for state management."""
 
+import copy
 import hashlib
 import uuid
-from typing import Any, Literal, Optional, Union
+from collections.abc import Sequence
+from itertools import islice
+from typing import Any, Iterable, Iterator, Literal, Optional, Union
 
 from langchain_core.documents import Document
 
@@ -79,3 +82,266 @@ def reduce_docs(
                     existing_ids.add(item_id)
 
     return existing_list + new_list
+
+
+def _item_id(item: Union[Document, dict[str, Any], str]) -> str:
+    """Return the UUID an item is stored under, as ``reduce_docs`` derives it."""
+    if isinstance(item, str):
+        return _generate_uuid(item)
+    if isinstance(item, dict):
+        metadata = item.get("metadata", {})
+        return metadata.get("uuid") or _generate_uuid(item.get("page_content", ""))
+    return item.metadata.get("uuid") or _generate_uuid(item.page_content)
+
+
+def _build_document(
+    item_id: str, item: Union[Document, dict[str, Any], str]
+) -> Document:
+    if isinstance(item, str):
+        return Document(page_content=item, metadata={"uuid": item_id})
+    if isinstance(item, dict):
+        metadata = item.get("metadata", {})
+        return Document(**{**item, "metadata": {**metadata, "uuid": item_id}})
+    if item.metadata.get("uuid") == item_id:
+        return item
+    # Stamp the UUID on a shallow copy so the caller's document is untouched.
+    return Document(
+        id=item.id,
+        page_content=item.page_content,
+        metadata={**item.metadata, "uuid": item_id},
+    )
+
+
+class _AppendLog:
+    """Append-only items and their positions by key, shared between views."""
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self, items: Iterable[Any] = (), key: Any = None) -> None:
+        self.items: list = list(items)
+        self.positions: dict = (
+            {key(item): i for i, item in enumerate(self.items)} if key else {}
+        )
+
+
+class SharedSequence(Sequence):
+    """A read-only view of the first ``len(self)`` items of an append-only log.
+
+    ``copy.copy`` returns a view of the same log, so copying is O(1). A view
+    appends in place while it is the longest view of its log; the items it
+    adds are past the end of every other view and invisible to them. A view
+    that is shorter than its log appends to a private copy of its items
+    instead, so no view ever sees another's appends.
+
+    Subclasses define ``_key`` for the position index and ``_field``, the
+    constructor argument taking the items.
+    """
+
+    __slots__ = ("_log", "_length")
+
+    _field = "items"
+
+    def __init__(self) -> None:
+        """Initialize an empty view with its own log."""
+        self._log = _AppendLog()
+        self._length = 0
+
+    @staticmethod
+    def _key(item: Any) -> Any:
+        return item
+
+    def __len__(self) -> int:
+        """Return the number of items in the view."""
+        return self._length
+
+    def __getitem__(self, index: Any) -> Any:
+        """Return an item, or a list for a slice."""
+        if isinstance(index, slice):
+            return self._log.items[: self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._log.items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the items in the view."""
+        return islice(self._log.items, self._length)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare item by item with another view, a list or a tuple."""
+        if not isinstance(other, (SharedSequence, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the items as a constructor call."""
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def __copy__(self) -> Any:
+        """Return a view of the same log, without copying any items."""
+        copied = type(self).__new__(type(self))
+        copied._log = self._log
+        copied._length = self._length
+        return copied
+
+    def __reduce__(self) -> tuple:
+        """Pickle as the list of items; the log is rebuilt on load."""
+        return (type(self), (list(self),))
+
+    def _asdict(self) -> dict:
+        # ``JsonPlusSerializer`` writes objects with ``_asdict`` as their
+        # constructor arguments, which keeps views serializable by the
+        # default checkpointer.
+        return {self._field: list(self)}
+
+    def _position(self, key: Any) -> Optional[int]:
+        position = self._log.positions.get(key)
+        return None if position is None or position >= self._length else position
+
+    def _append(self, key: Any, item: Any) -> None:
+        log = self._log
+        if self._length != len(log.items):
+            # Another view of the log has appended past this one.
+            self._log = log = _AppendLog(log.items[: self._length], self._key)
+        log.positions[key] = self._length
+        log.items.append(item)
+        self._length += 1
+
+    def _replace(self, items: list) -> None:
+        self._log = _AppendLog(items, self._key)
+        self._length = len(items)
+
+
+class DocumentIndex(SharedSequence):
+    """A sequence of documents that also indexes them by ``metadata["uuid"]``.
+
+    Documents keep their insertion order and each UUID appears at most once.
+    ``add`` is O(1) and ``copy.copy`` shares the stored documents (see
+    ``SharedSequence``), so a copy with ``n`` new documents costs O(n)
+    regardless of how many are already stored. The list methods that reorder
+    or remove items rebuild the index in O(len(self)).
+    """
+
+    __slots__ = ()
+
+    _field = "documents"
+
+    def __init__(self, documents: Iterable[Document] = ()):
+        """Initialize the index with ``documents``, dropping repeated UUIDs."""
+        super().__init__()
+        self.extend(documents)
+
+    @staticmethod
+    def _key(item: Document) -> str:
+        return item.metadata["uuid"]
+
+    def __contains__(self, item: object) -> bool:
+        """Return whether a UUID (or a document's UUID) is stored."""
+        if isinstance(item, str):
+            return self._position(item) is not None
+        if isinstance(item, Document):
+            return self._position(item.metadata.get("uuid")) is not None
+        return super().__contains__(item)
+
+    def get(self, item_id: str) -> Optional[Document]:
+        """Return the document stored under ``item_id``, if any."""
+        position = self._position(item_id)
+        return None if position is None else self._log.items[position]
+
+    def add(self, item: Union[Document, dict[str, Any], str]) -> bool:
+        """Append an item unless its UUID is already stored.
+
+        Strings and dicts are converted to Documents the way ``reduce_docs``
+        does. A Document without a UUID is stored as a copy stamped with one;
+        any other Document is stored as is.
+
+        Returns:
+            Whether the item was added.
+        """
+        item_id = _item_id(item)
+        if self._position(item_id) is not None:
+            return False
+        self._append(item_id, _build_document(item_id, item))
+        return True
+
+    def append(self, item: Union[Document, dict[str, Any], str]) -> None:
+        """Append an item unless its UUID is already stored."""
+        self.add(item)
+
+    def extend(self, items: Iterable[Union[Document, dict[str, Any], str]]) -> None:
+        """Append each item whose UUID is not stored yet."""
+        for item in items:
+            self.add(item)
+
+    def __iadd__(
+        self, items: Iterable[Union[Document, dict[str, Any], str]]
+    ) -> "DocumentIndex":
+        """Append each item whose UUID is not stored yet."""
+        self.extend(items)
+        return self
+
+    def _rebuilding(name: str):
+        def method(self, *args: Any, **kwargs: Any) -> Any:
+            documents = list(self)
+            result = getattr(documents, name)(*args, **kwargs)
+            self._replace(documents)
+            return result
+
+        method.__name__ = name
+        method.__doc__ = f"Same as ``list.{name}``; rebuilds the UUID index."
+        return method
+
+    insert = _rebuilding("insert")
+    pop = _rebuilding("pop")
+    remove = _rebuilding("remove")
+    clear = _rebuilding("clear")
+    sort = _rebuilding("sort")
+    reverse = _rebuilding("reverse")
+    __setitem__ = _rebuilding("__setitem__")
+    __delitem__ = _rebuilding("__delitem__")
+    del _rebuilding
+
+
+def reduce_docs_indexed(
+    existing: Optional[list[Document]],
+    new: Union[
+        list[Document],
+        list[dict[str, Any]],
+        list[str],
+        str,
+        Literal["delete"],
+    ],
+) -> DocumentIndex:
+    """Merge new documents into the state in time proportional to the new ones.
+
+    A drop-in replacement for ``reduce_docs`` that accepts the same inputs:
+    the literal ``"delete"`` clears the documents, and strings, dicts and
+    Documents are converted and merged by UUID. Checking the new items
+    against the UUID index is O(new) instead of a scan of the existing
+    documents. The result is always a new ``DocumentIndex``: the existing one
+    may already be held by a checkpoint or a streamed snapshot, so it is
+    never extended in place. The new index shares the existing documents
+    instead of copying them, so a merge costs O(new) however many are
+    stored. Repeated strings are merged by UUID like every other input.
+
+    Args:
+        existing (Optional[Sequence[Document]]): The existing docs in the state, if any.
+        new (Union[Sequence[Document], Sequence[dict[str, Any]], Sequence[str], str, Literal["delete"]]):
+            The new input to process. Can be a sequence of Documents, dictionaries, strings, a single string,
+            or the literal "delete".
+    """
+    if new == "delete":
+        return DocumentIndex()
+    documents = (
+        copy.copy(existing)
+        if isinstance(existing, DocumentIndex)
+        else DocumentIndex(existing or ())
+    )
+    if isinstance(new, str):
+        documents.add(new)
+    elif isinstance(new, list):
+        documents.extend(new)
+    return documents
@@ -0,0 +1,176 @@
+"""Tests for the content-addressed docstore and the reference reducer."""
+
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Annotated
+
+import pytest
+from langchain_core.documents import Document
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import END, START, StateGraph
+
+from .docstore import (
+    DocumentRefs,
+    InMemoryDocStore,
+    MissingDocumentsError,
+    SQLiteDocStore,
+    reduce_doc_refs,
+    resolve_docs,
+    set_docstore,
+)
+from .state import _generate_uuid
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = (
+        InMemoryDocStore()
+        if request.param == "memory"
+        else SQLiteDocStore(str(tmp_path / "docs.sqlite"))
+    )
+    set_docstore(store)
+    yield store
+    set_docstore(None)
+
+
+def test_add_and_resolve(store):
+    ids = store.add(
+        [
+            Document(page_content="a", metadata={"source": "s"}),
+            {"page_content": "b", "metadata": {"uuid": "fixed"}},
+        ]
+    )
+
+    assert ids == [_generate_uuid("a"), "fixed"]
+    assert len(store) == 2
+    resolved = resolve_docs(["fixed", "unknown", ids[0]], store, missing="skip")
+    assert [doc.page_content for doc in resolved] == ["b", "a"]
+    assert resolved[1].metadata == {"source": "s", "uuid": ids[0]}
+    with pytest.raises(MissingDocumentsError) as error:
+        resolve_docs(["fixed", "unknown", "unknown"], store)
+    assert error.value.ids == ["unknown"]
+
+
+def test_add_is_idempotent(store):
+    store.add([Document(page_content="a")])
+    store.add([Document(page_content="a"), Document(page_content="b")])
+    assert len(store) == 2
+
+
+def test_reducer_keeps_refs_and_stores_content(store):
+    refs = reduce_doc_refs(None, [Document(page_content="a"), "given-ref"])
+    refs = reduce_doc_refs(refs, Document(page_content="b"))
+    before = list(refs)
+    merged = reduce_doc_refs(refs, [_generate_uuid("a"), {"page_content": "c"}])
+
+    assert merged is not refs and list(refs) == before
+    refs = merged
+    assert list(refs) == [
+        _generate_uuid("a"),
+        "given-ref",
+        _generate_uuid("b"),
+        _generate_uuid("c"),
+    ]
+    resolved = resolve_docs(refs, missing="skip")
+    assert [doc.page_content for doc in resolved] == ["a", "b", "c"]
+    assert reduce_doc_refs(refs, "delete") == []
+
+
+def test_resolve_passes_documents_through(store):
+    document = Document(page_content="inline")
+    assert resolve_docs([document]) == [document]
+
+
+def test_in_memory_store_evicts_least_recently_used():
+    store = InMemoryDocStore(maxsize=2)
+    a, b = store.add([Document(page_content="a"), Document(page_content="b")])
+    store.get_many([a])
+    (c,) = store.add([Document(page_content="c")])
+
+    assert len(store) == 2
+    assert set(store.get_many([a, b, c])) == {a, c}
+    with pytest.raises(MissingDocumentsError):
+        resolve_docs([a, b], store)
+
+
+def test_document_refs_dedup():
+    refs = DocumentRefs(["a", "b", "a"])
+    refs.append("b")
+    refs.extend(["c"])
+    assert refs == ["a", "b", "c"]
+    assert "c" in refs and "d" not in refs
+
+
+def test_merge_work_does_not_grow_with_held_refs():
+    history = [DocumentRefs(str(i) for i in range(20_000))]
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(100):
+            history.append(reduce_doc_refs(history[-1], [f"new {i}"]))
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    # Copying on every merge would hold 100 copies of a 20,000-item list.
+    assert retained < 20_000 * 8
+    assert [len(refs) for refs in history] == list(range(20_000, 20_101))
+    assert "new 0" not in history[0] and "new 0" in history[1]
+
+
+def test_diverging_refs_do_not_see_each_other():
+    base = DocumentRefs(["a"])
+    left = reduce_doc_refs(base, ["b"])
+    right = reduce_doc_refs(base, ["c", "b"])
+
+    assert (base, left, right) == (["a"], ["a", "b"], ["a", "c", "b"])
+    assert "c" not in left and "b" not in base
+
+
+@dataclass(kw_only=True)
+class _State:
+    documents: Annotated[list[str], reduce_doc_refs] = field(default_factory=list)
+
+
+def test_checkpoint_holds_only_references(store):
+    pages = [Document(page_content=f"page {i} " + "text " * 2000) for i in range(20)]
+    builder = StateGraph(_State)
+    builder.add_node("retrieve", lambda state: {"documents": pages})
+    builder.add_edge(START, "retrieve")
+    builder.add_edge("retrieve", END)
+    saver = InMemorySaver()
+    graph = builder.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "t"}}
+
+    result = graph.invoke({"documents": []}, config)
+
+    assert [doc.page_content for doc in resolve_docs(result["documents"])] == [
+        page.page_content for page in pages
+    ]
+    values = saver.get(config)["channel_values"]["documents"]
+    serde = JsonPlusSerializer()
+    ref_size = len(serde.dumps_typed(values)[1])
+    document_size = len(serde.dumps_typed(pages)[1])
+    assert ref_size * 50 < document_size
+
+
+def test_streamed_values_and_history_are_not_mutated_later(store):
+    builder = StateGraph(_State)
+    for name in ("one", "two", "three"):
+        builder.add_node(
+            name, lambda state, name=name: {"documents": [Document(page_content=name)]}
+        )
+    builder.add_edge(START, "one")
+    builder.add_edge("one", "two")
+    builder.add_edge("two", "three")
+    builder.add_edge("three", END)
+    graph = builder.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "t"}}
+
+    values = list(graph.stream({"documents": []}, config, stream_mode="values"))
+
+    assert [len(value["documents"]) for value in values] == [0, 1, 2, 3]
+    history = [len(s.values["documents"]) for s in graph.get_state_history(config)]
+    assert history == [3, 2, 1, 0, 0]
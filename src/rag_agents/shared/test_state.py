@@ -0,0 +1,183 @@
+"""Tests for the document state reducers."""
+
+import copy
+import pickle
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Annotated
+
+import pytest
+from langchain_core.documents import Document
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import END, START, StateGraph
+
+from src.shared_utils.serialization import MsgspecSerializer
+
+from .state import DocumentIndex, _generate_uuid, reduce_docs, reduce_docs_indexed
+
+
+def _doc(text, **metadata):
+    return Document(page_content=text, metadata=metadata)
+
+
+@pytest.mark.parametrize(
+    "new",
+    [
+        "single string",
+        ["a", "b"],
+        [{"page_content": "from dict", "metadata": {"source": "s"}}],
+        [{"page_content": "with id", "metadata": {"uuid": "given"}}],
+        [_doc("no uuid", source="s"), _doc("has uuid", uuid="u1")],
+    ],
+)
+def test_matches_reduce_docs(new):
+    existing = [_doc("kept", uuid="k")]
+    assert list(reduce_docs_indexed(existing, new)) == reduce_docs(existing, new)
+
+
+def test_delete():
+    documents = reduce_docs_indexed(None, ["a", "b"])
+    assert reduce_docs_indexed(documents, "delete") == []
+    assert isinstance(reduce_docs_indexed(documents, "delete"), DocumentIndex)
+
+
+def test_merges_by_uuid_in_insertion_order():
+    documents = reduce_docs_indexed(None, ["a", "b"])
+    documents = reduce_docs_indexed(documents, ["b", "c", "a", _doc("d", uuid="x")])
+    documents = reduce_docs_indexed(
+        documents, [{"page_content": "e", "metadata": {"uuid": "x"}}]
+    )
+
+    assert [doc.page_content for doc in documents] == ["a", "b", "c", "d"]
+    assert documents.get("x").page_content == "d"
+    assert _generate_uuid("c") in documents
+    assert documents.get("missing") is None
+
+
+def test_returns_a_new_index_without_copying_documents():
+    present = _doc("present", uuid="p")
+    documents = reduce_docs_indexed(None, [present])
+    new = _doc("new", uuid="n")
+
+    merged = reduce_docs_indexed(documents, [new, present])
+
+    assert merged is not documents
+    assert list(documents) == [present] and "n" not in documents
+    assert merged[0] is present and merged[1] is new
+    assert merged.get("n") is new
+
+
+def test_uuid_is_stamped_on_a_copy():
+    original = _doc("no uuid", source="s")
+    (stored,) = reduce_docs_indexed(None, [original])
+
+    assert "uuid" not in original.metadata
+    assert stored.metadata == {"source": "s", "uuid": _generate_uuid("no uuid")}
+
+
+def test_list_mutators_keep_index_consistent():
+    documents = DocumentIndex([_doc(text, uuid=text) for text in "abcd"])
+
+    documents.pop(0)
+    documents.remove(documents.get("c"))
+    documents.insert(0, _doc("z", uuid="z"))
+    documents.append(_doc("dup", uuid="b"))
+
+    assert [doc.metadata["uuid"] for doc in documents] == ["z", "b", "d"]
+    assert documents.get("d") is documents[2]
+    assert "a" not in documents
+
+
+def test_copy_and_pickle_rebuild_index():
+    documents = DocumentIndex([_doc("a", uuid="a")])
+    for clone in (
+        copy.copy(documents),
+        copy.deepcopy(documents),
+        pickle.loads(pickle.dumps(documents)),
+    ):
+        clone.add(_doc("b", uuid="b"))
+        assert type(clone) is DocumentIndex
+        assert "b" in clone and "b" not in documents
+
+
+@pytest.mark.parametrize("serde", [JsonPlusSerializer(), MsgspecSerializer()])
+def test_checkpoint_serializers_store_the_view(serde):
+    documents = reduce_docs_indexed(DocumentIndex(["a", "b"]), ["c"])
+    shorter = copy.copy(documents)
+    documents.add("d")
+
+    for value in (documents, shorter):
+        assert list(serde.loads_typed(serde.dumps_typed(value))) == list(value)
+
+
+def test_merge_work_does_not_grow_with_stored_documents():
+    documents = DocumentIndex(_doc(str(i), uuid=str(i)) for i in range(20_000))
+    batches = [[_doc(f"new {i}", uuid=f"new {i}")] for i in range(100)]
+    history = [documents]
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for batch in batches:
+            history.append(reduce_docs_indexed(history[-1], batch))
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    # Copying on every merge would hold 100 copies of a 20,000-item list.
+    assert retained < 20_000 * 8
+    assert [len(documents) for documents in history] == list(range(20_000, 20_101))
+    assert "new 0" not in history[0] and history[1].get("new 0") is batches[0][0]
+
+
+def test_diverging_copies_do_not_see_each_other():
+    base = reduce_docs_indexed(None, [_doc("a", uuid="a")])
+    left = reduce_docs_indexed(base, [_doc("b", uuid="b")])
+    right = reduce_docs_indexed(base, [_doc("c", uuid="c"), _doc("b2", uuid="b")])
+
+    assert [doc.page_content for doc in base] == ["a"]
+    assert [doc.page_content for doc in left] == ["a", "b"]
+    assert [doc.page_content for doc in right] == ["a", "c", "b2"]
+    assert left.get("c") is None and right.get("b").page_content == "b2"
+
+
+@dataclass(kw_only=True)
+class _State:
+    documents: Annotated[list[Document], reduce_docs_indexed] = field(
+        default_factory=list
+    )
+
+
+def test_reducer_in_graph_with_checkpointer():
+    builder = StateGraph(_State)
+    builder.add_node("first", lambda state: {"documents": ["a", "b"]})
+    builder.add_node("second", lambda state: {"documents": ["b", _doc("c", uuid="c")]})
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    graph = builder.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "t"}}
+
+    graph.invoke({"documents": []}, config)
+    result = graph.invoke({"documents": ["d"]}, config)
+
+    assert [doc.page_content for doc in result["documents"]] == ["a", "b", "c", "d"]
+
+
+def test_streamed_values_and_history_are_not_mutated_later():
+    builder = StateGraph(_State)
+    for name in ("one", "two", "three"):
+        builder.add_node(name, lambda state, name=name: {"documents": [name]})
+    builder.add_edge(START, "one")
+    builder.add_edge("one", "two")
+    builder.add_edge("two", "three")
+    builder.add_edge("three", END)
+    graph = builder.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "t"}}
+
+    values = list(graph.stream({"documents": []}, config, stream_mode="values"))
+
+    assert [len(value["documents"]) for value in values] == [0, 1, 2, 3]
+    history = [len(s.values["documents"]) for s in graph.get_state_history(config)]
+    assert history == [3, 2, 1, 0, 0]
@@ -0,0 +1,116 @@
+"""Token-window text splitting, the work done by chunking worker processes.
+
+Worker processes import this module to unpickle ``split_records``, so it must
+stay cheap and free of side effects: it imports no graph, configuration or
+retriever module, whose package ``__init__`` files compile graphs and warm up
+backends.
+"""
+
+import re
+from functools import cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.rag_agents.shared.state import _generate_uuid
+
+DEFAULT_CHUNK_SIZE = 512
+DEFAULT_CHUNK_OVERLAP = 64
+
+# Words and individual punctuation marks, a close proxy for model tokens.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+@cache
+def _tiktoken_encoding(name: str) -> Any:
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def check_sizes(chunk_size: int, chunk_overlap: int) -> None:
+    """Raise ``ValueError`` unless the chunk size and overlap are usable."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError("chunk_overlap must be at least 0 and below chunk_size.")
+
+
+def split_text(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    encoding: Optional[str] = None,
+) -> List[str]:
+    """Split text into windows of at most ``chunk_size`` tokens.
+
+    Consecutive windows share ``chunk_overlap`` tokens so that a passage
+    straddling a boundary is intact in at least one chunk.
+
+    Args:
+        text: Text to split.
+        chunk_size: Maximum tokens per chunk.
+        chunk_overlap: Tokens repeated at the start of the next chunk.
+        encoding: ``tiktoken`` encoding name (e.g. ``"cl100k_base"``) for
+            exact model token counts. By default words and punctuation marks
+            are counted, which needs no extra dependency.
+    """
+    check_sizes(chunk_size, chunk_overlap)
+    step = chunk_size - chunk_overlap
+    if encoding:
+        tokenizer = _tiktoken_encoding(encoding)
+        tokens = tokenizer.encode(text)
+        if len(tokens) <= chunk_size:
+            return [text] if text.strip() else []
+        return [
+            tokenizer.decode(tokens[start : start + chunk_size])
+            for start in range(0, len(tokens) - chunk_overlap, step)
+        ]
+
+    spans = [match.span() for match in _TOKEN_RE.finditer(text)]
+    if len(spans) <= chunk_size:
+        return [text] if text.strip() else []
+    # Slice the original text between token offsets so whitespace and
+    # formatting inside each chunk are preserved.
+    return [
+        text[spans[start][0] : spans[min(start + chunk_size, len(spans)) - 1][1]]
+        for start in range(0, len(spans) - chunk_overlap, step)
+    ]
+
+
+def split_records(
+    records: List[Record],
+    chunk_size: int,
+    chunk_overlap: int,
+    encoding: Optional[str],
+    id_key: str,
+) -> List[List[Record]]:
+    """Split a batch of ``(page_content, metadata)`` records into chunks.
+
+    Each chunk gets its parent's metadata plus ``parent_uuid``,
+    ``chunk_index`` and a ``uuid`` hashed from the source id and the chunk
+    text.
+    """
+    results = []
+    for page_content, metadata in records:
+        parent_uuid = metadata.get("uuid") or _generate_uuid(page_content)
+        source = str(metadata.get(id_key) or parent_uuid)
+        chunks = []
+        for index, text in enumerate(
+            split_text(page_content, chunk_size, chunk_overlap, encoding)
+        ):
+            chunks.append(
+                (
+                    text,
+                    {
+                        **metadata,
+                        "parent_uuid": parent_uuid,
+                        "chunk_index": index,
+                        # Keyed by source and content, so chunks that survive
+                        # an edit keep their ids.
+                        "uuid": _generate_uuid(f"{source}\n{text}"),
+                    },
+                )
+            )
+        results.append(chunks)
+    return results
@@ -1,2 +1,22 @@
 # src/rag_agents/shared/utils.py
 """Shared utility functions."""
+
+from langchain_core.language_models import BaseChatModel
+
+
+def load_chat_model(fully_specified_name: str) -> BaseChatModel:
+    """Load a chat model from a "provider/model" name.
+
+    The provider integration is imported on first use, so only the packages
+    of the configured providers need to be installed.
+
+    Args:
+        fully_specified_name: For example ``"anthropic/claude-3-haiku-20240307"``.
+            Without a provider prefix, the provider is inferred from the name.
+    """
+    from langchain.chat_models import init_chat_model
+
+    provider, _, model = fully_specified_name.partition("/")
+    if not model:
+        provider, model = "", provider
+    return init_chat_model(model, model_provider=provider or None)
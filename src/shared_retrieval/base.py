@@ -1,11 +1,67 @@
 """Abstract base class for retrievers."""
 
+import asyncio
+import hashlib
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.retrievers import BaseRetriever
 
+MAX_BATCH_WORKERS = 8
+
+
+def document_id(document: Document) -> str:
+    """Return a stable identifier for a retrieved document.
+
+    Backends report their own id in ``metadata["id"]``; documents that went
+    through the graph state carry a ``uuid``. Anything else falls back to a hash
+    of the content.
+    """
+    metadata = document.metadata
+    return str(
+        metadata.get("id")
+        or metadata.get("uuid")
+        or hashlib.md5(document.page_content.encode()).hexdigest()
+    )
+
+
+def merge_results(results: Iterable[List[Document]]) -> List[Document]:
+    """Merge per-query result lists, deduplicating by document id.
+
+    Lists are interleaved rank by rank so every query's best hits come before
+    any query's tail, and the first occurrence of a document wins.
+    """
+    merged: List[Document] = []
+    seen = set()
+    for rank in zip_longest(*results):
+        for document in rank:
+            if document is None:
+                continue
+            doc_id = document_id(document)
+            if doc_id not in seen:
+                seen.add(doc_id)
+                merged.append(document)
+    return merged
+
+
+def embed_queries(embeddings: Embeddings, queries: Sequence[str]) -> List[List[float]]:
+    """Embed several search queries with ``embed_query``, concurrently.
+
+    ``embed_documents`` would take them in one call, but models may embed
+    queries and documents differently (e5 prefixes, Cohere input types), so
+    query vectors must come from ``embed_query``.
+    """
+    if len(queries) <= 1:
+        return [embeddings.embed_query(query) for query in queries]
+    workers = min(len(queries), MAX_BATCH_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(embeddings.embed_query, queries))
+
 
 class BaseRetriever(ABC):
     """Abstract base class for retrievers."""
@@ -15,16 +71,106 @@ class BaseRetriever(ABC):
         """Get relevant documents based on a query."""
         raise NotImplementedError
 
+    async def aget_relevant_documents(self, query: str, **kwargs: Any) -> List[Document]:
+        """Asynchronously get relevant documents based on a query.
+
+        Backends with a native async client override this. The default runs the
+        blocking call in a worker thread so the event loop is never blocked.
+        """
+        return await asyncio.to_thread(self.get_relevant_documents, query, **kwargs)
+
+    def get_relevant_documents_batch(
+        self, queries: Sequence[str], **kwargs: Any
+    ) -> List[Document]:
+        """Get relevant documents for several queries at once.
+
+        Results are merged and deduplicated with ``merge_results``. Backends that
+        can answer many queries in one round-trip override this; the default
+        issues the single-query calls concurrently.
+        """
+        if not queries:
+            return []
+        workers = min(len(queries), MAX_BATCH_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    lambda query: self.get_relevant_documents(query, **kwargs), queries
+                )
+            )
+        return merge_results(results)
+
+    async def aget_relevant_documents_batch(
+        self, queries: Sequence[str], **kwargs: Any
+    ) -> List[Document]:
+        """Asynchronously get relevant documents for several queries at once."""
+        results = await asyncio.gather(
+            *(self.aget_relevant_documents(query, **kwargs) for query in queries)
+        )
+        return merge_results(results)
+
 
 class FallbackRetriever(BaseRetriever):
-    """Fallback retriever."""
+    """Fallback retriever.
+
+    By default the backends are tried one after another and the first non-empty
+    result wins. When ``hedge_delay`` is set, the retriever runs in hedged mode:
+    the primary backend is started immediately and every ``hedge_delay`` seconds
+    (or as soon as a running backend fails or comes back empty) the next backend
+    is launched alongside it. The first non-empty result is returned and the
+    remaining backends are cancelled.
 
-    def __init__(self, retrievers: List[BaseRetriever]):
-        """Initialize the fallback retriever."""
+    ``timeouts`` gives each backend its own deadline, measured from the moment it
+    is launched. A backend that misses its deadline is treated as failed.
+    """
+
+    def __init__(
+        self,
+        retrievers: List[BaseRetriever],
+        hedge_delay: Optional[float] = None,
+        timeouts: Optional[Sequence[Optional[float]]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """Initialize the fallback retriever.
+
+        Args:
+            retrievers: Backends in priority order.
+            hedge_delay: Seconds to wait on a backend before also launching the
+                next one. ``0`` launches every backend at once; ``None`` keeps
+                the sequential behaviour.
+            timeouts: Per-backend deadlines in seconds, aligned with
+                ``retrievers``. ``None`` entries mean no deadline.
+            max_workers: Size of the worker pool used for concurrent calls.
+        """
+        if hedge_delay is not None and hedge_delay < 0:
+            raise ValueError("hedge_delay must be non-negative.")
+        if timeouts is not None and len(timeouts) != len(retrievers):
+            raise ValueError("timeouts must have one entry per retriever.")
         self.retrievers = retrievers
+        self.hedge_delay = hedge_delay
+        self.timeouts = list(timeouts) if timeouts is not None else None
+        self.max_workers = max_workers or max(4, 4 * len(retrievers))
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def get_relevant_documents(self, query: str) -> List[Document]:
         """Get relevant documents based on a query."""
+        if self.hedge_delay is None and self.timeouts is None:
+            return self._get_sequential(query)
+        return self._get_hedged(query)
+
+    async def aget_relevant_documents(self, query: str, **kwargs: Any) -> List[Document]:
+        """Asynchronously get relevant documents based on a query."""
+        if self.hedge_delay is None and self.timeouts is None:
+            for retriever in self.retrievers:
+                try:
+                    results = await retriever.aget_relevant_documents(query)
+                    if results:
+                        return results
+                except Exception:
+                    continue
+            return []
+        return await self._aget_hedged(query)
+
+    def _get_sequential(self, query: str) -> List[Document]:
         for retriever in self.retrievers:
             try:
                 results = retriever.get_relevant_documents(query)
@@ -34,7 +180,124 @@ class FallbackRetriever(BaseRetriever):
                 continue
         return []
 
+    def _timeout_for(self, index: int) -> Optional[float]:
+        if self.timeouts is None:
+            return None
+        return self.timeouts[index]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Slow backends cannot be interrupted once running, so a shared pool
+        # lets abandoned calls finish in the background without spawning a
+        # fresh set of threads on every query.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="fallback-retriever"
+            )
+        return self._executor
+
+    def _get_hedged(self, query: str) -> List[Document]:
+        executor = self._get_executor()
+        hedge_delay = float("inf") if self.hedge_delay is None else self.hedge_delay
+        pending: Dict[Future, int] = {}
+        deadlines: Dict[Future, float] = {}
+        next_index = 0
+        next_launch = time.monotonic()
+
+        try:
+            while True:
+                now = time.monotonic()
+                if next_index < len(self.retrievers) and now >= next_launch:
+                    future = executor.submit(
+                        self.retrievers[next_index].get_relevant_documents, query
+                    )
+                    pending[future] = next_index
+                    timeout = self._timeout_for(next_index)
+                    if timeout is not None:
+                        deadlines[future] = now + timeout
+                    next_index += 1
+                    next_launch = now + hedge_delay
+
+                for future in [f for f, d in deadlines.items() if now >= d]:
+                    future.cancel()
+                    pending.pop(future, None)
+                    deadlines.pop(future, None)
+                    next_launch = now
+
+                if not pending:
+                    if next_index >= len(self.retrievers):
+                        return []
+                    next_launch = now
+                    continue
+
+                wake_at = min(
+                    [*deadlines.values()]
+                    + ([next_launch] if next_index < len(self.retrievers) else [])
+                    or [float("inf")]
+                )
+                timeout = None if wake_at == float("inf") else max(0.0, wake_at - now)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                # Prefer higher-priority backends when several finish together.
+                for future in sorted(done, key=pending.__getitem__):
+                    pending.pop(future)
+                    deadlines.pop(future, None)
+                    try:
+                        results = future.result()
+                    except Exception:
+                        results = None
+                    if results:
+                        return results
+                    next_launch = time.monotonic()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _aget_hedged(self, query: str) -> List[Document]:
+        hedge_delay = self.hedge_delay
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+
+        async def run(index: int) -> List[Document]:
+            coro = self.retrievers[index].aget_relevant_documents(query)
+            return await asyncio.wait_for(coro, self._timeout_for(index))
+
+        def launch() -> None:
+            nonlocal next_index
+            pending[asyncio.ensure_future(run(next_index))] = next_index
+            next_index += 1
+
+        try:
+            launch()
+            while pending:
+                can_hedge = next_index < len(self.retrievers)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    launch()
+                    continue
+                for task in sorted(done, key=pending.__getitem__):
+                    pending.pop(task)
+                    if not task.cancelled() and task.exception() is None:
+                        results = task.result()
+                        if results:
+                            return results
+                if next_index < len(self.retrievers):
+                    launch()
+            return []
+        finally:
+            for task in pending:
+                task.cancel()
+
 
-def create_fallback_retriever(retrievers: List[BaseRetriever]) -> FallbackRetriever:
+def create_fallback_retriever(
+    retrievers: List[BaseRetriever],
+    hedge_delay: Optional[float] = None,
+    timeouts: Optional[Sequence[Optional[float]]] = None,
+) -> FallbackRetriever:
     """Create a fallback retriever."""
-    return FallbackRetriever(retrievers=retrievers)
+    return FallbackRetriever(
+        retrievers=retrievers, hedge_delay=hedge_delay, timeouts=timeouts
+    )
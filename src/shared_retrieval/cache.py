@@ -0,0 +1,257 @@
+# src/shared_retrieval/cache.py
+"""Result cache layer for retrievers."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from src.shared_retrieval.base import BaseRetriever
+
+# Entries kept by the SQLite tier; it would otherwise grow with every distinct
+# query ever asked.
+DEFAULT_DISK_MAXSIZE = 100_000
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters for a CachedRetriever."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from either cache tier."""
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+def make_cache_key(
+    provider: str,
+    index_name: Optional[str],
+    query: str,
+    search_kwargs: Dict[str, Any],
+) -> str:
+    """Build the cache key for a retrieval call."""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "index_name": index_name,
+            "query": normalize_query(query),
+            "search_kwargs": search_kwargs,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _DiskCache:
+    """SQLite-backed cache tier that survives process restarts."""
+
+    def __init__(self, path: str, maxsize: int = DEFAULT_DISK_MAXSIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS retrieval_cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL, documents TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS retrieval_cache_expiry "
+                "ON retrieval_cache (expires_at)"
+            )
+            # Counts replaced rows too, so it may overestimate; pruning only
+            # ever removes a few rows more than needed.
+            self._rows = self._conn.execute(
+                "SELECT COUNT(*) FROM retrieval_cache"
+            ).fetchone()[0]
+
+    def get(self, key: str, now: float) -> Optional[Tuple[float, List[Document]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, documents FROM retrieval_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        expires_at, payload = row
+        if expires_at <= now:
+            self.delete(key)
+            return None
+        documents = [Document(**document) for document in json.loads(payload)]
+        return expires_at, documents
+
+    def set(self, key: str, expires_at: float, documents: List[Document]) -> None:
+        payload = json.dumps(
+            [
+                {"page_content": doc.page_content, "metadata": doc.metadata}
+                for doc in documents
+            ],
+            default=str,
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO retrieval_cache VALUES (?, ?, ?)",
+                (key, expires_at, payload),
+            )
+            self._rows += 1
+            if self._rows > self.maxsize:
+                # Entries that expire first, expired ones included, go first.
+                deleted = self._conn.execute(
+                    "DELETE FROM retrieval_cache WHERE key IN (SELECT key FROM "
+                    "retrieval_cache ORDER BY expires_at LIMIT ?)",
+                    (self._rows - self.maxsize,),
+                ).rowcount
+                self._rows -= deleted
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM retrieval_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM retrieval_cache")
+            self._rows = 0
+
+
+class CachedRetriever(BaseRetriever):
+    """Caches the results of any retriever.
+
+    Results live in a bounded in-memory LRU and, when ``disk_path`` is given, in
+    a SQLite file that outlives the process, bounded by ``disk_maxsize``.
+    Every entry expires ``ttl`` seconds after it was fetched from the wrapped
+    retriever. Empty results expire after ``empty_ttl`` seconds and are not
+    cached by default, so a query that ran before its documents were indexed
+    is retried. Keys cover the provider, index name, normalized query and the
+    search keyword arguments, including the ``search_kwargs`` defaults the
+    wrapped retriever was built with. Callers always get their own list.
+    """
+
+    def __init__(
+        self,
+        retriever: BaseRetriever,
+        provider: str,
+        index_name: Optional[str] = None,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        disk_path: Optional[str] = None,
+        search_kwargs: Optional[Dict[str, Any]] = None,
+        empty_ttl: float = 0.0,
+        disk_maxsize: int = DEFAULT_DISK_MAXSIZE,
+    ):
+        """Initialize the cached retriever.
+
+        Args:
+            retriever: The retriever whose results are cached.
+            provider: Name of the backend, part of the cache key.
+            index_name: Name of the index searched, part of the cache key.
+            maxsize: Maximum number of entries held in memory.
+            ttl: Seconds an entry stays valid.
+            disk_path: Optional SQLite file for the persistent tier.
+            search_kwargs: Defaults the wrapped retriever applies to every
+                search, such as its metadata filter; part of the cache key.
+            empty_ttl: Seconds an empty result stays valid; ``0`` does not
+                cache empty results.
+            disk_maxsize: Maximum number of entries in the SQLite file; the
+                ones expiring first are removed beyond it.
+        """
+        if maxsize <= 0 or disk_maxsize <= 0:
+            raise ValueError("maxsize and disk_maxsize must be positive.")
+        self.retriever = retriever
+        self.provider = provider
+        self.index_name = index_name
+        self.search_kwargs = dict(search_kwargs or {})
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, Tuple[float, List[Document]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskCache(disk_path, disk_maxsize) if disk_path else None
+
+    def _lookup(self, key: str) -> Optional[List[Document]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, documents = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return list(documents)
+                del self._entries[key]
+
+        if self._disk is not None:
+            entry = self._disk.get(key, now)
+            if entry is not None:
+                self._remember(key, *entry)
+                with self._lock:
+                    self.stats.disk_hits += 1
+                return list(entry[1])
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def _remember(self, key: str, expires_at: float, documents: List[Document]) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, documents)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _store(self, key: str, documents: List[Document]) -> None:
+        ttl = self.ttl if documents else self.empty_ttl
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        # Keep a copy, so callers mutating the list they got cannot change
+        # the cached result.
+        documents = list(documents)
+        self._remember(key, expires_at, documents)
+        if self._disk is not None:
+            self._disk.set(key, expires_at, documents)
+
+    def get_relevant_documents(self, query: str, **kwargs: Any) -> List[Document]:
+        """Get relevant documents, serving repeated queries from the cache."""
+        key = make_cache_key(
+            self.provider, self.index_name, query, {**self.search_kwargs, **kwargs}
+        )
+        documents = self._lookup(key)
+        if documents is None:
+            documents = self.retriever.get_relevant_documents(query, **kwargs)
+            self._store(key, documents)
+        return documents
+
+    async def aget_relevant_documents(self, query: str, **kwargs: Any) -> List[Document]:
+        """Asynchronously get relevant documents, serving repeats from the cache."""
+        key = make_cache_key(
+            self.provider, self.index_name, query, {**self.search_kwargs, **kwargs}
+        )
+        documents = self._lookup(key)
+        if documents is None:
+            documents = await self.retriever.aget_relevant_documents(query, **kwargs)
+            self._store(key, documents)
+        return documents
+
+    def clear(self) -> None:
+        """Drop every cached entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
@@ -0,0 +1,128 @@
+# src/shared_retrieval/clients.py
+"""Shared connection pools for retriever backends.
+
+Synchronous clients are thread-safe and shared process-wide, so every
+retriever talking to the same endpoint reuses one connection pool instead of
+paying for TCP/TLS setup again. Async clients are bound to the event loop that
+created them, so pooled async clients are kept per running loop.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+from motor.motor_asyncio import AsyncIOMotorClient
+from pinecone import Pinecone
+from pymongo import MongoClient
+
+DEFAULT_POOL_SIZE = 32
+
+_clients: Dict[Hashable, Any] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_client(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Return the process-wide client for ``key``, creating it on first use.
+
+    Args:
+        key: Identifies the endpoint and credentials the client connects to.
+        factory: Builds a new client when none exists yet.
+    """
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = factory()
+    return client
+
+
+def get_elasticsearch(
+    url: str, api_key: Optional[str], pool_size: int = DEFAULT_POOL_SIZE
+) -> Elasticsearch:
+    """Return the shared Elasticsearch client for an endpoint."""
+    return get_client(
+        ("elasticsearch", url, api_key),
+        lambda: Elasticsearch(url, api_key=api_key, connections_per_node=pool_size),
+    )
+
+
+def get_mongo_client(
+    uri: Optional[str], pool_size: int = DEFAULT_POOL_SIZE
+) -> MongoClient:
+    """Return the shared MongoClient for a connection string."""
+    return get_client(
+        ("mongodb", uri), lambda: MongoClient(uri, maxPoolSize=pool_size)
+    )
+
+
+def get_pinecone_index(
+    api_key: Optional[str], index_name: Optional[str], pool_size: int = DEFAULT_POOL_SIZE
+) -> Any:
+    """Return the shared Pinecone index handle."""
+    return get_client(
+        ("pinecone", api_key, index_name),
+        lambda: Pinecone(api_key=api_key, pool_threads=pool_size).Index(
+            index_name, pool_threads=pool_size
+        ),
+    )
+
+
+def close_clients() -> None:
+    """Close and forget every shared synchronous client."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+
+
+def get_async_client(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Return the pooled async client for ``key`` on the running event loop.
+
+    Args:
+        key: Identifies the endpoint and credentials the client connects to.
+        factory: Builds a new client when none exists for this loop yet.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = factory()
+    return client
+
+
+def get_async_elasticsearch(
+    url: str, api_key: Optional[str], pool_size: int = DEFAULT_POOL_SIZE
+) -> AsyncElasticsearch:
+    """Return a pooled AsyncElasticsearch client."""
+    return get_async_client(
+        ("elasticsearch", url, api_key),
+        lambda: AsyncElasticsearch(
+            url, api_key=api_key, connections_per_node=pool_size
+        ),
+    )
+
+
+def get_async_mongo_client(
+    uri: Optional[str], pool_size: int = DEFAULT_POOL_SIZE
+) -> AsyncIOMotorClient:
+    """Return a pooled Motor client."""
+    return get_async_client(
+        ("mongodb", uri), lambda: AsyncIOMotorClient(uri, maxPoolSize=pool_size)
+    )
+
+
+async def aclose_async_clients() -> None:
+    """Close every pooled async client owned by the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        result = client.close()
+        if asyncio.iscoroutine(result):
+            await result
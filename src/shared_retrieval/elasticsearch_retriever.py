@@ -1,28 +1,156 @@
 import os
-from typing import List
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch
 from elastic_transport import ConnectionError, ApiError
 from langchain_core.documents import Document
 
-from src.shared_retrieval.base import BaseRetriever
+from src.shared_retrieval.base import BaseRetriever, merge_results
+from src.shared_retrieval.clients import (
+    DEFAULT_POOL_SIZE,
+    get_async_elasticsearch,
+    get_elasticsearch,
+)
+from src.shared_retrieval.filters import Filter, to_elasticsearch
+
+VALID_QUERY_TYPES = ["multi_match", "match", "term"]
+
+# Sorting on score with the point-in-time shard tiebreaker gives search_after a
+# total order, so pages never skip or repeat documents.
+STREAM_SORT = [{"_score": {"order": "desc"}}, {"_shard_doc": {"order": "asc"}}]
 
 
 class ElasticsearchRetriever(BaseRetriever):
     """Retrieves documents from Elasticsearch."""
 
-    def __init__(self):
-        """Initializes the ElasticsearchRetriever with client configuration."""
-        self.elasticsearch_url = os.getenv("ELASTICSEARCH_URL")
-        self.elasticsearch_api_key = os.getenv("ELASTICSEARCH_API_KEY")
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        index_name: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        filter: Optional[Filter] = None,
+    ):
+        """Initializes the ElasticsearchRetriever with client configuration.
+
+        Connection settings default to the ``ELASTICSEARCH_URL`` and
+        ``ELASTICSEARCH_API_KEY`` environment variables. The client is shared
+        with every other retriever using the same endpoint. ``filter`` is a
+        ``shared_retrieval.filters`` expression applied to every search that
+        does not pass its own.
+        """
+        self.elasticsearch_url = url or os.getenv("ELASTICSEARCH_URL")
+        self.elasticsearch_api_key = api_key or os.getenv("ELASTICSEARCH_API_KEY")
         if not self.elasticsearch_url or not self.elasticsearch_api_key:
             raise ValueError(
                 "Elasticsearch URL and API key must be set in environment variables."
             )
-        self.client = Elasticsearch(
-            self.elasticsearch_url, api_key=self.elasticsearch_api_key
+        self.pool_size = pool_size
+        self.client = get_elasticsearch(
+            self.elasticsearch_url, self.elasticsearch_api_key, pool_size
+        )
+        self.index_name = index_name or "langgraph-omnipotent-index"
+        self.filter = filter
+
+    @property
+    def async_client(self) -> AsyncElasticsearch:
+        """The pooled async client for the running event loop."""
+        return get_async_elasticsearch(
+            self.elasticsearch_url, self.elasticsearch_api_key, self.pool_size
         )
-        self.index_name = "langgraph-omnipotent-index"
+
+    def _build_query_clause(
+        self, query: str, query_type: str, filter: Optional[Filter] = None
+    ) -> Dict[str, Any]:
+        # Validate query type
+        if query_type not in VALID_QUERY_TYPES:
+            raise ValueError(f"Invalid query type. Must be one of: {VALID_QUERY_TYPES}")
+
+        clause = {
+            query_type: {
+                "query": query,
+                "fields": (
+                    ["content", "title", "description"]
+                    if query_type == "multi_match"
+                    else None
+                ),
+            }
+        }
+        filter = self.filter if filter is None else filter
+        if not filter:
+            return clause
+        # Filter clauses restrict the matches without affecting their scores.
+        return {"bool": {"must": [clause], "filter": to_elasticsearch(filter)}}
+
+    def _build_search_query(
+        self,
+        query: str,
+        query_type: str,
+        page_size: int,
+        page: int,
+        filter: Optional[Filter] = None,
+    ) -> Dict[str, Any]:
+        return {
+            "query": self._build_query_clause(query, query_type, filter),
+            "from": (page - 1) * page_size,
+            "size": page_size,
+        }
+
+    @staticmethod
+    def _build_stream_query(
+        query_clause: Dict[str, Any],
+        page_size: int,
+        pit_id: str,
+        keep_alive: str,
+        search_after: Optional[List[Any]],
+    ) -> Dict[str, Any]:
+        search_query = {
+            "query": query_clause,
+            "size": page_size,
+            "sort": STREAM_SORT,
+            "pit": {"id": pit_id, "keep_alive": keep_alive},
+            "track_total_hits": False,
+        }
+        if search_after is not None:
+            search_query["search_after"] = search_after
+        return search_query
+
+    @staticmethod
+    def _hits_to_documents(hits: List[Dict[str, Any]]) -> List[Document]:
+        return [
+            Document(
+                page_content=hit["_source"]["content"],
+                metadata={
+                    **hit["_source"],
+                    "score": hit["_score"],
+                    "id": hit["_id"],
+                },
+            )
+            for hit in hits
+        ]
+
+    def _build_msearch(
+        self,
+        queries: Sequence[str],
+        query_type: str,
+        page_size: int,
+        filter: Optional[Filter] = None,
+    ) -> List[Dict[str, Any]]:
+        searches: List[Dict[str, Any]] = []
+        for query in queries:
+            searches.append({"index": self.index_name})
+            searches.append(
+                self._build_search_query(query, query_type, page_size, 1, filter)
+            )
+        return searches
+
+    def _merge_msearch(self, msearch_results: Dict[str, Any]) -> List[Document]:
+        results = []
+        for response in msearch_results["responses"]:
+            if "error" in response:
+                raise ConnectionError(str(response["error"]))
+            results.append(self._hits_to_documents(response["hits"]["hits"]))
+        return merge_results(results)
 
     def get_relevant_documents(
         self,
@@ -30,6 +158,7 @@ class ElasticsearchRetriever(BaseRetriever):
         query_type: str = "multi_match",
         page_size: int = 10,
         page: int = 1,
+        filter: Optional[Filter] = None,
     ) -> List[Document]:
         """Retrieves relevant documents from Elasticsearch based on the query.
 
@@ -38,6 +167,7 @@ class ElasticsearchRetriever(BaseRetriever):
             query_type: Type of query to execute (multi_match, match, term)
             page_size: Number of results per page
             page: Page number to retrieve
+            filter: Metadata filter overriding the retriever's default
 
         Returns:
             A list of Document objects
@@ -47,63 +177,216 @@ class ElasticsearchRetriever(BaseRetriever):
             ConnectionError: For connection-related errors
             ApiError: For API-related errors
         """
-        # Validate query type
-        valid_query_types = ["multi_match", "match", "term"]
-        if query_type not in valid_query_types:
-            raise ValueError(f"Invalid query type. Must be one of: {valid_query_types}")
+        search_query = self._build_search_query(
+            query, query_type, page_size, page, filter
+        )
 
         try:
-            # Build base query structure
-            search_query = {
-                "query": {
-                    query_type: {
-                        "query": query,
-                        "fields": (
-                            ["content", "title", "description"]
-                            if query_type == "multi_match"
-                            else None
-                        ),
-                    }
-                },
-                "from": (page - 1) * page_size,
-                "size": page_size,
-            }
-
-            # Execute search with scroll for large result sets
+            # A single bounded search: only the requested page is fetched and
+            # no server-side context is left open. Use stream_relevant_documents
+            # to walk deeper into the result set.
             search_results = self.client.search(
-                index=self.index_name,
-                body=search_query,
-                scroll="2m",  # Keep search context alive for 2 minutes
+                index=self.index_name, body=search_query
             )
+            return self._hits_to_documents(search_results["hits"]["hits"])
 
-            # Process results
-            documents = []
-            scroll_id = search_results.get("_scroll_id")
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
 
+    def get_relevant_documents_batch(
+        self,
+        queries: Sequence[str],
+        query_type: str = "multi_match",
+        page_size: int = 10,
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        """Retrieve documents for several queries in one ``_msearch`` round-trip.
+
+        Args:
+            queries: The search queries
+            query_type: Type of query to execute (multi_match, match, term)
+            page_size: Number of results per query
+            filter: Metadata filter overriding the retriever's default
+
+        Returns:
+            The merged results, deduplicated by document id
+
+        Raises:
+            ValueError: If invalid query type is provided
+            ConnectionError: For connection-related errors or a failed sub-search
+        """
+        if not queries:
+            return []
+        searches = self._build_msearch(queries, query_type, page_size, filter)
+
+        try:
+            msearch_results = self.client.msearch(searches=searches)
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
+        return self._merge_msearch(msearch_results)
+
+    def stream_relevant_documents(
+        self,
+        query: str,
+        query_type: str = "multi_match",
+        page_size: int = 100,
+        keep_alive: str = "1m",
+        filter: Optional[Filter] = None,
+    ) -> Iterator[Document]:
+        """Lazily yields every matching document in relevance order.
+
+        Pages are fetched on demand with ``search_after`` against a point in
+        time, so memory and latency follow what the caller actually consumes.
+        The point in time is closed when the generator is exhausted, closed or
+        garbage collected.
+
+        Args:
+            query: The search query
+            query_type: Type of query to execute (multi_match, match, term)
+            page_size: Number of documents fetched per round-trip
+            keep_alive: How long the point in time survives between pages
+            filter: Metadata filter overriding the retriever's default
+
+        Yields:
+            Document objects, best match first
+
+        Raises:
+            ValueError: If invalid query type is provided
+            ConnectionError: For connection-related errors
+        """
+        query_clause = self._build_query_clause(query, query_type, filter)
+        try:
+            pit_id = self.client.open_point_in_time(
+                index=self.index_name, keep_alive=keep_alive
+            )["id"]
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
+
+        search_after = None
+        try:
             while True:
-                # Extract documents from current page
-                hits = search_results["hits"]["hits"]
-                if not hits:
-                    break
-
-                documents.extend(
-                    [
-                        Document(
-                            page_content=hit["_source"]["content"],
-                            metadata={
-                                **hit["_source"],
-                                "score": hit["_score"],
-                                "id": hit["_id"],
-                            },
-                        )
-                        for hit in hits
-                    ]
+                search_results = self.client.search(
+                    body=self._build_stream_query(
+                        query_clause, page_size, pit_id, keep_alive, search_after
+                    )
                 )
+                pit_id = search_results.get("pit_id", pit_id)
+                hits = search_results["hits"]["hits"]
+                yield from self._hits_to_documents(hits)
+                if len(hits) < page_size:
+                    return
+                search_after = hits[-1]["sort"]
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
+        finally:
+            try:
+                self.client.close_point_in_time(id=pit_id)
+            except (ConnectionError, ApiError):
+                # The point in time expires on its own after keep_alive.
+                pass
+
+    async def aget_relevant_documents(
+        self,
+        query: str,
+        query_type: str = "multi_match",
+        page_size: int = 10,
+        page: int = 1,
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        """Asynchronously retrieves one page of relevant documents.
+
+        Uses the pooled AsyncElasticsearch client so concurrent conversations
+        share connections instead of each blocking a worker thread.
+
+        Args:
+            query: The search query
+            query_type: Type of query to execute (multi_match, match, term)
+            page_size: Number of results per page
+            page: Page number to retrieve
+            filter: Metadata filter overriding the retriever's default
+
+        Returns:
+            A list of Document objects
+
+        Raises:
+            ValueError: If invalid query type is provided
+            ConnectionError: For connection-related errors
+            ApiError: For API-related errors
+        """
+        search_query = self._build_search_query(
+            query, query_type, page_size, page, filter
+        )
+
+        try:
+            search_results = await self.async_client.search(
+                index=self.index_name, body=search_query
+            )
+            return self._hits_to_documents(search_results["hits"]["hits"])
+
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
+
+    async def aget_relevant_documents_batch(
+        self,
+        queries: Sequence[str],
+        query_type: str = "multi_match",
+        page_size: int = 10,
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        """Asynchronously retrieves documents for several queries via ``_msearch``."""
+        if not queries:
+            return []
+        searches = self._build_msearch(queries, query_type, page_size, filter)
+
+        try:
+            msearch_results = await self.async_client.msearch(searches=searches)
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
+        return self._merge_msearch(msearch_results)
 
-                # Get next page if available
-                search_results = self.client.scroll(scroll_id=scroll_id, scroll="2m")
+    async def astream_relevant_documents(
+        self,
+        query: str,
+        query_type: str = "multi_match",
+        page_size: int = 100,
+        keep_alive: str = "1m",
+        filter: Optional[Filter] = None,
+    ) -> AsyncIterator[Document]:
+        """Asynchronously and lazily yields every matching document.
 
-            return documents
+        Async counterpart of ``stream_relevant_documents``; see there for the
+        paging and cleanup semantics.
+        """
+        query_clause = self._build_query_clause(query, query_type, filter)
+        client = self.async_client
+        try:
+            pit_id = (
+                await client.open_point_in_time(
+                    index=self.index_name, keep_alive=keep_alive
+                )
+            )["id"]
+        except (ConnectionError, ApiError) as e:
+            raise ConnectionError(str(e)) from e
 
+        search_after = None
+        try:
+            while True:
+                search_results = await client.search(
+                    body=self._build_stream_query(
+                        query_clause, page_size, pit_id, keep_alive, search_after
+                    )
+                )
+                pit_id = search_results.get("pit_id", pit_id)
+                hits = search_results["hits"]["hits"]
+                for document in self._hits_to_documents(hits):
+                    yield document
+                if len(hits) < page_size:
+                    return
+                search_after = hits[-1]["sort"]
         except (ConnectionError, ApiError) as e:
             raise ConnectionError(str(e)) from e
+        finally:
+            try:
+                await client.close_point_in_time(id=pit_id)
+            except (ConnectionError, ApiError):
+                pass
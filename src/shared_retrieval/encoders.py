@@ -1,2 +1,272 @@
 # src/shared_retrieval/encoders.py
-# This file will contain functions for encoding text data.
+"""Text encoders used for indexing and query embedding.
+
+``BatchedEncoder`` wraps any LangChain ``Embeddings`` model. It groups texts
+into size-bounded batches, embeds each distinct text once per call, and keeps a
+cache keyed by model name and content hash, so re-embedding unchanged text
+costs nothing. ``HashingEncoder`` is a deterministic, dependency-free encoder
+for offline runs and tests.
+"""
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_EMBEDDING_MODEL = "local/hashing"
+
+# Entries kept by the default in-memory cache; bulk indexing would otherwise
+# grow it with the size of the corpus.
+DEFAULT_CACHE_SIZE = 100_000
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEncoder(Embeddings):
+    """Deterministic feature-hashing encoder.
+
+    Unigrams and bigrams are hashed into ``dim`` signed buckets with
+    log-scaled term frequencies, then L2-normalized. The output is stable
+    across processes and machines, so it can back a persistent index.
+    """
+
+    def __init__(self, dim: int = 384):
+        """Initialize the encoder with the output dimensionality."""
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def _embed(self, text: str) -> List[float]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in features.items():
+            bucket, sign = self._bucket(feature)
+            vector[bucket] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents."""
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query."""
+        return self._embed(text)
+
+
+def content_key(model_name: str, text: str) -> str:
+    """Return the cache key for a text embedded by a given model."""
+    return hashlib.sha256(f"{model_name}\x00{text}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """In-memory embedding cache keyed by ``content_key``.
+
+    With a ``maxsize`` the least recently used vectors are evicted first.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        """Initialize an empty cache holding at most ``maxsize`` vectors."""
+        self.maxsize = maxsize
+        self._vectors: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for the keys that are present."""
+        with self._lock:
+            found = {key: self._vectors[key] for key in keys if key in self._vectors}
+            for key in found:
+                self._vectors.move_to_end(key)
+            return found
+
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors by key."""
+        with self._lock:
+            self._vectors.update(vectors)
+            for key in vectors:
+                self._vectors.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._vectors) > self.maxsize:
+                    self._vectors.popitem(last=False)
+
+
+class SQLiteEmbeddingCache(EmbeddingCache):
+    """Embedding cache persisted in a SQLite file.
+
+    Vectors are stored as raw float32 bytes, which keeps the file compact and
+    avoids any parsing on lookup.
+    """
+
+    # SQLite limits the number of bound parameters per statement.
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        """Open (or create) the cache file at ``path``."""
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for the keys that are present."""
+        found: Dict[str, List[float]] = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), self._LOOKUP_CHUNK):
+                chunk = keys[start : start + self._LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors by key."""
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in vectors.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?)", rows
+            )
+
+
+class BatchedEncoder(Embeddings):
+    """Batches, deduplicates and caches calls to an embedding model."""
+
+    def __init__(
+        self,
+        encoder: Embeddings,
+        model_name: str,
+        batch_size: int = 64,
+        max_batch_chars: int = 100_000,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        """Initialize the batched encoder.
+
+        Args:
+            encoder: The underlying embedding model.
+            model_name: Identifies the model in cache keys.
+            batch_size: Maximum number of texts per model call.
+            max_batch_chars: Maximum total characters per model call.
+            cache: Where embeddings are cached; defaults to an in-memory cache.
+        """
+        self.encoder = encoder
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.model_calls = 0
+        self.texts_embedded = 0
+
+    def _batches(self, texts: Sequence[str]) -> Iterator[List[str]]:
+        batch: List[str] = []
+        chars = 0
+        for text in texts:
+            if batch and (
+                len(batch) >= self.batch_size or chars + len(text) > self.max_batch_chars
+            ):
+                yield batch
+                batch, chars = [], 0
+            batch.append(text)
+            chars += len(text)
+        if batch:
+            yield batch
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, calling the model only for ones not seen before."""
+        keys = [content_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(set(keys))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            missing_keys = list(missing)
+            computed: Dict[str, List[float]] = {}
+            offset = 0
+            for batch in self._batches(list(missing.values())):
+                embedded = self.encoder.embed_documents(batch)
+                computed.update(zip(missing_keys[offset : offset + len(batch)], embedded))
+                offset += len(batch)
+                self.model_calls += 1
+                self.texts_embedded += len(batch)
+            self.cache.set_many(computed)
+            vectors.update(computed)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing a cached vector when available."""
+        # Models may embed queries and documents differently (e5 prefixes,
+        # Cohere input types), so query vectors get their own keys.
+        key = content_key(f"{self.model_name}\x00query", text)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+        vector = self.encoder.embed_query(text)
+        self.model_calls += 1
+        self.texts_embedded += 1
+        self.cache.set_many({key: vector})
+        return vector
+
+
+def create_encoder(
+    embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+    cache_path: Optional[str] = None,
+    **kwargs,
+) -> BatchedEncoder:
+    """Create a batched, cached encoder from a "provider/model" name.
+
+    Args:
+        embedding_model: For example ``"openai/text-embedding-3-small"`` or
+            ``"local/hashing"`` for the offline encoder.
+        cache_path: SQLite file for the persistent cache. Defaults to the
+            ``EMBEDDING_CACHE_PATH`` environment variable, else a bounded
+            in-memory cache.
+        **kwargs: Passed on to ``BatchedEncoder``.
+    """
+    provider, _, model = embedding_model.partition("/")
+    if provider in ("local", "hashing"):
+        encoder: Embeddings = HashingEncoder()
+    elif provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        encoder = OpenAIEmbeddings(model=model)
+    elif provider == "cohere":
+        from langchain_cohere import CohereEmbeddings
+
+        encoder = CohereEmbeddings(model=model)
+    else:
+        raise ValueError(f"Unsupported embedding provider: {provider}")
+
+    cache_path = cache_path or os.getenv("EMBEDDING_CACHE_PATH")
+    cache = (
+        SQLiteEmbeddingCache(cache_path)
+        if cache_path
+        else EmbeddingCache(maxsize=DEFAULT_CACHE_SIZE)
+    )
+    return BatchedEncoder(encoder, model_name=embedding_model, cache=cache, **kwargs)
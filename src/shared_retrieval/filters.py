@@ -0,0 +1,215 @@
+# src/shared_retrieval/filters.py
+"""Backend-neutral metadata filters.
+
+A filter is a JSON-compatible dict, so it can travel through
+``search_kwargs`` in a graph configuration and into cache keys unchanged:
+
+* ``{"field": "source", "eq": "docs"}`` matches one value.
+* ``{"field": "tenant", "in": ["a", "b"]}`` matches any of several values.
+* ``{"field": "version", "gte": 2, "lt": 5}`` matches a range; any of
+  ``gt``, ``gte``, ``lt`` and ``lte`` may be combined.
+* ``{"and": [...]}`` and ``{"or": [...]}`` combine filters.
+
+As a shorthand, a dict without a ``field`` key maps field names to values,
+``{"source": "docs", "tenant": ["a", "b"]}``, and means an ``and`` of
+``eq`` (scalar values) and ``in`` (list values) conditions.
+
+Each backend compiles filters to its native form so they run inside the
+engine's indexes instead of over-fetching and filtering in Python:
+``to_elasticsearch`` for a ``bool.filter``, ``to_mongo`` for a
+``$vectorSearch`` pre-filter or ``$match`` stage, ``to_pinecone`` for a
+metadata filter and ``to_predicate`` for the in-process indexes.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping
+
+Filter = Dict[str, Any]
+
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+_COMBINATORS = ("and", "or")
+
+
+def eq(field: str, value: Any) -> Filter:
+    """Match documents whose ``field`` equals ``value``."""
+    return {"field": field, "eq": value}
+
+
+def in_(field: str, values: List[Any]) -> Filter:
+    """Match documents whose ``field`` is one of ``values``."""
+    return {"field": field, "in": list(values)}
+
+
+def range_(field: str, **bounds: Any) -> Filter:
+    """Match documents whose ``field`` lies within ``gt``/``gte``/``lt``/``lte``."""
+    return {"field": field, **bounds}
+
+
+def and_(*filters: Filter) -> Filter:
+    """Match documents that match every filter."""
+    return {"and": list(filters)}
+
+
+def or_(*filters: Filter) -> Filter:
+    """Match documents that match at least one filter."""
+    return {"or": list(filters)}
+
+
+def normalize_filter(expression: Mapping[str, Any]) -> Filter:
+    """Validate a filter and expand the shorthand form.
+
+    Raises:
+        ValueError: If the filter is malformed.
+    """
+    if not isinstance(expression, Mapping):
+        raise ValueError(f"A filter must be a dict, got {type(expression).__name__}.")
+    if "field" in expression:
+        return _normalize_condition(expression)
+    combinators = [key for key in _COMBINATORS if key in expression]
+    if combinators:
+        if len(expression) != 1:
+            raise ValueError(
+                f"'{combinators[0]}' cannot be combined with other keys: {expression}"
+            )
+        operands = expression[combinators[0]]
+        if not isinstance(operands, list) or not operands:
+            raise ValueError(f"'{combinators[0]}' needs a non-empty list of filters.")
+        return {combinators[0]: [normalize_filter(operand) for operand in operands]}
+    if not expression:
+        raise ValueError("A filter cannot be empty.")
+    conditions = [
+        in_(field, value) if isinstance(value, (list, tuple)) else eq(field, value)
+        for field, value in expression.items()
+    ]
+    return conditions[0] if len(conditions) == 1 else and_(*conditions)
+
+
+def _normalize_condition(condition: Mapping[str, Any]) -> Filter:
+    operators = [key for key in condition if key != "field"]
+    unknown = set(operators) - {"eq", "in", *RANGE_OPERATORS}
+    if unknown:
+        raise ValueError(f"Unknown filter operators {sorted(unknown)} in {condition}")
+    if not operators:
+        raise ValueError(f"Filter on '{condition['field']}' has no operator.")
+    if ("eq" in operators or "in" in operators) and len(operators) > 1:
+        raise ValueError(
+            f"'eq' and 'in' cannot be combined with other operators: {condition}"
+        )
+    if "in" in operators and not isinstance(condition["in"], (list, tuple)):
+        raise ValueError(f"'in' needs a list of values: {condition}")
+    normalized = dict(condition)
+    if "in" in normalized:
+        normalized["in"] = list(normalized["in"])
+    return normalized
+
+
+def to_elasticsearch(expression: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Compile a filter to the clauses of an Elasticsearch ``bool.filter``.
+
+    Filter clauses skip scoring and are cached by Elasticsearch. ``eq`` and
+    ``in`` compile to ``term`` and ``terms`` queries, which match exact
+    values, so filter on ``keyword`` fields.
+    """
+    expression = normalize_filter(expression)
+    if "and" in expression:
+        # A top-level conjunction is the filter list itself.
+        return [_to_es_clause(operand) for operand in expression["and"]]
+    return [_to_es_clause(expression)]
+
+
+def _to_es_clause(expression: Filter) -> Dict[str, Any]:
+    if "and" in expression:
+        return {"bool": {"filter": [_to_es_clause(f) for f in expression["and"]]}}
+    if "or" in expression:
+        return {
+            "bool": {
+                "should": [_to_es_clause(f) for f in expression["or"]],
+                "minimum_should_match": 1,
+            }
+        }
+    field = expression["field"]
+    if "eq" in expression:
+        return {"term": {field: expression["eq"]}}
+    if "in" in expression:
+        return {"terms": {field: expression["in"]}}
+    return {"range": {field: _bounds(expression)}}
+
+
+def _to_operators(expression: Filter) -> Dict[str, Any]:
+    if "and" in expression:
+        return {"$and": [_to_operators(f) for f in expression["and"]]}
+    if "or" in expression:
+        return {"$or": [_to_operators(f) for f in expression["or"]]}
+    field = expression["field"]
+    if "eq" in expression:
+        return {field: {"$eq": expression["eq"]}}
+    if "in" in expression:
+        return {field: {"$in": expression["in"]}}
+    return {field: {f"${op}": value for op, value in _bounds(expression).items()}}
+
+
+def to_mongo(expression: Mapping[str, Any]) -> Dict[str, Any]:
+    """Compile a filter to a MongoDB query document.
+
+    The result is valid both as a ``$vectorSearch`` ``filter``, where every
+    field must be indexed as a ``filter`` field of the vector index, and as
+    a ``$match`` stage.
+    """
+    return _to_operators(normalize_filter(expression))
+
+
+def to_pinecone(expression: Mapping[str, Any]) -> Dict[str, Any]:
+    """Compile a filter to a Pinecone metadata filter.
+
+    Pinecone uses the MongoDB operator syntax; ``in`` values must be strings
+    or numbers.
+    """
+    return _to_operators(normalize_filter(expression))
+
+
+def to_predicate(expression: Mapping[str, Any]) -> Callable[[Mapping[str, Any]], bool]:
+    """Compile a filter to a function of a document's metadata.
+
+    A range condition never matches a missing or incomparable value.
+    """
+    return _to_predicate(normalize_filter(expression))
+
+
+def _to_predicate(expression: Filter) -> Callable[[Mapping[str, Any]], bool]:
+    if "and" in expression:
+        predicates = [_to_predicate(f) for f in expression["and"]]
+        return lambda metadata: all(p(metadata) for p in predicates)
+    if "or" in expression:
+        predicates = [_to_predicate(f) for f in expression["or"]]
+        return lambda metadata: any(p(metadata) for p in predicates)
+    field = expression["field"]
+    if "eq" in expression:
+        value = expression["eq"]
+        return lambda metadata: metadata.get(field) == value
+    if "in" in expression:
+        values = expression["in"]
+        return lambda metadata: metadata.get(field) in values
+    bounds = _bounds(expression)
+
+    def in_range(metadata: Mapping[str, Any]) -> bool:
+        value = metadata.get(field)
+        if value is None:
+            return False
+        try:
+            return all(_COMPARE[op](value, bound) for op, bound in bounds.items())
+        except TypeError:
+            return False
+
+    return in_range
+
+
+def _bounds(expression: Filter) -> Dict[str, Any]:
+    return {op: expression[op] for op in RANGE_OPERATORS if op in expression}
+
+
+_COMPARE: Dict[str, Callable[[Any, Any], bool]] = {
+    "gt": lambda value, bound: value > bound,
+    "gte": lambda value, bound: value >= bound,
+    "lt": lambda value, bound: value < bound,
+    "lte": lambda value, bound: value <= bound,
+}
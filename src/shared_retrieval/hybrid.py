@@ -0,0 +1,146 @@
+# src/shared_retrieval/hybrid.py
+"""Hybrid lexical + vector retrieval with reciprocal rank fusion."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from src.shared_retrieval.base import BaseRetriever, document_id
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[List[Document]],
+    weights: Optional[Sequence[float]] = None,
+    k: int = 60,
+) -> List[Document]:
+    """Fuse ranked result lists with reciprocal rank fusion.
+
+    Each document scores ``sum(weight / (k + rank))`` over the lists it appears
+    in, with 1-based ranks. The fused score is stored in
+    ``metadata["rrf_score"]``.
+
+    Args:
+        ranked_lists: Result lists, each ordered best first.
+        weights: Optional per-list weights; defaults to 1 for every list.
+        k: Damping constant; larger values flatten the rank contribution.
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for results, weight in zip(ranked_lists, weights):
+        for rank, document in enumerate(results, start=1):
+            doc_id = document_id(document)
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+            documents.setdefault(doc_id, document)
+    ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [
+        Document(
+            page_content=documents[doc_id].page_content,
+            metadata={**documents[doc_id].metadata, "rrf_score": scores[doc_id]},
+        )
+        for doc_id in ranked
+    ]
+
+
+class HybridRetriever(BaseRetriever):
+    """Runs a lexical and a vector retriever concurrently and fuses the results.
+
+    Both sides over-fetch (``lexical_k`` / ``vector_k``) so that documents ranked
+    moderately by both can surface in the fused top ``k``. Retrievers name their
+    depth parameter differently, so the keyword used for each side is
+    configurable. If one side fails, the other side's ranking is used alone.
+    """
+
+    def __init__(
+        self,
+        lexical: BaseRetriever,
+        vector: BaseRetriever,
+        k: int = 10,
+        lexical_k: int = 50,
+        vector_k: int = 50,
+        rrf_k: int = 60,
+        lexical_weight: float = 1.0,
+        vector_weight: float = 1.0,
+        lexical_depth_kwarg: str = "page_size",
+        vector_depth_kwarg: str = "k",
+    ):
+        """Initialize the hybrid retriever.
+
+        Args:
+            lexical: Keyword retriever, e.g. ElasticsearchRetriever.
+            vector: Embedding retriever, e.g. LocalRetriever.
+            k: Number of fused documents returned.
+            lexical_k: Over-fetch depth for the lexical side.
+            vector_k: Over-fetch depth for the vector side.
+            rrf_k: Reciprocal rank fusion damping constant.
+            lexical_weight: Weight of the lexical ranking in the fusion.
+            vector_weight: Weight of the vector ranking in the fusion.
+            lexical_depth_kwarg: Keyword the lexical retriever takes for depth.
+            vector_depth_kwarg: Keyword the vector retriever takes for depth.
+        """
+        self.lexical = lexical
+        self.vector = vector
+        self.k = k
+        self.lexical_k = lexical_k
+        self.vector_k = vector_k
+        self.rrf_k = rrf_k
+        self.weights = [lexical_weight, vector_weight]
+        self.lexical_depth_kwarg = lexical_depth_kwarg
+        self.vector_depth_kwarg = vector_depth_kwarg
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="hybrid-retriever"
+        )
+
+    def _side_kwargs(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        return [
+            {**kwargs, self.lexical_depth_kwarg: self.lexical_k},
+            {**kwargs, self.vector_depth_kwarg: self.vector_k},
+        ]
+
+    def _fuse(self, outcomes: Sequence[Any], k: Optional[int]) -> List[Document]:
+        ranked_lists, weights, errors = [], [], []
+        for outcome, weight in zip(outcomes, self.weights):
+            if isinstance(outcome, BaseException):
+                errors.append(outcome)
+            else:
+                ranked_lists.append(outcome)
+                weights.append(weight)
+        if not ranked_lists:
+            raise errors[0]
+        fused = reciprocal_rank_fusion(ranked_lists, weights, self.rrf_k)
+        return fused[: k or self.k]
+
+    def get_relevant_documents(
+        self, query: str, k: Optional[int] = None, **kwargs: Any
+    ) -> List[Document]:
+        """Get documents ranked by both retrievers, fused with RRF."""
+        lexical_kwargs, vector_kwargs = self._side_kwargs(**kwargs)
+        futures = [
+            self._executor.submit(
+                self.lexical.get_relevant_documents, query, **lexical_kwargs
+            ),
+            self._executor.submit(
+                self.vector.get_relevant_documents, query, **vector_kwargs
+            ),
+        ]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                outcomes.append(e)
+        return self._fuse(outcomes, k)
+
+    async def aget_relevant_documents(
+        self, query: str, k: Optional[int] = None, **kwargs: Any
+    ) -> List[Document]:
+        """Asynchronously get documents ranked by both retrievers, fused with RRF."""
+        lexical_kwargs, vector_kwargs = self._side_kwargs(**kwargs)
+        outcomes = await asyncio.gather(
+            self.lexical.aget_relevant_documents(query, **lexical_kwargs),
+            self.vector.aget_relevant_documents(query, **vector_kwargs),
+            return_exceptions=True,
+        )
+        return self._fuse(outcomes, k)
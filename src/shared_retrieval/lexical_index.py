@@ -0,0 +1,160 @@
+# src/shared_retrieval/lexical_index.py
+"""Embedded in-process BM25 index, the lexical half of "elastic-local"."""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from src.shared_retrieval.base import BaseRetriever
+from src.shared_retrieval.filters import Filter, to_predicate
+from src.shared_retrieval.local_index import DEFAULT_INDEX_NAME
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LocalLexicalIndex:
+    """Thread-safe BM25 index over inverted postings lists."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize an empty index with the BM25 ``k1`` and ``b`` parameters."""
+        self.k1 = k1
+        self.b = b
+        self.version = 0
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Document] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self._documents)
+
+    def _remove(self, doc_id: str) -> None:
+        document = self._documents.pop(doc_id)
+        for term in set(tokenize(document.page_content)):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def add(self, ids: Sequence[str], documents: Sequence[Document]) -> None:
+        """Insert or replace documents."""
+        if len(ids) != len(documents):
+            raise ValueError("ids and documents must have the same length.")
+        with self._lock:
+            for doc_id, document in zip(ids, documents):
+                if doc_id in self._documents:
+                    self._remove(doc_id)
+                tokens = tokenize(document.page_content)
+                for term, count in Counter(tokens).items():
+                    self._postings[term][doc_id] = count
+                self._lengths[doc_id] = len(tokens)
+                self._total_length += len(tokens)
+                self._documents[doc_id] = document
+            self.version += 1
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove documents by id and return how many were removed."""
+        with self._lock:
+            removed = 0
+            for doc_id in set(ids):
+                if doc_id in self._documents:
+                    self._remove(doc_id)
+                    removed += 1
+            if removed:
+                self.version += 1
+            return removed
+
+    def search(
+        self, query: str, k: int = 10, filter: Optional[Filter] = None
+    ) -> List[Tuple[Document, float]]:
+        """Return the k best BM25 matches for the query, best first.
+
+        With a ``filter``, only matching documents are ranked.
+        """
+        with self._lock:
+            n = len(self._documents)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self._lengths[doc_id] / avg_length
+                    )
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            if filter:
+                predicate = to_predicate(filter)
+                scores = {
+                    doc_id: score
+                    for doc_id, score in scores.items()
+                    if predicate(self._documents[doc_id].metadata)
+                }
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._documents[doc_id], score) for doc_id, score in best]
+
+
+_indexes: Dict[str, LocalLexicalIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(name: str = DEFAULT_INDEX_NAME) -> LocalLexicalIndex:
+    """Return the process-wide lexical index registered under ``name``."""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = LocalLexicalIndex()
+        return index
+
+
+def set_lexical_index(name: str, index: Optional[LocalLexicalIndex]) -> None:
+    """Register ``index`` under ``name``; ``None`` forgets the name."""
+    with _indexes_lock:
+        if index is None:
+            _indexes.pop(name, None)
+        else:
+            _indexes[name] = index
+
+
+class LexicalRetriever(BaseRetriever):
+    """Retrieves documents from an in-process LocalLexicalIndex."""
+
+    def __init__(
+        self,
+        index: Optional[LocalLexicalIndex] = None,
+        k: int = 10,
+        filter: Optional[Filter] = None,
+    ):
+        """Initialize the lexical retriever."""
+        self.index = index if index is not None else get_lexical_index()
+        self.k = k
+        self.filter = filter
+
+    def get_relevant_documents(
+        self, query: str, k: Optional[int] = None, filter: Optional[Filter] = None
+    ) -> List[Document]:
+        """Get the documents that best match the query terms."""
+        filter = self.filter if filter is None else filter
+        return [
+            Document(
+                page_content=document.page_content,
+                metadata={**document.metadata, "score": score},
+            )
+            for document, score in self.index.search(query, k or self.k, filter)
+        ]
@@ -0,0 +1,631 @@
+# src/shared_retrieval/local_index.py
+"""Embedded in-process vector index used by the "elastic-local" provider.
+
+Vectors are kept in one contiguous float32 matrix so a query is a single
+vectorized matrix product. Large corpora can switch to an IVF (inverted file)
+mode, which clusters the vectors with k-means and only scores the clusters
+nearest to each query.
+
+To cut memory further, ``quantize`` replaces the resident matrix with int8 or
+product-quantized codes and moves the float32 vectors to a memory-mapped file.
+Queries are scored against the codes, and the best ``k * rescore`` candidates
+are rescored against the full-precision rows read back from disk.
+
+Searches can be restricted with a ``shared_retrieval.filters`` expression.
+The rows it matches are computed once per index version and reused, and
+rows outside the filter are never ranked.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.shared_retrieval.base import BaseRetriever, embed_queries, merge_results
+from src.shared_retrieval.filters import Filter, to_predicate
+from src.shared_retrieval.quantization import create_quantizer
+
+DEFAULT_INDEX_NAME = "langgraph-omnipotent-index"
+
+# Rows scored per matrix product; bounds the temporary score matrix.
+SEARCH_BLOCK_SIZE = 65536
+
+# Quantized rows are widened to float32 while scored, so use smaller blocks.
+QUANTIZED_BLOCK_SIZE = 8192
+
+# Candidates rescored at full precision per result in quantized mode.
+DEFAULT_RESCORE = 4
+
+# Row masks of the most recently used filters kept per index.
+FILTER_MASK_CACHE_SIZE = 32
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the indices and values of the k best scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(part, order, axis=1),
+        np.take_along_axis(part_scores, order, axis=1),
+    )
+
+
+def kmeans(
+    vectors: np.ndarray, n_clusters: int, iterations: int = 20, seed: int = 0
+) -> np.ndarray:
+    """Cluster unit vectors with spherical k-means and return the centroids."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            # Reseed empty clusters so every list stays useful.
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
+
+
+class LocalVectorIndex:
+    """Thread-safe in-process vector index.
+
+    Documents are upserted by id. Vectors are L2-normalized on insert so the
+    dot product equals cosine similarity. Storage grows geometrically, keeping
+    appends amortized O(1) while the rows stay contiguous.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        """Initialize an empty index.
+
+        Args:
+            dim: Vector dimensionality. Inferred from the first insert if unset.
+        """
+        self.dim = dim
+        self.version = 0
+        self._vectors = np.empty((0, dim or 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._documents: List[Document] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._lists: Optional[List[np.ndarray]] = None
+        self.nprobe = 8
+        self._quantizer = None
+        self._codes: Optional[np.ndarray] = None
+        self._vectors_path: Optional[str] = None
+        self.rescore = DEFAULT_RESCORE
+        self._filter_masks: OrderedDict[str, Tuple[int, np.ndarray]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return self._size
+
+    def __contains__(self, doc_id: str) -> bool:
+        """Return whether a document id is indexed."""
+        return doc_id in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the stored (normalized) vectors."""
+        return self._vectors[: self._size]
+
+    @property
+    def is_approximate(self) -> bool:
+        """Whether searches use the IVF lists."""
+        return self._centroids is not None
+
+    @property
+    def is_quantized(self) -> bool:
+        """Whether searches score compressed codes."""
+        return self._quantizer is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of vector data held in memory.
+
+        Counts the codes and quantizer tables in quantized mode, where the
+        full-precision vectors are memory-mapped; otherwise the float32 rows.
+        """
+        if self._quantizer is not None:
+            resident = self._codes[: self._size].nbytes + self._quantizer.nbytes
+            if self._vectors_path is None:
+                resident += self.vectors.nbytes
+            return resident
+        return self.vectors.nbytes
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._vectors):
+            return
+        capacity = max(needed, 2 * len(self._vectors), 1024)
+        if self._vectors_path is not None:
+            self._vectors = self._map_vectors(capacity)
+        else:
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        if self._codes is not None:
+            codes = np.empty((capacity, self._codes.shape[1]), dtype=np.uint8)
+            codes[: self._size] = self._codes[: self._size]
+            self._codes = codes
+        assignments = np.empty(capacity, dtype=np.int32)
+        assignments[: self._size] = self._assignments[: self._size]
+        self._assignments = assignments
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        documents: Sequence[Document],
+    ) -> None:
+        """Insert or replace documents and their vectors."""
+        if not (len(ids) == len(vectors) == len(documents)):
+            raise ValueError("ids, vectors and documents must have the same length.")
+        if not ids:
+            return
+        batch = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+        with self._lock:
+            if self.dim is None:
+                self.dim = batch.shape[1]
+                self._vectors = np.empty((0, self.dim), dtype=np.float32)
+            if batch.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected vectors of dimension {self.dim}, got {batch.shape[1]}."
+                )
+            self._reserve(len(ids))
+            codes = self._quantizer.encode(batch) if self._quantizer else None
+            for i, (doc_id, vector, document) in enumerate(zip(ids, batch, documents)):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._rows[doc_id] = self._size
+                    self._ids.append(doc_id)
+                    self._documents.append(document)
+                    self._size += 1
+                else:
+                    self._documents[row] = document
+                self._vectors[row] = vector
+                if codes is not None:
+                    self._codes[row] = codes[i]
+                if self._centroids is not None:
+                    self._assignments[row] = int(np.argmax(self._centroids @ vector))
+            self._lists = None
+            self.version += 1
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove documents by id and return how many were removed."""
+        with self._lock:
+            rows = sorted(self._rows[i] for i in set(ids) if i in self._rows)
+            if not rows:
+                return 0
+            keep = np.ones(self._size, dtype=bool)
+            keep[rows] = False
+            size = int(keep.sum())
+            self._vectors[:size] = self._vectors[: self._size][keep]
+            self._assignments[:size] = self._assignments[: self._size][keep]
+            if self._codes is not None:
+                self._codes[:size] = self._codes[: self._size][keep]
+            self._ids = [i for i, k in zip(self._ids, keep) if k]
+            self._documents = [d for d, k in zip(self._documents, keep) if k]
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._size = size
+            self._lists = None
+            self.version += 1
+            return len(rows)
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        """Return the stored document for an id, if present."""
+        row = self._rows.get(doc_id)
+        return None if row is None else self._documents[row]
+
+    def build_ivf(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        sample_size: int = 100_000,
+        iterations: int = 20,
+    ) -> None:
+        """Switch the index to approximate IVF search.
+
+        Args:
+            nlist: Number of clusters; defaults to ``4 * sqrt(n)``.
+            nprobe: Clusters scanned per query. Higher means better recall.
+            sample_size: Vectors sampled to train the clusters.
+            iterations: k-means iterations.
+        """
+        with self._lock:
+            if self._size == 0:
+                raise ValueError("Cannot build IVF lists on an empty index.")
+            vectors = self.vectors
+            nlist = nlist or max(1, int(4 * np.sqrt(self._size)))
+            rng = np.random.default_rng(0)
+            sample = vectors
+            if self._size > sample_size:
+                sample = vectors[rng.choice(self._size, sample_size, replace=False)]
+            self._centroids = kmeans(sample, nlist, iterations)
+            for start in range(0, self._size, SEARCH_BLOCK_SIZE):
+                block = vectors[start : start + SEARCH_BLOCK_SIZE]
+                self._assignments[start : start + len(block)] = np.argmax(
+                    block @ self._centroids.T, axis=1
+                )
+            self.nprobe = nprobe
+            self._lists = None
+
+    def drop_ivf(self) -> None:
+        """Return to exact brute-force search."""
+        with self._lock:
+            self._centroids = None
+            self._lists = None
+
+    def _map_vectors(self, capacity: int) -> np.ndarray:
+        """Map the vector file with room for ``capacity`` rows, growing it."""
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(max(f.tell(), capacity * self.dim * 4))
+        return np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.dim),
+        )
+
+    def quantize(
+        self,
+        method: str = "int8",
+        path: Optional[str] = None,
+        m: Optional[int] = None,
+        rescore: int = DEFAULT_RESCORE,
+        sample_size: int = 100_000,
+    ) -> None:
+        """Switch the index to compressed storage.
+
+        Args:
+            method: ``"int8"`` (4x smaller) or ``"pq"`` (``4 * dim / m``
+                times smaller with ``m`` subspaces).
+            path: File the float32 vectors move to; they are memory-mapped
+                and only the rescored rows are read. Without a path they stay
+                in memory, which only makes sense for measuring recall.
+            m: Product quantizer subspaces; see ``create_quantizer``.
+            rescore: Candidates per result rescored at full precision.
+            sample_size: Vectors sampled to train the quantizer.
+        """
+        with self._lock:
+            if self._size == 0:
+                raise ValueError("Cannot quantize an empty index.")
+            vectors = self.vectors
+            quantizer = create_quantizer(method, self.dim, m)
+            sample = vectors
+            if self._size > sample_size:
+                rng = np.random.default_rng(0)
+                sample = vectors[
+                    np.sort(rng.choice(self._size, sample_size, replace=False))
+                ]
+            quantizer.train(np.asarray(sample))
+            codes = np.empty((len(self._vectors), quantizer.code_size), dtype=np.uint8)
+            for start in range(0, self._size, QUANTIZED_BLOCK_SIZE):
+                block = vectors[start : start + QUANTIZED_BLOCK_SIZE]
+                codes[start : start + len(block)] = quantizer.encode(block)
+            if path is not None and path != self._vectors_path:
+                previous, self._vectors_path = self._vectors, path
+                with open(path, "wb"):
+                    pass
+                self._vectors = self._map_vectors(len(previous))
+                for start in range(0, self._size, SEARCH_BLOCK_SIZE):
+                    stop = min(start + SEARCH_BLOCK_SIZE, self._size)
+                    self._vectors[start:stop] = previous[start:stop]
+                self._vectors.flush()
+            self._quantizer = quantizer
+            self._codes = codes
+            self.rescore = rescore
+
+    def drop_quantization(self) -> None:
+        """Load the full-precision vectors back into memory and drop the codes."""
+        with self._lock:
+            if self._vectors_path is not None:
+                self._vectors = np.array(self._vectors)
+                self._vectors_path = None
+            self._quantizer = None
+            self._codes = None
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            assignments = self._assignments[: self._size]
+            order = np.argsort(assignments, kind="stable")
+            bounds = np.searchsorted(
+                assignments[order], np.arange(len(self._centroids) + 1)
+            )
+            self._lists = [
+                order[bounds[c] : bounds[c + 1]] for c in range(len(self._centroids))
+            ]
+        return self._lists
+
+    def _filter_mask(self, filter: Filter) -> np.ndarray:
+        """Return which rows match ``filter``, cached until the next write."""
+        key = json.dumps(filter, sort_keys=True, default=str)
+        cached = self._filter_masks.get(key)
+        if cached is not None and cached[0] == self.version:
+            self._filter_masks.move_to_end(key)
+            return cached[1]
+        predicate = to_predicate(filter)
+        mask = np.fromiter(
+            (predicate(self._documents[row].metadata) for row in range(self._size)),
+            dtype=bool,
+            count=self._size,
+        )
+        self._filter_masks[key] = (self.version, mask)
+        self._filter_masks.move_to_end(key)
+        while len(self._filter_masks) > FILTER_MASK_CACHE_SIZE:
+            self._filter_masks.popitem(last=False)
+        return mask
+
+    def _score_rows(
+        self, queries: np.ndarray, rows: Union[slice, np.ndarray], exact: bool
+    ) -> np.ndarray:
+        if exact or self._quantizer is None:
+            return queries @ self._vectors[rows].T
+        return self._quantizer.score(queries, self._codes[rows])
+
+    def _search_exact(
+        self,
+        queries: np.ndarray,
+        k: int,
+        exact: bool = False,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Scan every row; ``exact`` scores float32 vectors even when quantized."""
+        block_size = (
+            SEARCH_BLOCK_SIZE
+            if exact or self._quantizer is None
+            else QUANTIZED_BLOCK_SIZE
+        )
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, self._size, block_size):
+            rows = slice(start, min(start + block_size, self._size))
+            scores = self._score_rows(queries, rows, exact)
+            if allowed is not None:
+                scores[:, ~allowed[rows]] = -np.inf
+            rows, values = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, rows + start], axis=1)
+            best_scores = np.concatenate([best_scores, values], axis=1)
+            if start:
+                order, best_scores = _top_k(best_scores, k)
+                best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return best_rows, best_scores
+
+    def _search_ivf(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        lists = self._inverted_lists()
+        probes, _ = _top_k(queries @ self._centroids.T, nprobe)
+        results = []
+        for query, probe in zip(queries, probes):
+            candidates = np.concatenate([lists[c] for c in probe])
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            scores = self._score_rows(query[None, :], candidates, exact=False)[0]
+            rows, values = _top_k(scores[None, :], k)
+            results.append((candidates[rows[0]], values[0]))
+        return results
+
+    def _rescore(
+        self, query: np.ndarray, rows: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Sorted rows turn the reads from the vector file into one forward
+        # pass.
+        rows = np.sort(rows)
+        scores = self._vectors[rows] @ query
+        top, values = _top_k(scores[None, :], k)
+        return rows[top[0]], values[0]
+
+    def _search_rows(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        depth = k * self.rescore if self._quantizer is not None else k
+        if self._centroids is not None:
+            per_query = self._search_ivf(
+                queries, depth, nprobe or self.nprobe, allowed
+            )
+        else:
+            per_query = list(
+                zip(*self._search_exact(queries, depth, allowed=allowed))
+            )
+        if allowed is not None:
+            # Fewer than ``depth`` rows may match; drop the masked fillers.
+            per_query = [
+                (rows[allowed[rows]], scores[allowed[rows]])
+                for rows, scores in per_query
+            ]
+        if self._quantizer is not None:
+            per_query = [
+                self._rescore(query, rows, k)
+                for query, (rows, _) in zip(queries, per_query)
+            ]
+        return per_query
+
+    def search(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        k: int = 4,
+        nprobe: Optional[int] = None,
+        filter: Optional[Filter] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Return the k nearest documents for each query vector.
+
+        Args:
+            query_vectors: One or more query embeddings.
+            k: Number of results per query.
+            nprobe: Override the IVF probe count for this call.
+            filter: Only return documents whose metadata matches this
+                ``shared_retrieval.filters`` expression.
+
+        Returns:
+            For every query, a list of ``(document, cosine similarity)`` pairs,
+            most similar first.
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        with self._lock:
+            if self._size == 0:
+                return [[] for _ in queries]
+            allowed = self._filter_mask(filter) if filter else None
+            per_query = self._search_rows(_normalize(queries), k, nprobe, allowed)
+            return [
+                [
+                    (self._documents[row], float(score))
+                    for row, score in zip(rows, scores)
+                ]
+                for rows, scores in per_query
+            ]
+
+    def tune_rescore(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        k: int = 10,
+        tolerance: float = 0.01,
+        max_rescore: int = 64,
+    ) -> Tuple[int, float]:
+        """Set the smallest rescore depth that keeps recall within ``tolerance``.
+
+        Doubles ``rescore`` from 1 until recall@k against exact float32
+        search over ``query_vectors`` is at least ``1 - tolerance``, stopping
+        at ``max_rescore``.
+
+        Returns:
+            The chosen rescore depth and the recall it reached.
+        """
+        if self._quantizer is None:
+            raise ValueError("The index is not quantized.")
+        queries = _normalize(
+            np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dim)
+        )
+        with self._lock:
+            truth, _ = self._search_exact(queries, k, exact=True)
+            expected = sum(len(rows) for rows in truth)
+            rescore = 1
+            while True:
+                self.rescore = rescore
+                found = self._search_rows(queries, k)
+                hits = sum(
+                    len(np.intersect1d(rows, true_rows))
+                    for (rows, _), true_rows in zip(found, truth)
+                )
+                recall = hits / max(expected, 1)
+                if recall >= 1.0 - tolerance or rescore >= max_rescore:
+                    return rescore, recall
+                rescore = min(2 * rescore, max_rescore)
+
+
+_indexes: Dict[str, LocalVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_index(name: str = DEFAULT_INDEX_NAME) -> LocalVectorIndex:
+    """Return the process-wide local index registered under ``name``."""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = LocalVectorIndex()
+        return index
+
+
+def set_local_index(name: str, index: Optional[LocalVectorIndex]) -> None:
+    """Register ``index`` under ``name``; ``None`` forgets the name."""
+    with _indexes_lock:
+        if index is None:
+            _indexes.pop(name, None)
+        else:
+            _indexes[name] = index
+
+
+class LocalRetriever(BaseRetriever):
+    """Retrieves documents from an in-process LocalVectorIndex."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        index: Optional[LocalVectorIndex] = None,
+        k: int = 4,
+        filter: Optional[Filter] = None,
+    ):
+        """Initialize the local retriever.
+
+        Args:
+            embeddings: Encodes queries into the index's vector space.
+            index: The index to search; defaults to the shared default index.
+            k: Number of documents returned per query.
+            filter: Metadata filter applied to searches that pass none.
+        """
+        self.embeddings = embeddings
+        self.index = index if index is not None else get_local_index()
+        self.k = k
+        self.filter = filter
+
+    @staticmethod
+    def _to_documents(hits: List[Tuple[Document, float]]) -> List[Document]:
+        return [
+            Document(
+                page_content=document.page_content,
+                metadata={**document.metadata, "score": score},
+            )
+            for document, score in hits
+        ]
+
+    def get_relevant_documents(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        """Get the documents most similar to the query."""
+        vector = self.embeddings.embed_query(query)
+        hits = self.index.search(
+            [vector], k or self.k, nprobe, self.filter if filter is None else filter
+        )[0]
+        return self._to_documents(hits)
+
+    def get_relevant_documents_batch(
+        self,
+        queries: Sequence[str],
+        k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        """Embed the queries, then score them all in one matrix product."""
+        if not queries:
+            return []
+        vectors = embed_queries(self.embeddings, queries)
+        results = self.index.search(
+            vectors, k or self.k, nprobe, self.filter if filter is None else filter
+        )
+        return merge_results(self._to_documents(hits) for hits in results)
@@ -1,26 +1,168 @@
 # src/shared_retrieval/mongodb_retriever.py
 """MongoDB retriever implementation."""
 import os
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence
 
 from langchain_core.documents import Document
-from pymongo import MongoClient
+from langchain_core.embeddings import Embeddings
+from motor.motor_asyncio import AsyncIOMotorClient
 
 from src.shared_retrieval.base import BaseRetriever
+from src.shared_retrieval.clients import (
+    DEFAULT_POOL_SIZE,
+    get_async_mongo_client,
+    get_mongo_client,
+)
+from src.shared_retrieval.encoders import DEFAULT_EMBEDDING_MODEL, create_encoder
+from src.shared_retrieval.filters import Filter, to_mongo
 
 
 class MongoRetriever(BaseRetriever):
-    """MongoDB retriever."""
-
-    def __init__(self):
-        """Initialize the MongoDB retriever."""
-        mongodb_uri = os.getenv("MONGODB_URI")
-        self.client = MongoClient(mongodb_uri)
-        # Potentially specify database and collection here based on env vars
-
-    def get_relevant_documents(self, query: str) -> List[Document]:
-        """Get relevant documents based on a query."""
-        # Add MongoDB specific logic here
-        # Retrieving from MongoDB for query
-        # Placeholder for actual MongoDB query
-        return []
+    """MongoDB Atlas vector search retriever.
+
+    Queries run as a ``$vectorSearch`` aggregation followed by a ``$project``
+    stage, so only the text, the requested metadata fields and the score come
+    back over the wire; the stored embedding never does. The cursor batch size
+    matches ``k``, so each query completes in a single round-trip.
+
+    Metadata filters run as the ``$vectorSearch`` pre-filter, which needs the
+    filtered fields indexed as ``filter`` fields of the vector index. With
+    ``prefilter=False`` they run as a ``$match`` stage after the search
+    instead, which works on any field but can return fewer than ``k``
+    documents.
+    """
+
+    def __init__(
+        self,
+        connection_string: Optional[str] = None,
+        database_name: Optional[str] = None,
+        collection_name: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        index_name: str = "vector_index",
+        embedding_field: str = "embedding",
+        text_field: str = "content",
+        metadata_fields: Sequence[str] = ("title", "source", "uuid"),
+        k: int = 4,
+        num_candidates_factor: int = 10,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        collection: Optional[Any] = None,
+        filter: Optional[Filter] = None,
+        prefilter: bool = True,
+    ):
+        """Initialize the MongoDB retriever.
+
+        The connection string defaults to the ``MONGODB_URI`` environment
+        variable. The client is shared with every other retriever using it.
+
+        Args:
+            connection_string: MongoDB connection string.
+            database_name: Database holding the documents; defaults to the
+                ``MONGODB_DATABASE`` environment variable.
+            collection_name: Collection holding the documents; defaults to the
+                ``MONGODB_COLLECTION`` environment variable.
+            embeddings: Encodes queries; defaults to the ``EMBEDDING_MODEL``.
+            index_name: Name of the Atlas vector search index.
+            embedding_field: Document field holding the vector.
+            text_field: Document field holding the page content.
+            metadata_fields: Fields projected into the document metadata.
+            k: Number of documents returned per query.
+            num_candidates_factor: ``numCandidates`` as a multiple of ``k``.
+            pool_size: Connection pool size.
+            collection: Use this collection object instead of connecting.
+            filter: Metadata filter applied to searches that pass none.
+            prefilter: Filter inside ``$vectorSearch`` rather than in a
+                ``$match`` stage after it.
+        """
+        self.mongodb_uri = connection_string or os.getenv("MONGODB_URI")
+        self.database_name = (
+            database_name or os.getenv("MONGODB_DATABASE") or "langgraph"
+        )
+        self.collection_name = (
+            collection_name or os.getenv("MONGODB_COLLECTION") or "documents"
+        )
+        self.embeddings = embeddings or create_encoder(
+            os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        )
+        self.index_name = index_name
+        self.embedding_field = embedding_field
+        self.text_field = text_field
+        self.metadata_fields = list(metadata_fields)
+        self.k = k
+        self.num_candidates_factor = num_candidates_factor
+        self.pool_size = pool_size
+        self.filter = filter
+        self.prefilter = prefilter
+        self._collection = collection
+        if collection is None:
+            self.client = get_mongo_client(self.mongodb_uri, pool_size)
+            self._collection = self.client[self.database_name][self.collection_name]
+
+    @property
+    def collection(self) -> Any:
+        """The collection searched by this retriever."""
+        return self._collection
+
+    @property
+    def async_client(self) -> AsyncIOMotorClient:
+        """The pooled Motor client for the running event loop."""
+        return get_async_mongo_client(self.mongodb_uri, self.pool_size)
+
+    def _build_pipeline(
+        self, vector: List[float], k: int, filter: Optional[Filter] = None
+    ) -> List[Dict[str, Any]]:
+        projection: Dict[str, Any] = {
+            self.text_field: 1,
+            "score": {"$meta": "vectorSearchScore"},
+        }
+        projection.update({field: 1 for field in self.metadata_fields})
+        search: Dict[str, Any] = {
+            "index": self.index_name,
+            "path": self.embedding_field,
+            "queryVector": vector,
+            "numCandidates": k * self.num_candidates_factor,
+            "limit": k,
+        }
+        pipeline: List[Dict[str, Any]] = [{"$vectorSearch": search}]
+        filter = self.filter if filter is None else filter
+        if filter:
+            if self.prefilter:
+                search["filter"] = to_mongo(filter)
+            else:
+                pipeline.append({"$match": to_mongo(filter)})
+        pipeline.append({"$project": projection})
+        return pipeline
+
+    def _to_document(self, record: Dict[str, Any]) -> Document:
+        metadata = {
+            key: value
+            for key, value in record.items()
+            if key not in (self.text_field, "_id")
+        }
+        metadata["id"] = str(record["_id"])
+        return Document(page_content=record.get(self.text_field, ""), metadata=metadata)
+
+    def _search(
+        self, vector: List[float], k: int, filter: Optional[Filter] = None
+    ) -> List[Document]:
+        cursor = self.collection.aggregate(
+            self._build_pipeline(vector, k, filter), batchSize=k
+        )
+        return [self._to_document(record) for record in cursor]
+
+    def get_relevant_documents(
+        self, query: str, k: Optional[int] = None, filter: Optional[Filter] = None
+    ) -> List[Document]:
+        """Get the documents nearest to the query embedding."""
+        return self._search(self.embeddings.embed_query(query), k or self.k, filter)
+
+    async def aget_relevant_documents(
+        self, query: str, k: Optional[int] = None, filter: Optional[Filter] = None
+    ) -> List[Document]:
+        """Asynchronously get the documents nearest to the query embedding."""
+        k = k or self.k
+        vector = await self.embeddings.aembed_query(query)
+        collection = self.async_client[self.database_name][self.collection_name]
+        cursor = collection.aggregate(
+            self._build_pipeline(vector, k, filter), batchSize=k
+        )
+        return [self._to_document(record) for record in await cursor.to_list(length=k)]
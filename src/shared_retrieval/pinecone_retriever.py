@@ -1,27 +1,106 @@
 # src/shared_retrieval/pinecone_retriever.py
 """Pinecone retriever implementation."""
 import os
-from typing import List
+from typing import Any, List, Optional
 
 from langchain_core.documents import Document
-from pinecone import Pinecone
+from langchain_core.embeddings import Embeddings
 
 from src.shared_retrieval.base import BaseRetriever
+from src.shared_retrieval.clients import DEFAULT_POOL_SIZE, get_pinecone_index
+from src.shared_retrieval.encoders import DEFAULT_EMBEDDING_MODEL, create_encoder
+from src.shared_retrieval.filters import Filter, to_pinecone
 
 
 class PineconeRetriever(BaseRetriever):
-    """Pinecone retriever."""
-
-    def __init__(self):
-        """Initialize the Pinecone retriever."""
-        pinecone_api_key = os.getenv("PINECONE_API_KEY")
-        pinecone_index_name = os.getenv("PINECONE_INDEX_NAME")
-        self.client = Pinecone(api_key=pinecone_api_key)
-        self.index = self.client.Index(pinecone_index_name)
-
-    def get_relevant_documents(self, query: str) -> List[Document]:
-        """Get relevant documents based on a query."""
-        # Add Pinecone specific logic here
-        # Retrieving from Pinecone for query
-        # Placeholder for actual Pinecone query
-        return []
+    """Pinecone retriever.
+
+    Queries are namespace-scoped and ask for metadata but not vector values, so
+    each response carries only what becomes the returned documents. Metadata
+    filters are compiled to Pinecone's filter syntax and applied by the index
+    during the search.
+
+    The Pinecone SDK has no asyncio client, so ``aget_relevant_documents`` uses
+    the base class thread offload. The index handle keeps one shared HTTP
+    connection pool sized by ``pool_size`` for all of those calls.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        index_name: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        namespace: Optional[str] = None,
+        text_field: str = "content",
+        k: int = 4,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        index: Optional[Any] = None,
+        filter: Optional[Filter] = None,
+    ):
+        """Initialize the Pinecone retriever.
+
+        Settings default to the ``PINECONE_API_KEY``, ``PINECONE_INDEX_NAME`` and
+        ``PINECONE_NAMESPACE`` environment variables. The index handle is shared
+        process-wide.
+
+        Args:
+            api_key: Pinecone API key.
+            index_name: Name of the Pinecone index.
+            embeddings: Encodes queries; defaults to the ``EMBEDDING_MODEL``.
+            namespace: Default namespace searched.
+            text_field: Metadata field holding the page content.
+            k: Number of documents returned per query.
+            pool_size: Connection pool size.
+            index: Use this index object instead of connecting.
+            filter: Metadata filter applied to searches that pass none.
+        """
+        pinecone_api_key = api_key or os.getenv("PINECONE_API_KEY")
+        self.index_name = index_name or os.getenv("PINECONE_INDEX_NAME")
+        self.embeddings = embeddings or create_encoder(
+            os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        )
+        self.namespace = namespace or os.getenv("PINECONE_NAMESPACE") or ""
+        self.text_field = text_field
+        self.k = k
+        self.filter = filter
+        self.index = (
+            index
+            if index is not None
+            else get_pinecone_index(pinecone_api_key, self.index_name, pool_size)
+        )
+
+    def _to_document(self, match: Any) -> Document:
+        metadata = dict(match.metadata or {})
+        page_content = metadata.pop(self.text_field, "")
+        metadata.update({"id": match.id, "score": match.score})
+        return Document(page_content=page_content, metadata=metadata)
+
+    def _search(
+        self,
+        vector: List[float],
+        k: int,
+        namespace: Optional[str],
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        filter = self.filter if filter is None else filter
+        extra = {"filter": to_pinecone(filter)} if filter else {}
+        response = self.index.query(
+            vector=vector,
+            top_k=k,
+            namespace=self.namespace if namespace is None else namespace,
+            include_metadata=True,
+            include_values=False,
+            **extra,
+        )
+        return [self._to_document(match) for match in response.matches]
+
+    def get_relevant_documents(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        namespace: Optional[str] = None,
+        filter: Optional[Filter] = None,
+    ) -> List[Document]:
+        """Get the documents nearest to the query embedding."""
+        vector = self.embeddings.embed_query(query)
+        return self._search(vector, k or self.k, namespace, filter)
@@ -0,0 +1,199 @@
+# src/shared_retrieval/quantization.py
+"""Compressed vector codes for the local vector index.
+
+Two quantizers trade memory for accuracy:
+
+* ``ScalarQuantizer`` stores every dimension as one byte, 4x smaller than
+  float32.
+* ``ProductQuantizer`` splits vectors into ``m`` sub-vectors and stores the
+  id of the nearest of 256 trained centroids for each, ``m`` bytes per
+  vector (16x smaller than float32 at ``m = dim / 4``).
+
+Both score queries asymmetrically: the query stays in float32 and only the
+stored vectors are quantized, which is markedly more accurate than comparing
+two sets of codes.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Codes are one byte, so product quantizers train 256 centroids per subspace.
+PQ_CENTROIDS = 256
+
+# Codebook training sees at most this many points per centroid; more barely
+# moves the centroids and training time grows linearly.
+PQ_POINTS_PER_CENTROID = 64
+
+
+def kmeans_l2(
+    vectors: np.ndarray, n_clusters: int, iterations: int = 20, seed: int = 0
+) -> np.ndarray:
+    """Cluster vectors with Euclidean k-means and return the centroids."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _nearest(vectors, centroids)
+        # Per-dimension bincounts are much faster than np.add.at for the
+        # short sub-vectors of a product quantizer.
+        sums = np.stack(
+            [
+                np.bincount(assignments, weights=vectors[:, d], minlength=n_clusters)
+                for d in range(vectors.shape[1])
+            ],
+            axis=1,
+        )
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty clusters so every code stays in use.
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            counts[empty] = 1
+        centroids = (sums / counts[:, None]).astype(np.float32)
+    return centroids
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # argmin |x - c|^2 == argmax (x.c - |c|^2 / 2); avoids the full distance
+    # matrix.
+    scores = vectors @ centroids.T
+    scores -= 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    return np.argmax(scores, axis=1)
+
+
+class ScalarQuantizer:
+    """Quantizes each dimension to 8 bits over its trained value range."""
+
+    def __init__(self):
+        """Initialize an untrained quantizer."""
+        self.offset: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return len(self.offset)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the trained parameters."""
+        return self.offset.nbytes + self.scale.nbytes
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Learn the per-dimension value range from sample vectors."""
+        low = vectors.min(axis=0)
+        scale = (vectors.max(axis=0) - low) / 255.0
+        scale[scale == 0] = 1.0
+        self.offset = low.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Return the ``uint8`` codes of vectors; out-of-range values clip."""
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Return the approximate vectors for codes."""
+        return codes * self.scale + self.offset
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Return the ``(queries, codes)`` dot products with decoded vectors."""
+        # q . (c * scale + offset) == (q * scale) . c + q . offset
+        return (queries * self.scale) @ codes.T.astype(np.float32) + (
+            queries @ self.offset
+        )[:, None]
+
+
+class ProductQuantizer:
+    """Encodes vectors as the nearest centroid of each of ``m`` subspaces."""
+
+    def __init__(self, m: int, iterations: int = 20, seed: int = 0):
+        """Initialize an untrained quantizer.
+
+        Args:
+            m: Number of subspaces, i.e. bytes per vector. Must divide the
+                vector dimension.
+            iterations: k-means iterations per subspace.
+            seed: Seed of the centroid initialization.
+        """
+        self.m = m
+        self.iterations = iterations
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.m
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the trained codebooks."""
+        return self.codebooks.nbytes
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors.reshape(len(vectors), self.m, -1)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Train one codebook per subspace from sample vectors."""
+        if vectors.shape[1] % self.m:
+            raise ValueError(
+                f"m={self.m} must divide the vector dimension {vectors.shape[1]}."
+            )
+        limit = PQ_POINTS_PER_CENTROID * PQ_CENTROIDS
+        if len(vectors) > limit:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[rng.choice(len(vectors), limit, replace=False)]
+        subvectors = self._split(vectors)
+        codebooks = np.zeros(
+            (self.m, PQ_CENTROIDS, vectors.shape[1] // self.m), dtype=np.float32
+        )
+        for j in range(self.m):
+            centroids = kmeans_l2(
+                subvectors[:, j], PQ_CENTROIDS, self.iterations, self.seed + j
+            )
+            codebooks[j, : len(centroids)] = centroids
+        self.codebooks = codebooks
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Return the ``(n, m)`` ``uint8`` codes of vectors."""
+        subvectors = self._split(vectors)
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _nearest(subvectors[:, j], self.codebooks[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Return the approximate vectors for codes."""
+        return self.codebooks[np.arange(self.m), codes].reshape(len(codes), -1)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Return the ``(queries, codes)`` dot products with decoded vectors.
+
+        Each query is compared once against every centroid, then a vector's
+        score is the sum of its ``m`` table entries.
+        """
+        tables = np.einsum("qmd,mkd->qmk", self._split(queries), self.codebooks)
+        scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for j in range(self.m):
+            scores += tables[:, j, codes[:, j]]
+        return scores
+
+
+def create_quantizer(method: str, dim: int, m: Optional[int] = None):
+    """Create an untrained quantizer.
+
+    Args:
+        method: ``"int8"`` for scalar or ``"pq"`` for product quantization.
+        dim: Vector dimension.
+        m: Product quantizer subspaces; defaults to the largest divisor of
+            ``dim`` up to ``dim / 4``, for 16x compression.
+    """
+    if method == "int8":
+        return ScalarQuantizer()
+    if method == "pq":
+        if m is None:
+            m = max(d for d in range(1, max(1, dim // 4) + 1) if dim % d == 0)
+        return ProductQuantizer(m)
+    raise ValueError(f"Unsupported quantization method: {method}")
@@ -0,0 +1,139 @@
+# src/shared_retrieval/registry.py
+"""Process-wide registry of retriever instances.
+
+``create_retriever`` always builds a new retriever. Agents that need one per
+invocation should call ``get_retriever`` instead. It returns a shared,
+thread-safe instance for each resolved configuration, so clients, encoders and
+caches are built once per process. ``warmup`` builds retrievers ahead of time
+and runs a probe query so the first user request does not pay for connection
+setup.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.shared_retrieval.base import BaseRetriever
+from src.shared_retrieval.retriever_factory import create_retriever
+from src.shared_retrieval.snapshot import load_snapshot_from_env
+
+logger = logging.getLogger(__name__)
+
+# Environment variables each backend reads when the config leaves them unset.
+_ENV_DEFAULTS = {
+    "elasticsearch": ("ELASTICSEARCH_URL", "ELASTICSEARCH_API_KEY"),
+    "pinecone": ("PINECONE_API_KEY", "PINECONE_INDEX_NAME"),
+    "mongodb": ("MONGODB_URI",),
+}
+
+_retrievers: Dict[str, BaseRetriever] = {}
+_lock = threading.Lock()
+
+
+def _fingerprint(value: Any) -> Any:
+    # Values that are not JSON (embeddings objects, nested retrievers) are
+    # identified by object identity.
+    if isinstance(value, dict):
+        return {key: _fingerprint(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return f"<{type(value).__name__} {id(value)}>"
+
+
+def resolve_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the config with its defaults and environment settings applied.
+
+    Secrets taken from the environment are reduced to a hash, so the resolved
+    config can be logged and used as a cache key.
+    """
+    retriever_type = config.get("type", "elasticsearch")
+    resolved = {**_fingerprint(config), "type": retriever_type}
+    for name in _ENV_DEFAULTS.get(retriever_type, ()):
+        value = os.getenv(name) or ""
+        resolved[f"env:{name}"] = hashlib.sha256(value.encode()).hexdigest()
+    for side in ("lexical", "vector"):
+        if isinstance(config.get(side), dict):
+            resolved[side] = resolve_config(config[side])
+    return resolved
+
+
+def registry_key(config: Dict[str, Any]) -> str:
+    """Return the registry key for a retriever config."""
+    return json.dumps(resolve_config(config), sort_keys=True, default=str)
+
+
+def get_retriever(config: Dict[str, Any]) -> BaseRetriever:
+    """Return the shared retriever for ``config``, creating it on first use."""
+    key = registry_key(config)
+    with _lock:
+        retriever = _retrievers.get(key)
+        if retriever is None:
+            retriever = _retrievers[key] = create_retriever(config)
+    return retriever
+
+
+def clear_registry() -> None:
+    """Forget every registered retriever."""
+    with _lock:
+        _retrievers.clear()
+
+
+def warmup(
+    configs: Sequence[Dict[str, Any]], probe_query: Optional[str] = "warmup"
+) -> List[str]:
+    """Build retrievers ahead of time and optionally probe them.
+
+    Failures are logged rather than raised so a degraded backend never blocks
+    server startup.
+
+    Args:
+        configs: Retriever configs to register.
+        probe_query: Query sent to each retriever to open its connections.
+            ``None`` skips the probe.
+
+    Returns:
+        The registry keys of the retrievers that warmed up successfully.
+    """
+    warmed = []
+    for config in configs:
+        start = time.monotonic()
+        try:
+            retriever = get_retriever(config)
+            if probe_query is not None:
+                retriever.get_relevant_documents(probe_query)
+        except Exception:
+            logger.warning("Retriever warmup failed for %s", config, exc_info=True)
+            continue
+        logger.info(
+            "Warmed up %s retriever in %.1f ms",
+            config.get("type", "elasticsearch"),
+            (time.monotonic() - start) * 1000,
+        )
+        warmed.append(registry_key(config))
+    return warmed
+
+
+def warmup_from_env() -> List[str]:
+    """Run ``warmup`` for the configs listed in ``RETRIEVER_WARMUP``.
+
+    The variable holds a JSON list of retriever configs (or a single config).
+    If ``LOCAL_INDEX_SNAPSHOT`` names a local index snapshot, it is mapped
+    and registered first, so local retrievers serve from it without loading.
+    Nothing happens when neither is set, so importing a graph stays
+    side-effect free unless warmup is explicitly requested.
+    """
+    load_snapshot_from_env()
+    raw = os.getenv("RETRIEVER_WARMUP")
+    if not raw:
+        return []
+    configs = json.loads(raw)
+    if isinstance(configs, dict):
+        configs = [configs]
+    probe_query = os.getenv("RETRIEVER_WARMUP_QUERY", "warmup") or None
+    return warmup(configs, probe_query=probe_query)
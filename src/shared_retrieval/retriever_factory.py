@@ -5,31 +5,113 @@ from typing import Any, Dict
 
 from langchain_core.retrievers import BaseRetriever
 
+from src.shared_retrieval.cache import CachedRetriever
 from src.shared_retrieval.elasticsearch_retriever import ElasticsearchRetriever
+from src.shared_retrieval.encoders import DEFAULT_EMBEDDING_MODEL, create_encoder
+from src.shared_retrieval.hybrid import HybridRetriever
+from src.shared_retrieval.lexical_index import LexicalRetriever, get_lexical_index
+from src.shared_retrieval.local_index import LocalRetriever, get_local_index
 from src.shared_retrieval.mongodb_retriever import MongoRetriever
 from src.shared_retrieval.pinecone_retriever import PineconeRetriever
 
 
 def create_retriever(config: Dict[str, Any]) -> BaseRetriever:
-    """Create a retriever instance based on the configuration."""
+    """Create a retriever instance based on the configuration.
+
+    Setting ``config["cache"]`` to ``True`` or to a dict of ``CachedRetriever``
+    options (``maxsize``, ``ttl``, ``disk_path``) wraps the backend in a result
+    cache.
+
+    The ``"elastic-local"`` type searches an in-process index and needs no
+    external service. It embeds queries with ``config["embeddings"]`` or, if
+    unset, an encoder built from ``config["embedding_model"]`` (the offline
+    hashing encoder by default). ``"elastic-local-lexical"`` is its in-process
+    BM25 counterpart.
+
+    The ``"hybrid"`` type builds ``config["lexical"]`` and ``config["vector"]``
+    recursively and fuses them with reciprocal rank fusion; ``k``,
+    ``lexical_k``, ``vector_k`` and ``rrf_k`` tune the depths.
+
+    ``config["search_kwargs"]["filter"]``, a ``shared_retrieval.filters``
+    expression, becomes the retriever's default metadata filter; a hybrid
+    config hands its ``search_kwargs`` to sides that set none.
+    """
     retriever_type = config.get("type", "elasticsearch")
+    search_kwargs = config.get("search_kwargs") or {}
+    search_filter = search_kwargs.get("filter")
 
     if retriever_type == "elasticsearch":
-        return ElasticsearchRetriever(
+        retriever = ElasticsearchRetriever(
             url=os.getenv("ELASTICSEARCH_URL"),
             api_key=os.getenv("ELASTICSEARCH_API_KEY"),
             index_name=config.get("index_name"),
+            filter=search_filter,
+        )
+    elif retriever_type == "elastic-local":
+        embeddings = config.get("embeddings") or create_encoder(
+            config.get("embedding_model", DEFAULT_EMBEDDING_MODEL)
+        )
+        index_name = config.get("index_name")
+        retriever = LocalRetriever(
+            embeddings=embeddings,
+            index=get_local_index(index_name) if index_name else None,
+            k=config.get("k", 4),
+            filter=search_filter,
+        )
+    elif retriever_type == "elastic-local-lexical":
+        index_name = config.get("index_name")
+        retriever = LexicalRetriever(
+            index=get_lexical_index(index_name) if index_name else None,
+            k=config.get("k", 10),
+            filter=search_filter,
+        )
+    elif retriever_type == "hybrid":
+        lexical_config = {"search_kwargs": search_kwargs, **config["lexical"]}
+        vector_config = {"search_kwargs": search_kwargs, **config["vector"]}
+        retriever = HybridRetriever(
+            lexical=create_retriever(lexical_config),
+            vector=create_retriever(vector_config),
+            lexical_depth_kwarg=(
+                "page_size"
+                if lexical_config.get("type", "elasticsearch") == "elasticsearch"
+                else "k"
+            ),
+            **{
+                key: config[key]
+                for key in ("k", "lexical_k", "vector_k", "rrf_k")
+                if key in config
+            },
         )
     elif retriever_type == "pinecone":
-        return PineconeRetriever(
+        retriever = PineconeRetriever(
             api_key=os.getenv("PINECONE_API_KEY"),
             index_name=os.getenv("PINECONE_INDEX_NAME"),
+            embeddings=config.get("embeddings"),
+            namespace=config.get("namespace"),
+            k=config.get("k", 4),
+            filter=search_filter,
         )
     elif retriever_type == "mongodb":
-        return MongoRetriever(
+        retriever = MongoRetriever(
             connection_string=os.getenv("MONGODB_URI"),
             database_name=config.get("database_name"),
             collection_name=config.get("collection_name"),
+            embeddings=config.get("embeddings"),
+            k=config.get("k", 4),
+            filter=search_filter,
+            prefilter=config.get("prefilter", True),
         )
     else:
         raise ValueError(f"Unsupported retriever type: {retriever_type}")
+
+    cache_config = config.get("cache")
+    if cache_config:
+        options = cache_config if isinstance(cache_config, dict) else {}
+        retriever = CachedRetriever(
+            retriever,
+            provider=retriever_type,
+            index_name=config.get("index_name") or getattr(retriever, "index_name", None),
+            search_kwargs=search_kwargs,
+            **options,
+        )
+    return retriever
@@ -0,0 +1,485 @@
+# src/shared_retrieval/snapshot.py
+"""Memory-mapped snapshots of the local vector and lexical indexes.
+
+A snapshot is a directory of ``.npy`` arrays plus a ``manifest.json``:
+
+* ``vectors.npy``: the normalized float32 vectors, one row per document.
+* ``ids`` and ``documents``: UTF-8 blobs with int64 offset arrays. Documents
+  are JSON and decoded only when a search returns them.
+* ``id_order.npy``: rows sorted by id, for lookups by binary search.
+* ``terms``, ``posting_offsets``, ``posting_rows`` and ``posting_tfs``: the
+  BM25 postings, with terms sorted for binary search, and ``lengths.npy``.
+* ``centroids.npy``, ``ivf_order.npy`` and ``ivf_bounds.npy`` when the
+  vector index uses IVF lists.
+
+Opening a snapshot reads the manifest and maps the arrays without copying
+them, so it takes milliseconds whatever the corpus size, and every worker
+process on a host shares one copy in the page cache. Snapshots are read-only.
+
+``write_snapshot`` builds the directory under a temporary name, renames it
+to a new version directory and atomically repoints the ``path`` symlink to
+it. Readers see either the old or the new snapshot, never a partial one, and
+processes that mapped the old version keep reading it. Only versions older
+than the last ``keep`` are removed, so a reader that resolved the link just
+before a swap can still open the version it found; ``open_snapshot`` also
+re-resolves the link if that version is gone by the time it is read.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.shared_retrieval.filters import Filter, to_predicate
+from src.shared_retrieval.lexical_index import (
+    LocalLexicalIndex,
+    set_lexical_index,
+    tokenize,
+)
+from src.shared_retrieval.local_index import (
+    DEFAULT_INDEX_NAME,
+    LocalVectorIndex,
+    _top_k,
+    set_local_index,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Versions kept next to a published snapshot, including the published one.
+DEFAULT_KEEP_VERSIONS = 3
+# Times ``open_snapshot`` re-resolves a link whose version was removed.
+_OPEN_ATTEMPTS = 3
+
+
+def _write_strings(directory: str, name: str, values: Sequence[bytes]) -> None:
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    np.save(
+        os.path.join(directory, f"{name}.npy"),
+        np.frombuffer(b"".join(values), np.uint8),
+    )
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+
+
+class _Strings:
+    """Read-only sequence of byte strings stored as a blob and offsets."""
+
+    def __init__(self, directory: str, name: str):
+        self._data = _load(directory, name)
+        self._offsets = _load(directory, f"{name}_offsets")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._data[self._offsets[i] : self._offsets[i + 1]].tobytes()
+
+
+class _Documents:
+    """Sequence of documents decoded from a ``_Strings`` table on access."""
+
+    def __init__(self, strings: _Strings):
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, row: int) -> Document:
+        record = json.loads(self._strings[row])
+        return Document(
+            page_content=record["page_content"], metadata=record["metadata"]
+        )
+
+
+class _Ids:
+    """Sequence of ids decoded from a ``_Strings`` table on access."""
+
+    def __init__(self, strings: _Strings):
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, row: int) -> str:
+        return self._strings[row].decode()
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[row] for row in range(len(self)))
+
+
+class _SortedView:
+    """Byte strings of a table in the order given by ``order``, for bisect."""
+
+    def __init__(self, strings: _Strings, order: Optional[np.ndarray] = None):
+        self._strings = strings
+        self._order = order
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._strings[int(self._order[i]) if self._order is not None else i]
+
+    def find(self, key: bytes) -> Optional[int]:
+        """Return the table row holding ``key``, if any."""
+        i = bisect.bisect_left(self, key)
+        if i < len(self) and self[i] == key:
+            return int(self._order[i]) if self._order is not None else i
+        return None
+
+
+class _RowLookup:
+    """Read-only id-to-row mapping over the sorted id table."""
+
+    def __init__(self, view: _SortedView, size: int):
+        self._view = view
+        self._size = size
+
+    def get(self, doc_id: str, default: Optional[int] = None) -> Optional[int]:
+        row = self._view.find(str(doc_id).encode())
+        return row if row is not None and row < self._size else default
+
+    def __contains__(self, doc_id: object) -> bool:
+        return self.get(str(doc_id)) is not None
+
+
+def _load(directory: str, name: str) -> np.ndarray:
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+
+def _read_only(*args: Any, **kwargs: Any) -> None:
+    raise ValueError(
+        "Snapshot indexes are read-only; rebuild and write a new snapshot."
+    )
+
+
+class VectorSnapshot(LocalVectorIndex):
+    """``LocalVectorIndex`` served from a memory-mapped snapshot.
+
+    Searches work as on the index the snapshot was written from; every
+    mutating method raises ``ValueError``.
+    """
+
+    add = delete = build_ivf = drop_ivf = quantize = drop_quantization = _read_only
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        """Map the vector arrays of a snapshot directory."""
+        super().__init__(manifest["dim"])
+        strings = _Strings(directory, "ids")
+        self._vectors = _load(directory, "vectors")
+        self._size = len(self._vectors)
+        self._ids = _Ids(strings)
+        self._documents = _Documents(_Strings(directory, "documents"))
+        self._rows = _RowLookup(
+            _SortedView(strings, _load(directory, "id_order")), self._size
+        )
+        ivf = manifest.get("ivf")
+        if ivf:
+            self._centroids = _load(directory, "centroids")
+            order = _load(directory, "ivf_order")
+            bounds = _load(directory, "ivf_bounds")
+            self._lists = [
+                order[bounds[c] : bounds[c + 1]] for c in range(len(self._centroids))
+            ]
+            self.nprobe = ivf["nprobe"]
+
+
+class LexicalSnapshot:
+    """BM25 index served from a memory-mapped snapshot.
+
+    Scores match ``LocalLexicalIndex.search``; postings are scored with numpy
+    instead of per-document Python loops.
+    """
+
+    add = delete = _read_only
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        """Map the lexical arrays of a snapshot directory."""
+        lexical = manifest["lexical"]
+        self.k1 = lexical["k1"]
+        self.b = lexical["b"]
+        self.version = 0
+        self._count = lexical["documents"]
+        self._avg_length = lexical["total_length"] / max(self._count, 1)
+        self._terms = _SortedView(_Strings(directory, "terms"))
+        self._offsets = _load(directory, "posting_offsets")
+        self._rows = _load(directory, "posting_rows")
+        self._tfs = _load(directory, "posting_tfs")
+        self._lengths = _load(directory, "lengths")
+        self._documents = _Documents(_Strings(directory, "documents"))
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return self._count
+
+    def search(
+        self, query: str, k: int = 10, filter: Optional[Filter] = None
+    ) -> List[Tuple[Document, float]]:
+        """Return the k best BM25 matches for the query, best first.
+
+        With a ``filter``, only matching documents are ranked.
+        """
+        rows, contributions = [], []
+        for term in set(tokenize(query)):
+            t = self._terms.find(term.encode())
+            if t is None:
+                continue
+            start, end = self._offsets[t], self._offsets[t + 1]
+            df = end - start
+            idf = np.log(1 + (self._count - df + 0.5) / (df + 0.5))
+            term_rows = self._rows[start:end]
+            tf = self._tfs[start:end].astype(np.float64)
+            norm = self.k1 * (
+                1 - self.b + self.b * self._lengths[term_rows] / self._avg_length
+            )
+            rows.append(term_rows)
+            contributions.append(idf * tf * (self.k1 + 1) / (tf + norm))
+        if not rows:
+            return []
+        candidates, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        if filter:
+            predicate = to_predicate(filter)
+            keep = np.fromiter(
+                (predicate(self._documents[int(row)].metadata) for row in candidates),
+                dtype=bool,
+                count=len(candidates),
+            )
+            candidates, scores = candidates[keep], scores[keep]
+        best, values = _top_k(scores[None, :], k)
+        return [
+            (self._documents[int(candidates[i])], float(score))
+            for i, score in zip(best[0], values[0])
+        ]
+
+
+def _encode_document(document: Document) -> bytes:
+    return json.dumps(
+        {"page_content": document.page_content, "metadata": document.metadata},
+        ensure_ascii=False,
+        default=str,
+    ).encode()
+
+
+def _write_directory(
+    directory: str,
+    index: LocalVectorIndex,
+    lexical_index: Optional[LocalLexicalIndex],
+    name: str,
+) -> None:
+    manifest: Dict[str, Any] = {
+        "format": FORMAT_VERSION,
+        "name": name,
+        "created": time.time(),
+        "ivf": None,
+        "lexical": None,
+    }
+    with index._lock:
+        if index.dim is None:
+            raise ValueError("Cannot snapshot an empty vector index.")
+        manifest["dim"] = index.dim
+        np.save(os.path.join(directory, "vectors.npy"), np.asarray(index.vectors))
+        ids = list(index._ids)
+        documents = list(index._documents)
+        if index.is_approximate:
+            lists = index._inverted_lists()
+            np.save(os.path.join(directory, "centroids.npy"), index._centroids)
+            np.save(os.path.join(directory, "ivf_order.npy"), np.concatenate(lists))
+            bounds = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum([len(rows) for rows in lists], out=bounds[1:])
+            np.save(os.path.join(directory, "ivf_bounds.npy"), bounds)
+            manifest["ivf"] = {"nprobe": index.nprobe}
+
+    if lexical_index is not None:
+        with lexical_index._lock:
+            row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+            # Documents only in the lexical index get rows past the vectors.
+            for doc_id, document in lexical_index._documents.items():
+                if doc_id not in row_of:
+                    row_of[doc_id] = len(ids)
+                    ids.append(doc_id)
+                    documents.append(document)
+            lengths = np.zeros(len(ids), dtype=np.int32)
+            for doc_id, length in lexical_index._lengths.items():
+                lengths[row_of[doc_id]] = length
+            terms = sorted(lexical_index._postings, key=lambda term: term.encode())
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            rows: List[int] = []
+            tfs: List[int] = []
+            for t, term in enumerate(terms):
+                postings = lexical_index._postings[term]
+                rows.extend(row_of[doc_id] for doc_id in postings)
+                tfs.extend(postings.values())
+                offsets[t + 1] = len(rows)
+            manifest["lexical"] = {
+                "k1": lexical_index.k1,
+                "b": lexical_index.b,
+                "documents": len(lexical_index),
+                "total_length": lexical_index._total_length,
+            }
+        _write_strings(directory, "terms", [term.encode() for term in terms])
+        np.save(os.path.join(directory, "posting_offsets.npy"), offsets)
+        np.save(os.path.join(directory, "posting_rows.npy"), np.asarray(rows, np.int64))
+        np.save(os.path.join(directory, "posting_tfs.npy"), np.asarray(tfs, np.int32))
+        np.save(os.path.join(directory, "lengths.npy"), lengths)
+
+    encoded_ids = [str(doc_id).encode() for doc_id in ids]
+    _write_strings(directory, "ids", encoded_ids)
+    _write_strings(directory, "documents", [_encode_document(d) for d in documents])
+    order = sorted(range(len(encoded_ids)), key=encoded_ids.__getitem__)
+    np.save(os.path.join(directory, "id_order.npy"), np.asarray(order, np.int64))
+    # The manifest goes last; a directory without one is incomplete.
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+def _versions(path: str) -> List[str]:
+    """Return the complete version directories of ``path``, oldest first."""
+    parent, base = os.path.split(path)
+    # Versions are named by write time, so they sort oldest first.
+    pattern = re.compile(re.escape(base) + r"-\d{14}(\d{9})?-[0-9a-f]{8}")
+    return [
+        os.path.join(parent, entry)
+        for entry in sorted(os.listdir(parent))
+        if pattern.fullmatch(entry)
+        and os.path.exists(os.path.join(parent, entry, MANIFEST))
+    ]
+
+
+def remove_old_versions(path: str, keep: int = DEFAULT_KEEP_VERSIONS) -> List[str]:
+    """Remove all but the newest ``keep`` versions of the snapshot at ``path``.
+
+    The version ``path`` points to is never removed. Staging directories of
+    writes still in progress are left alone.
+
+    Returns:
+        The removed version directories.
+    """
+    if keep < 1:
+        raise ValueError("keep must be at least 1.")
+    path = os.path.abspath(path)
+    current = os.path.realpath(path) if os.path.islink(path) else None
+    versions = _versions(path)
+    removed = [v for v in versions[: max(len(versions) - keep, 0)] if v != current]
+    for version in removed:
+        # Processes that mapped the old files keep them until they exit.
+        shutil.rmtree(version, ignore_errors=True)
+    return removed
+
+
+def write_snapshot(
+    path: str,
+    index: LocalVectorIndex,
+    lexical_index: Optional[LocalLexicalIndex] = None,
+    name: str = DEFAULT_INDEX_NAME,
+    keep: int = DEFAULT_KEEP_VERSIONS,
+) -> str:
+    """Write a snapshot of the local indexes and publish it at ``path``.
+
+    ``path`` becomes a symlink to a new version directory next to it. The
+    newest ``keep`` versions, the new one included, are kept for readers
+    that resolved the link before the swap; older ones are removed.
+
+    Args:
+        path: Where the snapshot is published.
+        index: Vector index to snapshot.
+        lexical_index: Optional BM25 index to include.
+        name: Index name the snapshot is registered under when loaded.
+        keep: Number of versions to keep, at least 1.
+
+    Returns:
+        The version directory that was written.
+    """
+    if keep < 1:
+        raise ValueError("keep must be at least 1.")
+    path = os.path.abspath(path)
+    if os.path.exists(path) and not os.path.islink(path):
+        raise ValueError(f"{path} exists and is not a snapshot symlink.")
+    now = time.time_ns()
+    stamp = time.strftime("%Y%m%d%H%M%S", time.localtime(now // 10**9))
+    version = f"{path}-{stamp}{now % 10**9:09d}-{uuid.uuid4().hex[:8]}"
+    staging = f"{version}.tmp"
+    os.makedirs(staging)
+    try:
+        _write_directory(staging, index, lexical_index, name)
+        os.rename(staging, version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    link = f"{path}.{uuid.uuid4().hex[:8]}.link"
+    os.symlink(os.path.basename(version), link)
+    os.replace(link, path)
+    remove_old_versions(path, keep)
+    return version
+
+
+def _open_directory(
+    directory: str,
+) -> Tuple[VectorSnapshot, Optional[LexicalSnapshot], str]:
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+    lexical = LexicalSnapshot(directory, manifest) if manifest["lexical"] else None
+    return VectorSnapshot(directory, manifest), lexical, manifest["name"]
+
+
+def open_snapshot(path: str) -> Tuple[VectorSnapshot, Optional[LexicalSnapshot], str]:
+    """Map the snapshot published at ``path``.
+
+    If the version the link resolved to is removed while it is being opened,
+    the link is resolved again and the version it now points to is opened.
+
+    Returns:
+        The vector index, the lexical index if the snapshot has one, and the
+        index name the snapshot was written under.
+    """
+    directory = os.path.realpath(path)
+    for _ in range(_OPEN_ATTEMPTS - 1):
+        try:
+            return _open_directory(directory)
+        except FileNotFoundError:
+            latest = os.path.realpath(path)
+            if latest == directory:
+                raise
+            logger.info("Snapshot %s was removed while opening; retrying", directory)
+            directory = latest
+    return _open_directory(directory)
+
+
+def load_snapshot(path: str) -> str:
+    """Open a snapshot and register its indexes; return the index name.
+
+    Afterwards ``get_local_index`` and ``get_lexical_index`` return the
+    snapshot indexes for that name, so retrievers built from configs search
+    them.
+    """
+    start = time.monotonic()
+    vector, lexical, name = open_snapshot(path)
+    set_local_index(name, vector)
+    if lexical is not None:
+        set_lexical_index(name, lexical)
+    logger.info(
+        "Mapped %d-document snapshot %s in %.1f ms",
+        len(vector),
+        name,
+        (time.monotonic() - start) * 1000,
+    )
+    return name
+
+
+def load_snapshot_from_env() -> Optional[str]:
+    """Run ``load_snapshot`` for the path in ``LOCAL_INDEX_SNAPSHOT``, if set."""
+    path = os.getenv("LOCAL_INDEX_SNAPSHOT")
+    return load_snapshot(path) if path else None
@@ -0,0 +1,208 @@
+# src/shared_retrieval/standins.py
+"""In-process stand-ins for the MongoDB and Pinecone vector search APIs.
+
+They implement just enough of each client's interface for MongoRetriever and
+PineconeRetriever to run unchanged, which makes them useful for tests, local
+development and benchmarks. An optional per-round-trip latency simulates the
+network so the effect of batching can be measured. Both honour metadata
+filters in the MongoDB operator syntax the two services share.
+"""
+
+import math
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from src.shared_retrieval.local_index import LocalVectorIndex
+
+# A MongoDB cursor returns at most 101 documents in its first batch unless a
+# batch size is requested.
+MONGO_DEFAULT_FIRST_BATCH = 101
+
+_OPERATORS = {
+    "$eq": lambda value, arg: value == arg,
+    "$ne": lambda value, arg: value != arg,
+    "$in": lambda value, arg: value in arg,
+    "$nin": lambda value, arg: value not in arg,
+    "$gt": lambda value, arg: value is not None and value > arg,
+    "$gte": lambda value, arg: value is not None and value >= arg,
+    "$lt": lambda value, arg: value is not None and value < arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+}
+
+
+def _matches(condition: Dict[str, Any], record: Dict[str, Any]) -> bool:
+    """Evaluate a MongoDB-style filter against a flat record."""
+    for key, spec in condition.items():
+        if key == "$and":
+            if not all(_matches(c, record) for c in spec):
+                return False
+        elif key == "$or":
+            if not any(_matches(c, record) for c in spec):
+                return False
+        elif isinstance(spec, dict):
+            value = record.get(key)
+            try:
+                if not all(_OPERATORS[op](value, arg) for op, arg in spec.items()):
+                    return False
+            except TypeError:
+                return False
+        elif record.get(key) != spec:
+            return False
+    return True
+
+
+class LocalMongoCollection:
+    """Stand-in for a collection with an Atlas ``$vectorSearch`` index."""
+
+    def __init__(
+        self, embedding_field: str = "embedding", round_trip_latency: float = 0.0
+    ):
+        """Initialize an empty collection."""
+        self.embedding_field = embedding_field
+        self.round_trip_latency = round_trip_latency
+        self.round_trips = 0
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._index = LocalVectorIndex()
+
+    def insert_many(self, records: Sequence[Dict[str, Any]]) -> None:
+        """Insert records; each needs an ``_id`` and an embedding."""
+        ids = [str(record["_id"]) for record in records]
+        self._index.add(
+            ids,
+            [record[self.embedding_field] for record in records],
+            [Document(page_content="", metadata={"id": doc_id}) for doc_id in ids],
+        )
+        self._records.update(zip(ids, records))
+
+    def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.round_trip_latency:
+            time.sleep(self.round_trip_latency)
+
+    def aggregate(
+        self, pipeline: List[Dict[str, Any]], batchSize: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Run a ``$vectorSearch`` pipeline with ``$match`` and ``$project``."""
+        search = pipeline[0]["$vectorSearch"]
+        prefilter = search.get("filter")
+        hits = self._index.search(
+            [search["queryVector"]],
+            len(self._index) if prefilter else search["limit"],
+        )[0]
+        if prefilter:
+            hits = [
+                (document, score)
+                for document, score in hits
+                if _matches(prefilter, self._records[document.metadata["id"]])
+            ][: search["limit"]]
+        matches = [stage["$match"] for stage in pipeline[1:] if "$match" in stage]
+        projection = next(
+            (stage["$project"] for stage in pipeline[1:] if "$project" in stage), None
+        )
+
+        results = []
+        for document, score in hits:
+            record = self._records[document.metadata["id"]]
+            if not all(_matches(match, record) for match in matches):
+                continue
+            if projection is None:
+                results.append(dict(record))
+                continue
+            projected = {"_id": record["_id"]}
+            for field, spec in projection.items():
+                if spec == {"$meta": "vectorSearchScore"}:
+                    projected[field] = score
+                elif spec and field in record:
+                    projected[field] = record[field]
+            results.append(projected)
+
+        if batchSize:
+            later_batches = math.ceil(max(0, len(results) - batchSize) / batchSize)
+        else:
+            # Without a batch size, getMore returns everything left (up to 16 MiB).
+            later_batches = int(len(results) > MONGO_DEFAULT_FIRST_BATCH)
+        for _ in range(1 + later_batches):
+            self._round_trip()
+        return iter(results)
+
+
+class LocalPineconeIndex:
+    """Stand-in for a Pinecone index handle."""
+
+    def __init__(self, round_trip_latency: float = 0.0):
+        """Initialize an empty index."""
+        self.round_trip_latency = round_trip_latency
+        self.round_trips = 0
+        self._namespaces: Dict[str, LocalVectorIndex] = {}
+        self._metadata: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def upsert(
+        self,
+        vectors: Sequence[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: str = "",
+    ) -> None:
+        """Insert or replace ``(id, values, metadata)`` tuples."""
+        index = self._namespaces.setdefault(namespace, LocalVectorIndex())
+        index.add(
+            [vector_id for vector_id, _, _ in vectors],
+            [values for _, values, _ in vectors],
+            [
+                Document(page_content="", metadata={"id": vector_id})
+                for vector_id, _, _ in vectors
+            ],
+        )
+        for vector_id, _, metadata in vectors:
+            self._metadata[(namespace, vector_id)] = metadata
+
+    def delete(self, ids: Sequence[str], namespace: str = "") -> None:
+        """Delete vectors by id from a namespace."""
+        index = self._namespaces.get(namespace)
+        if index is not None:
+            index.delete(ids)
+        for vector_id in ids:
+            self._metadata.pop((namespace, vector_id), None)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str = "",
+        include_metadata: bool = False,
+        include_values: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> SimpleNamespace:
+        """Return the ``top_k`` nearest vectors in a namespace."""
+        self.round_trips += 1
+        if self.round_trip_latency:
+            time.sleep(self.round_trip_latency)
+        index = self._namespaces.get(namespace)
+        hits = (
+            index.search([vector], len(index) if filter else top_k)[0]
+            if index is not None
+            else []
+        )
+        if filter:
+            hits = [
+                (document, score)
+                for document, score in hits
+                if _matches(filter, self._metadata[(namespace, document.metadata["id"])])
+            ][:top_k]
+        return SimpleNamespace(
+            matches=[
+                SimpleNamespace(
+                    id=document.metadata["id"],
+                    score=score,
+                    metadata=(
+                        self._metadata[(namespace, document.metadata["id"])]
+                        if include_metadata
+                        else None
+                    ),
+                    values=None,
+                )
+                for document, score in hits
+            ]
+        )
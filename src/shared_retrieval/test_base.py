@@ -1,9 +1,11 @@
 """Tests for the base retriever implementation."""
 
+import time
+
 import pytest
 from langchain_core.documents import Document
 
-from .base import BaseRetriever, FallbackRetriever
+from .base import BaseRetriever, FallbackRetriever, merge_results
 
 
 class TestBaseRetriever:
@@ -41,3 +43,121 @@ class TestFallbackRetriever:
         results = fallback.get_relevant_documents("test")
         assert len(results) == 1
         assert results[0].page_content == "test"
+
+
+class SlowRetriever(BaseRetriever):
+    def __init__(self, delay, content):
+        self.delay = delay
+        self.content = content
+        self.calls = 0
+
+    def get_relevant_documents(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [Document(page_content=self.content)] if self.content else []
+
+
+class TestHedgedFallbackRetriever:
+    def test_hedge_returns_first_non_empty(self):
+        slow = SlowRetriever(1.0, "primary")
+        fast = SlowRetriever(0.0, "secondary")
+        fallback = FallbackRetriever([slow, fast], hedge_delay=0.05)
+
+        start = time.monotonic()
+        results = fallback.get_relevant_documents("test")
+        assert time.monotonic() - start < 0.5
+        assert results[0].page_content == "secondary"
+
+    def test_hedge_prefers_primary_when_fast(self):
+        primary = SlowRetriever(0.0, "primary")
+        secondary = SlowRetriever(0.0, "secondary")
+        fallback = FallbackRetriever([primary, secondary], hedge_delay=0.5)
+
+        results = fallback.get_relevant_documents("test")
+        assert results[0].page_content == "primary"
+        assert secondary.calls == 0
+
+    def test_hedge_skips_empty_results_immediately(self):
+        empty = SlowRetriever(0.0, None)
+        secondary = SlowRetriever(0.0, "secondary")
+        fallback = FallbackRetriever([empty, secondary], hedge_delay=10)
+
+        start = time.monotonic()
+        results = fallback.get_relevant_documents("test")
+        assert time.monotonic() - start < 1
+        assert results[0].page_content == "secondary"
+
+    def test_per_backend_timeout(self):
+        slow = SlowRetriever(1.0, "primary")
+        secondary = SlowRetriever(0.0, "secondary")
+        fallback = FallbackRetriever([slow, secondary], timeouts=[0.05, None])
+
+        start = time.monotonic()
+        results = fallback.get_relevant_documents("test")
+        assert time.monotonic() - start < 0.5
+        assert results[0].page_content == "secondary"
+
+    def test_all_backends_time_out(self):
+        slow = SlowRetriever(1.0, "primary")
+        fallback = FallbackRetriever([slow], hedge_delay=0, timeouts=[0.05])
+        assert fallback.get_relevant_documents("test") == []
+
+    def test_invalid_timeouts(self):
+        with pytest.raises(ValueError):
+            FallbackRetriever([SlowRetriever(0, "a")], timeouts=[1, 2])
+
+
+class TestAsyncRetrieval:
+    @pytest.mark.asyncio
+    async def test_default_async_runs_sync_in_thread(self):
+        retriever = SlowRetriever(0.0, "test")
+        results = await retriever.aget_relevant_documents("test")
+        assert results[0].page_content == "test"
+
+    @pytest.mark.asyncio
+    async def test_async_sequential_fallback(self):
+        fallback = FallbackRetriever([SlowRetriever(0.0, None), SlowRetriever(0.0, "b")])
+        results = await fallback.aget_relevant_documents("test")
+        assert results[0].page_content == "b"
+
+    @pytest.mark.asyncio
+    async def test_async_hedge_cancels_slow_backend(self):
+        slow = SlowRetriever(1.0, "primary")
+        fast = SlowRetriever(0.0, "secondary")
+        fallback = FallbackRetriever([slow, fast], hedge_delay=0.05)
+
+        start = time.monotonic()
+        results = await fallback.aget_relevant_documents("test")
+        assert time.monotonic() - start < 0.5
+        assert results[0].page_content == "secondary"
+
+    @pytest.mark.asyncio
+    async def test_async_per_backend_timeout(self):
+        slow = SlowRetriever(1.0, "primary")
+        fallback = FallbackRetriever([slow], timeouts=[0.05])
+        assert await fallback.aget_relevant_documents("test") == []
+
+
+class TestBatchRetrieval:
+    def test_default_batch_merges_and_deduplicates(self):
+        class EchoRetriever(BaseRetriever):
+            def get_relevant_documents(self, query):
+                return [
+                    Document(page_content=query, metadata={"id": query}),
+                    Document(page_content="shared", metadata={"id": "shared"}),
+                ]
+
+        results = EchoRetriever().get_relevant_documents_batch(["a", "b"])
+        assert [doc.metadata["id"] for doc in results] == ["a", "b", "shared"]
+
+    def test_merge_results_dedups_by_content_without_ids(self):
+        merged = merge_results(
+            [[Document(page_content="x")], [Document(page_content="x")]]
+        )
+        assert len(merged) == 1
+
+    @pytest.mark.asyncio
+    async def test_async_batch(self):
+        retriever = SlowRetriever(0.0, "test")
+        results = await retriever.aget_relevant_documents_batch(["a", "b"])
+        assert len(results) == 1
@@ -0,0 +1,105 @@
+"""Tests for the retrieval result cache."""
+
+import pytest
+from langchain_core.documents import Document
+
+from .cache import CachedRetriever, make_cache_key
+
+
+@pytest.fixture
+def backend(mocker):
+    retriever = mocker.Mock()
+    retriever.get_relevant_documents.side_effect = lambda query, **kwargs: [
+        Document(page_content=query, metadata={"id": query})
+    ]
+    return retriever
+
+
+class TestCacheKey:
+    def test_normalizes_query(self):
+        assert make_cache_key("es", "idx", "What is  LCEL?", {}) == make_cache_key(
+            "es", "idx", "what is lcel?", {}
+        )
+
+    def test_covers_provider_index_and_kwargs(self):
+        base = make_cache_key("es", "idx", "q", {"k": 1})
+        assert base != make_cache_key("pinecone", "idx", "q", {"k": 1})
+        assert base != make_cache_key("es", "other", "q", {"k": 1})
+        assert base != make_cache_key("es", "idx", "q", {"k": 2})
+
+
+class TestCachedRetriever:
+    def test_repeated_query_hits_cache(self, backend):
+        cached = CachedRetriever(backend, provider="es")
+        cached.get_relevant_documents("Hello")
+        results = cached.get_relevant_documents("  hello ")
+
+        assert results[0].page_content == "Hello"
+        assert backend.get_relevant_documents.call_count == 1
+        assert (cached.stats.hits, cached.stats.misses) == (1, 1)
+
+    def test_lru_eviction(self, backend):
+        cached = CachedRetriever(backend, provider="es", maxsize=2)
+        for query in ["a", "b", "a", "c", "a", "b"]:
+            cached.get_relevant_documents(query)
+        # "b" was the least recently used entry when "c" arrived.
+        assert backend.get_relevant_documents.call_count == 4
+
+    def test_ttl_expiry(self, backend, mocker):
+        clock = mocker.patch("time.time", return_value=0)
+        cached = CachedRetriever(backend, provider="es", ttl=10)
+        cached.get_relevant_documents("a")
+        clock.return_value = 11
+        cached.get_relevant_documents("a")
+        assert backend.get_relevant_documents.call_count == 2
+
+    def test_disk_tier_survives_restart(self, backend, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        CachedRetriever(backend, provider="es", disk_path=path).get_relevant_documents(
+            "a"
+        )
+
+        restarted = CachedRetriever(backend, provider="es", disk_path=path)
+        results = restarted.get_relevant_documents("a")
+
+        assert results[0].metadata == {"id": "a"}
+        assert backend.get_relevant_documents.call_count == 1
+        assert restarted.stats.disk_hits == 1
+
+    def test_mutating_a_result_leaves_the_cache_intact(self, backend):
+        cached = CachedRetriever(backend, provider="es")
+        cached.get_relevant_documents("a").clear()
+        cached.get_relevant_documents("a").append(Document(page_content="x"))
+
+        assert [doc.page_content for doc in cached.get_relevant_documents("a")] == [
+            "a"
+        ]
+        assert backend.get_relevant_documents.call_count == 1
+
+    def test_empty_results_are_not_cached_by_default(self, backend, mocker):
+        backend.get_relevant_documents.side_effect = lambda query, **kwargs: []
+        clock = mocker.patch("time.time", return_value=0)
+        cached = CachedRetriever(backend, provider="es")
+        short = CachedRetriever(backend, provider="es", empty_ttl=5)
+
+        for retriever in (cached, cached, short, short):
+            assert retriever.get_relevant_documents("a") == []
+        assert backend.get_relevant_documents.call_count == 3
+        clock.return_value = 6
+        short.get_relevant_documents("a")
+        assert backend.get_relevant_documents.call_count == 4
+
+    def test_disk_tier_is_bounded(self, backend, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cached = CachedRetriever(
+            backend, provider="es", maxsize=1, disk_path=path, disk_maxsize=3
+        )
+        for query in ["a", "b", "c", "d", "e"]:
+            cached.get_relevant_documents(query)
+
+        restarted = CachedRetriever(backend, provider="es", disk_path=path)
+        for query in ["c", "d", "e", "a"]:
+            restarted.get_relevant_documents(query)
+
+        assert restarted.stats.disk_hits == 3
+        assert restarted.stats.misses == 1
@@ -0,0 +1,119 @@
+"""Tests for the Elasticsearch retriever implementation."""
+
+import pytest
+from elastic_transport import ConnectionError
+
+from .elasticsearch_retriever import ElasticsearchRetriever
+
+
+def _hit(i):
+    return {
+        "_id": str(i),
+        "_score": 1.0 / (i + 1),
+        "_source": {"content": f"doc {i}"},
+        "sort": [1.0 / (i + 1), i],
+    }
+
+
+@pytest.fixture
+def retriever(mocker, monkeypatch):
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://localhost:9200")
+    monkeypatch.setenv("ELASTICSEARCH_API_KEY", "key")
+    retriever = ElasticsearchRetriever()
+    retriever.client = mocker.Mock()
+    return retriever
+
+
+class TestBoundedSearch:
+    def test_returns_single_page_without_scroll(self, retriever):
+        retriever.client.search.return_value = {"hits": {"hits": [_hit(0), _hit(1)]}}
+
+        results = retriever.get_relevant_documents("test", page_size=2, page=3)
+
+        assert [doc.metadata["id"] for doc in results] == ["0", "1"]
+        body = retriever.client.search.call_args.kwargs["body"]
+        assert body["from"] == 4 and body["size"] == 2
+        assert "scroll" not in retriever.client.search.call_args.kwargs
+        retriever.client.scroll.assert_not_called()
+
+    def test_invalid_query_type(self, retriever):
+        with pytest.raises(ValueError):
+            retriever.get_relevant_documents("test", query_type="fuzzy")
+
+
+class TestStreamingSearch:
+    def test_pages_with_search_after_and_closes_pit(self, retriever):
+        retriever.client.open_point_in_time.return_value = {"id": "pit-1"}
+        retriever.client.search.side_effect = [
+            {"pit_id": "pit-2", "hits": {"hits": [_hit(0), _hit(1)]}},
+            {"pit_id": "pit-3", "hits": {"hits": [_hit(2)]}},
+        ]
+
+        results = list(retriever.stream_relevant_documents("test", page_size=2))
+
+        assert [doc.page_content for doc in results] == ["doc 0", "doc 1", "doc 2"]
+        second_body = retriever.client.search.call_args_list[1].kwargs["body"]
+        assert second_body["search_after"] == _hit(1)["sort"]
+        assert second_body["pit"]["id"] == "pit-2"
+        retriever.client.close_point_in_time.assert_called_once_with(id="pit-3")
+
+    def test_is_lazy_and_cleans_up_early_exit(self, retriever):
+        retriever.client.open_point_in_time.return_value = {"id": "pit-1"}
+        retriever.client.search.return_value = {
+            "hits": {"hits": [_hit(0), _hit(1)]}
+        }
+
+        stream = retriever.stream_relevant_documents("test", page_size=2)
+        retriever.client.open_point_in_time.assert_not_called()
+        assert next(stream).page_content == "doc 0"
+        stream.close()
+
+        assert retriever.client.search.call_count == 1
+        retriever.client.close_point_in_time.assert_called_once_with(id="pit-1")
+
+
+class TestBatchSearch:
+    def test_single_msearch_round_trip(self, retriever):
+        retriever.client.msearch.return_value = {
+            "responses": [
+                {"hits": {"hits": [_hit(0), _hit(1)]}},
+                {"hits": {"hits": [_hit(1), _hit(2)]}},
+            ]
+        }
+
+        results = retriever.get_relevant_documents_batch(["a", "b"], page_size=2)
+
+        retriever.client.msearch.assert_called_once()
+        searches = retriever.client.msearch.call_args.kwargs["searches"]
+        assert len(searches) == 4
+        assert [doc.metadata["id"] for doc in results] == ["0", "1", "2"]
+
+    def test_failed_sub_search_raises(self, retriever):
+        retriever.client.msearch.return_value = {
+            "responses": [{"error": {"type": "index_not_found_exception"}}]
+        }
+        with pytest.raises(ConnectionError):
+            retriever.get_relevant_documents_batch(["a"])
+
+
+class TestFilters:
+    def test_default_filter_wraps_query_in_bool_filter(self, retriever):
+        retriever.filter = {"source": "docs"}
+        retriever.client.search.return_value = {"hits": {"hits": []}}
+
+        retriever.get_relevant_documents("test")
+
+        query = retriever.client.search.call_args.kwargs["body"]["query"]
+        assert query["bool"]["filter"] == [{"term": {"source": "docs"}}]
+        assert "multi_match" in query["bool"]["must"][0]
+
+    def test_call_filter_overrides_default_in_msearch(self, retriever):
+        retriever.filter = {"source": "docs"}
+        retriever.client.msearch.return_value = {"responses": []}
+
+        retriever.get_relevant_documents_batch(
+            ["a"], filter={"field": "version", "gte": 2}
+        )
+
+        body = retriever.client.msearch.call_args.kwargs["searches"][1]
+        assert body["query"]["bool"]["filter"] == [{"range": {"version": {"gte": 2}}}]
@@ -0,0 +1,86 @@
+"""Tests for the embedding encoders."""
+
+import numpy as np
+import pytest
+
+from .encoders import (
+    BatchedEncoder,
+    HashingEncoder,
+    SQLiteEmbeddingCache,
+    create_encoder,
+)
+
+
+class TestHashingEncoder:
+    def test_deterministic_and_normalized(self):
+        a = HashingEncoder(dim=64).embed_query("LangGraph state reducers")
+        b = HashingEncoder(dim=64).embed_query("LangGraph state reducers")
+        assert a == b
+        assert np.linalg.norm(a) == pytest.approx(1.0)
+
+    def test_similar_texts_score_higher(self):
+        encoder = HashingEncoder()
+        query = np.array(encoder.embed_query("how do reducers merge state"))
+        close, far = np.array(
+            encoder.embed_documents(
+                ["reducers merge state updates", "pinecone serverless pricing"]
+            )
+        )
+        assert query @ close > query @ far
+
+
+class TestBatchedEncoder:
+    @pytest.fixture
+    def model(self, mocker):
+        model = mocker.Mock()
+        model.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        return model
+
+    def test_batches_and_deduplicates(self, model):
+        encoder = BatchedEncoder(model, "m", batch_size=2)
+        vectors = encoder.embed_documents(["a", "bb", "a", "ccc", "dddd"])
+
+        assert vectors == [[1.0], [2.0], [1.0], [3.0], [4.0]]
+        assert [call.args[0] for call in model.embed_documents.call_args_list] == [
+            ["a", "bb"],
+            ["ccc", "dddd"],
+        ]
+
+    def test_char_bound(self, model):
+        encoder = BatchedEncoder(model, "m", max_batch_chars=4)
+        encoder.embed_documents(["aa", "bb", "cc"])
+        assert model.embed_documents.call_count == 2
+
+    def test_persistent_cache_skips_unchanged_texts(self, model, tmp_path):
+        path = str(tmp_path / "embeddings.sqlite")
+        BatchedEncoder(model, "m", cache=SQLiteEmbeddingCache(path)).embed_documents(
+            ["a", "bb"]
+        )
+
+        encoder = BatchedEncoder(model, "m", cache=SQLiteEmbeddingCache(path))
+        assert encoder.embed_documents(["bb", "a", "eee"]) == [[2.0], [1.0], [3.0]]
+        assert model.embed_documents.call_args.args[0] == ["eee"]
+        assert encoder.model_calls == 1
+
+    def test_query_and_document_vectors_are_cached_apart(self, model):
+        model.embed_query.side_effect = lambda text: [-float(len(text))]
+        encoder = BatchedEncoder(model, "m")
+
+        assert encoder.embed_documents(["a"]) == [[1.0]]
+        assert encoder.embed_query("a") == [-1.0]
+        assert encoder.embed_query("a") == [-1.0]
+        assert encoder.embed_documents(["a"]) == [[1.0]]
+        assert encoder.model_calls == 2
+
+    def test_cache_is_scoped_by_model(self, model):
+        cache = SQLiteEmbeddingCache(":memory:")
+        BatchedEncoder(model, "m1", cache=cache).embed_documents(["a"])
+        BatchedEncoder(model, "m2", cache=cache).embed_documents(["a"])
+        assert model.embed_documents.call_count == 2
+
+
+def test_create_local_encoder():
+    encoder = create_encoder("local/hashing")
+    assert len(encoder.embed_query("hello")) == 384
+    with pytest.raises(ValueError):
+        create_encoder("unknown/model")
@@ -0,0 +1,87 @@
+"""Tests for the backend-neutral metadata filters."""
+
+import pytest
+
+from .filters import (
+    and_,
+    eq,
+    in_,
+    normalize_filter,
+    or_,
+    range_,
+    to_elasticsearch,
+    to_mongo,
+    to_pinecone,
+    to_predicate,
+)
+
+EXPRESSION = and_(
+    eq("source", "docs"),
+    or_(in_("tenant", ["a", "b"]), range_("version", gte=2, lt=5)),
+)
+
+
+def test_shorthand_expands_to_eq_and_in():
+    assert normalize_filter({"source": "docs", "tenant": ["a", "b"]}) == and_(
+        eq("source", "docs"), in_("tenant", ["a", "b"])
+    )
+    assert normalize_filter({"source": "docs"}) == eq("source", "docs")
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        {},
+        {"field": "source"},
+        {"field": "source", "like": "d%"},
+        {"field": "source", "eq": "docs", "gte": 1},
+        {"field": "tenant", "in": "a"},
+        {"and": []},
+        {"or": [eq("a", 1)], "source": "docs"},
+    ],
+)
+def test_rejects_malformed_filters(expression):
+    with pytest.raises(ValueError):
+        normalize_filter(expression)
+
+
+def test_to_elasticsearch():
+    assert to_elasticsearch(EXPRESSION) == [
+        {"term": {"source": "docs"}},
+        {
+            "bool": {
+                "should": [
+                    {"terms": {"tenant": ["a", "b"]}},
+                    {"range": {"version": {"gte": 2, "lt": 5}}},
+                ],
+                "minimum_should_match": 1,
+            }
+        },
+    ]
+
+
+def test_to_mongo_and_pinecone():
+    expected = {
+        "$and": [
+            {"source": {"$eq": "docs"}},
+            {
+                "$or": [
+                    {"tenant": {"$in": ["a", "b"]}},
+                    {"version": {"$gte": 2, "$lt": 5}},
+                ]
+            },
+        ]
+    }
+    assert to_mongo(EXPRESSION) == expected
+    assert to_pinecone(EXPRESSION) == expected
+
+
+def test_to_predicate():
+    predicate = to_predicate(EXPRESSION)
+    assert predicate({"source": "docs", "tenant": "a"})
+    assert predicate({"source": "docs", "tenant": "c", "version": 3})
+    assert not predicate({"source": "docs", "tenant": "c", "version": 5})
+    assert not predicate({"source": "blog", "tenant": "a"})
+    # Missing and incomparable values never fall inside a range.
+    assert not predicate({"source": "docs"})
+    assert not predicate({"source": "docs", "version": "3"})
@@ -0,0 +1,72 @@
+"""Tests for hybrid retrieval and reciprocal rank fusion."""
+
+import pytest
+from langchain_core.documents import Document
+
+from .hybrid import HybridRetriever, reciprocal_rank_fusion
+from .lexical_index import LocalLexicalIndex
+
+
+def _doc(doc_id):
+    return Document(page_content=doc_id, metadata={"id": doc_id})
+
+
+class TestReciprocalRankFusion:
+    def test_documents_ranked_by_both_lists_win(self):
+        fused = reciprocal_rank_fusion(
+            [[_doc("a"), _doc("b"), _doc("c")], [_doc("d"), _doc("b"), _doc("a")]]
+        )
+        assert [doc.metadata["id"] for doc in fused][:2] == ["a", "b"]
+        assert len(fused) == 4
+        assert fused[0].metadata["rrf_score"] == pytest.approx(1 / 61 + 1 / 63)
+
+    def test_weights(self):
+        fused = reciprocal_rank_fusion([[_doc("a")], [_doc("b")]], weights=[1, 2])
+        assert fused[0].metadata["id"] == "b"
+
+
+class TestHybridRetriever:
+    def test_overfetches_and_fuses(self, mocker):
+        lexical, vector = mocker.Mock(), mocker.Mock()
+        lexical.get_relevant_documents.return_value = [_doc("a"), _doc("b")]
+        vector.get_relevant_documents.return_value = [_doc("b"), _doc("c")]
+        hybrid = HybridRetriever(lexical, vector, k=2, lexical_k=20, vector_k=30)
+
+        results = hybrid.get_relevant_documents("query")
+
+        assert results[0].metadata["id"] == "b"
+        assert len(results) == 2
+        lexical.get_relevant_documents.assert_called_once_with("query", page_size=20)
+        vector.get_relevant_documents.assert_called_once_with("query", k=30)
+
+    def test_survives_one_failing_side(self, mocker):
+        lexical, vector = mocker.Mock(), mocker.Mock()
+        lexical.get_relevant_documents.side_effect = RuntimeError("down")
+        vector.get_relevant_documents.return_value = [_doc("c")]
+        hybrid = HybridRetriever(lexical, vector)
+        assert [d.metadata["id"] for d in hybrid.get_relevant_documents("q")] == ["c"]
+
+        vector.get_relevant_documents.side_effect = RuntimeError("down")
+        with pytest.raises(RuntimeError):
+            hybrid.get_relevant_documents("q")
+
+
+class TestLocalLexicalIndex:
+    def test_bm25_ranking_and_delete(self):
+        index = LocalLexicalIndex()
+        index.add(
+            ["1", "2", "3"],
+            [
+                Document(page_content="state reducers merge updates"),
+                Document(page_content="reducers reducers everywhere"),
+                Document(page_content="vector stores and embeddings"),
+            ],
+        )
+        hits = index.search("reducers", k=5)
+        assert [doc.page_content for doc, _ in hits][0] == "reducers reducers everywhere"
+        assert len(hits) == 2
+
+        index.delete(["2"])
+        assert [doc.page_content for doc, _ in index.search("reducers")] == [
+            "state reducers merge updates"
+        ]
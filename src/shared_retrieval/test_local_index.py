@@ -0,0 +1,194 @@
+"""Tests for the in-process vector index."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from .local_index import LocalRetriever, LocalVectorIndex
+
+
+def _docs(n):
+    return [Document(page_content=f"doc {i}", metadata={"uuid": str(i)}) for i in range(n)]
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(2000, 32)).astype(np.float32)
+
+
+class TestLocalVectorIndex:
+    def test_exact_search_matches_brute_force(self, corpus):
+        index = LocalVectorIndex()
+        index.add([str(i) for i in range(len(corpus))], corpus, _docs(len(corpus)))
+
+        hits = index.search(corpus[:3], k=5)
+
+        normalized = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized[:3] @ normalized.T), axis=1)[:, :5]
+        for row, query_hits in zip(expected, hits):
+            assert [doc.metadata["uuid"] for doc, _ in query_hits] == [
+                str(i) for i in row
+            ]
+        assert hits[0][0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_upsert_and_delete(self):
+        index = LocalVectorIndex()
+        index.add(["a", "b"], [[1, 0], [0, 1]], _docs(2))
+        index.add(["a"], [[0, 1]], [Document(page_content="new a")])
+        assert len(index) == 2
+        assert index.get("a").page_content == "new a"
+
+        assert index.delete(["a", "missing"]) == 1
+        assert "a" not in index
+        assert index.search([[0, 1]], k=5)[0][0][0].page_content == "doc 1"
+
+    def test_dimension_mismatch(self):
+        index = LocalVectorIndex(dim=2)
+        with pytest.raises(ValueError):
+            index.add(["a"], [[1, 2, 3]], _docs(1))
+
+    def test_ivf_recall(self, corpus):
+        index = LocalVectorIndex()
+        index.add([str(i) for i in range(len(corpus))], corpus, _docs(len(corpus)))
+        exact = index.search(corpus[:20], k=10)
+
+        index.build_ivf(nlist=16, nprobe=6)
+        approximate = index.search(corpus[:20], k=10)
+
+        recall = np.mean(
+            [
+                len({d.page_content for d, _ in a} & {d.page_content for d, _ in e}) / 10
+                for a, e in zip(approximate, exact)
+            ]
+        )
+        assert recall >= 0.8
+        # Rows added after training are assigned to their nearest list.
+        index.add(["new"], corpus[:1] * 2, [Document(page_content="new")])
+        assert "new" in {d.page_content for d, _ in index.search(corpus[:1], k=2)[0]}
+
+    def test_filtered_search(self, corpus, tmp_path):
+        index = LocalVectorIndex()
+        documents = [
+            Document(page_content=f"doc {i}", metadata={"tenant": i % 4, "n": i})
+            for i in range(len(corpus))
+        ]
+        index.add([str(i) for i in range(len(corpus))], corpus, documents)
+        only_one = {"field": "tenant", "eq": 1}
+
+        exact = index.search(corpus[:5], k=10, filter=only_one)
+        assert all(d.metadata["tenant"] == 1 for hits in exact for d, _ in hits)
+        assert all(len(hits) == 10 for hits in exact)
+        # Fewer matches than k come back without padding.
+        rare = {"field": "n", "lt": 3}
+        assert len(index.search(corpus[:1], k=10, filter=rare)[0]) == 3
+
+        # Probing every list must find the same rows as the exact scan.
+        index.build_ivf(nlist=16, nprobe=16)
+        ivf = index.search(corpus[:5], k=10, filter=only_one)
+        assert [[d.page_content for d, _ in hits] for hits in ivf] == [
+            [d.page_content for d, _ in hits] for hits in exact
+        ]
+        index.quantize("int8", str(tmp_path / "vectors.f32"))
+        quantized = index.search(corpus[:5], k=10, filter=only_one)
+        assert all(d.metadata["tenant"] == 1 for hits in quantized for d, _ in hits)
+
+        # Writes invalidate the cached row mask.
+        index.delete([d.page_content[4:] for d, _ in exact[0]])
+        after = index.search(corpus[:1], k=10, filter=only_one)[0]
+        assert not {d.page_content for d, _ in after} & {
+            d.page_content for d, _ in exact[0]
+        }
+
+
+class TestLocalRetriever:
+    def test_retrieves_with_scores(self, mocker):
+        embeddings = mocker.Mock()
+        embeddings.embed_query.side_effect = lambda query: (
+            [0.0, 1.0] if query == "q2" else [1.0, 0.0]
+        )
+        index = LocalVectorIndex()
+        index.add(["a", "b"], [[1, 0], [0, 1]], _docs(2))
+        retriever = LocalRetriever(embeddings, index=index, k=1)
+
+        results = retriever.get_relevant_documents("query")
+        assert results[0].page_content == "doc 0"
+        assert results[0].metadata["score"] == pytest.approx(1.0)
+
+        batch = retriever.get_relevant_documents_batch(["q1", "q2"])
+        assert [doc.page_content for doc in batch] == ["doc 0", "doc 1"]
+        embeddings.embed_documents.assert_not_called()
+
+
+class TestQuantizedIndex:
+    @pytest.fixture
+    def index(self, corpus):
+        index = LocalVectorIndex()
+        index.add([str(i) for i in range(len(corpus))], corpus, _docs(len(corpus)))
+        return index
+
+    @staticmethod
+    def _recall(index, queries, exact):
+        found = index.search(queries, k=10)
+        return np.mean(
+            [
+                len({d.page_content for d, _ in f} & {d.page_content for d, _ in e})
+                / 10
+                for f, e in zip(found, exact)
+            ]
+        )
+
+    def test_int8_moves_vectors_to_disk(self, index, corpus, tmp_path):
+        exact = index.search(corpus[:20], k=10)
+        full = index.nbytes
+
+        index.quantize("int8", path=str(tmp_path / "vectors.f32"))
+
+        assert index.is_quantized
+        assert index.nbytes < full / 3.9
+        assert self._recall(index, corpus[:20], exact) >= 0.99
+        # Rescored scores are exact cosine similarities.
+        assert index.search(corpus[:1], k=1)[0][0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_pq_recall_with_tuned_rescore(self, index, corpus):
+        exact = index.search(corpus[:20], k=10)
+
+        index.quantize("pq", m=8)
+        rescore, recall = index.tune_rescore(corpus[:20], k=10, tolerance=0.02)
+
+        assert index.rescore == rescore
+        assert recall >= 0.98
+        assert self._recall(index, corpus[:20], exact) >= 0.98
+
+    def test_upsert_and_delete_after_quantizing(self, index, corpus, tmp_path):
+        index.quantize("int8", path=str(tmp_path / "vectors.f32"))
+        extra = np.random.default_rng(1).normal(size=(2000, 32)).astype(np.float32)
+
+        index.add([f"x{i}" for i in range(len(extra))], extra, _docs(len(extra)))
+        index.delete(["0", "1"])
+
+        assert len(index) == 3998
+        hits = index.search(extra[:1], k=1)[0]
+        assert hits[0][0].page_content == "doc 0"
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert "0" not in {
+            d.metadata["uuid"] for d, _ in index.search(corpus[:1], k=5)[0]
+        }
+
+    def test_quantized_ivf(self, index, corpus):
+        exact = index.search(corpus[:20], k=10)
+
+        index.build_ivf(nlist=16, nprobe=8)
+        index.quantize("int8")
+
+        assert self._recall(index, corpus[:20], exact) >= 0.8
+
+    def test_drop_quantization(self, index, corpus, tmp_path):
+        exact = index.search(corpus[:5], k=10)
+        index.quantize("pq", path=str(tmp_path / "vectors.f32"), m=8)
+
+        index.drop_quantization()
+
+        assert not index.is_quantized
+        assert not isinstance(index.vectors, np.memmap)
+        assert index.search(corpus[:5], k=10) == exact
@@ -0,0 +1,52 @@
+"""Tests for the vector quantizers."""
+
+import numpy as np
+import pytest
+
+from .quantization import ProductQuantizer, ScalarQuantizer, create_quantizer
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(1000, 32)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize(
+    "quantizer, max_error",
+    [(ScalarQuantizer(), 0.01), (ProductQuantizer(m=8, iterations=10), 0.2)],
+)
+def test_encode_decode_and_asymmetric_scores(vectors, quantizer, max_error):
+    quantizer.train(vectors)
+    codes = quantizer.encode(vectors)
+
+    assert codes.dtype == np.uint8
+    assert codes.shape == (len(vectors), quantizer.code_size)
+    decoded = quantizer.decode(codes)
+    assert np.abs(decoded - vectors).mean() < max_error
+    np.testing.assert_allclose(
+        quantizer.score(vectors[:3], codes), vectors[:3] @ decoded.T, atol=1e-4
+    )
+
+
+def test_scalar_quantizer_clips_out_of_range_values(vectors):
+    quantizer = ScalarQuantizer()
+    quantizer.train(vectors)
+
+    codes = quantizer.encode(np.full((1, 32), 10.0, dtype=np.float32))
+
+    assert (codes == 255).all()
+
+
+def test_product_quantizer_requires_divisible_dimension(vectors):
+    with pytest.raises(ValueError):
+        ProductQuantizer(m=5).train(vectors)
+
+
+def test_create_quantizer():
+    assert isinstance(create_quantizer("int8", 384), ScalarQuantizer)
+    assert create_quantizer("pq", 384).m == 96
+    assert create_quantizer("pq", 102).m == 17
+    with pytest.raises(ValueError):
+        create_quantizer("fp4", 384)
@@ -0,0 +1,43 @@
+"""Tests for the retriever registry."""
+
+import json
+
+import pytest
+
+from . import registry
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.clear_registry()
+    yield
+    registry.clear_registry()
+
+
+class TestRegistry:
+    def test_same_config_shares_instance(self):
+        config = {"type": "elastic-local", "index_name": "registry-test"}
+        assert registry.get_retriever(config) is registry.get_retriever(dict(config))
+        assert registry.get_retriever(config) is not registry.get_retriever(
+            {**config, "k": 8}
+        )
+
+    def test_key_tracks_environment_without_leaking_secrets(self, monkeypatch):
+        monkeypatch.setenv("ELASTICSEARCH_API_KEY", "secret-1")
+        first = registry.registry_key({"type": "elasticsearch"})
+        monkeypatch.setenv("ELASTICSEARCH_API_KEY", "secret-2")
+        second = registry.registry_key({"type": "elasticsearch"})
+        assert first != second
+        assert "secret" not in first
+
+    def test_warmup_probes_and_tolerates_failures(self, monkeypatch):
+        config = {"type": "elastic-local", "index_name": "registry-warmup"}
+        monkeypatch.setenv(
+            "RETRIEVER_WARMUP", json.dumps([config, {"type": "unknown"}])
+        )
+        warmed = registry.warmup_from_env()
+        assert warmed == [registry.registry_key(config)]
+
+    def test_warmup_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("RETRIEVER_WARMUP", raising=False)
+        assert registry.warmup_from_env() == []
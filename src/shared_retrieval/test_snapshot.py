@@ -0,0 +1,188 @@
+"""Tests for memory-mapped local index snapshots."""
+
+import os
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from . import registry
+from .lexical_index import LocalLexicalIndex
+from .local_index import LocalVectorIndex
+from .snapshot import (
+    load_snapshot,
+    open_snapshot,
+    remove_old_versions,
+    write_snapshot,
+)
+
+WORDS = ["graph", "state", "node", "edge", "index", "vector", "query", "token"]
+
+
+class FixedEmbeddings:
+    def __init__(self, vector):
+        self.vector = vector
+
+    def embed_query(self, text):
+        return self.vector
+
+    def embed_documents(self, texts):
+        return [self.vector for _ in texts]
+
+
+def _indexes(n=300, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"doc-{i}" for i in range(n)]
+    documents = [
+        Document(
+            page_content=" ".join(rng.choice(WORDS, size=12)),
+            metadata={"uuid": doc_id, "rank": i, "tags": ["a", "ü"]},
+        )
+        for i, doc_id in enumerate(ids)
+    ]
+    index = LocalVectorIndex()
+    index.add(ids, vectors, documents)
+    lexical = LocalLexicalIndex()
+    lexical.add(ids, documents)
+    # Only in the lexical index.
+    lexical.add(["extra"], [Document(page_content="rare token", metadata={})])
+    return index, lexical, vectors
+
+
+def test_round_trip(tmp_path):
+    index, lexical, vectors = _indexes()
+    path = str(tmp_path / "snapshot")
+
+    write_snapshot(path, index, lexical, name="docs")
+    vector_snapshot, lexical_snapshot, name = open_snapshot(path)
+
+    assert name == "docs"
+    assert os.path.islink(path)
+    assert len(vector_snapshot) == 300
+    assert len(lexical_snapshot) == 301
+    assert "doc-7" in vector_snapshot and "extra" not in vector_snapshot
+    assert vector_snapshot.get("doc-7") == index.get("doc-7")
+    for expected, found in zip(
+        index.search(vectors[:5], k=5), vector_snapshot.search(vectors[:5], k=5)
+    ):
+        assert [d for d, _ in found] == [d for d, _ in expected]
+        assert [s for _, s in found] == pytest.approx([s for _, s in expected])
+    for query in ("graph edge", "rare", "token vector query", "missing"):
+        expected = lexical.search(query, k=5)
+        found = lexical_snapshot.search(query, k=5)
+        assert [s for _, s in found] == pytest.approx([s for _, s in expected])
+    assert lexical_snapshot.search("rare", k=1)[0][0].page_content == "rare token"
+
+
+def test_preserves_ivf_lists(tmp_path):
+    index, _, vectors = _indexes()
+    index.build_ivf(nlist=8, nprobe=2)
+    path = str(tmp_path / "snapshot")
+
+    write_snapshot(path, index)
+    snapshot, lexical_snapshot, _ = open_snapshot(path)
+
+    assert lexical_snapshot is None
+    assert snapshot.is_approximate and snapshot.nprobe == 2
+    assert snapshot.search(vectors[:5], k=5) == index.search(vectors[:5], k=5)
+
+
+def test_snapshot_is_read_only(tmp_path):
+    index, lexical, _ = _indexes(n=10)
+    path = str(tmp_path / "snapshot")
+    write_snapshot(path, index, lexical)
+    snapshot, lexical_snapshot, _ = open_snapshot(path)
+
+    with pytest.raises(ValueError):
+        snapshot.add(["x"], [[0.0] * 16], [Document(page_content="x")])
+    with pytest.raises(ValueError):
+        lexical_snapshot.delete(["doc-1"])
+
+
+def test_republish_swaps_versions(tmp_path):
+    path = str(tmp_path / "snapshot")
+    first, _, vectors = _indexes(n=50)
+    version = write_snapshot(path, first)
+    old, _, _ = open_snapshot(path)
+
+    second, _, _ = _indexes(n=80, seed=1)
+    write_snapshot(path, second, keep=1)
+
+    assert not os.path.exists(version)
+    assert len(open_snapshot(path)[0]) == 80
+    # A process that mapped the old version keeps serving it.
+    assert old.search(vectors[:1], k=1)[0][0][0].metadata["uuid"] == "doc-0"
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["snapshot", os.path.basename(os.path.realpath(path))]
+    )
+
+
+def test_keeps_recent_versions_for_readers_mid_swap(tmp_path):
+    path = str(tmp_path / "snapshot")
+    versions = [
+        write_snapshot(path, _indexes(n=10 + i, seed=i)[0], keep=2) for i in range(4)
+    ]
+
+    assert [os.path.exists(v) for v in versions] == [False, False, True, True]
+    # A reader that resolved the link before the last swap can still open it.
+    assert len(open_snapshot(versions[2])[0]) == 12
+    assert remove_old_versions(path, keep=1) == [versions[2]]
+    assert os.path.realpath(path) == versions[3]
+
+
+def test_open_retries_when_the_version_is_removed(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot")
+    stale = write_snapshot(path, _indexes(n=10)[0])
+    write_snapshot(path, _indexes(n=20, seed=1)[0], keep=1)
+    resolved = iter([stale])
+    realpath = os.path.realpath
+    # The first resolution races with the swap and finds the removed version.
+    monkeypatch.setattr(
+        os.path, "realpath", lambda p: next(resolved, None) or realpath(p)
+    )
+
+    assert len(open_snapshot(path)[0]) == 20
+
+
+def test_refuses_to_replace_a_directory(tmp_path):
+    index, _, _ = _indexes(n=10)
+    (tmp_path / "snapshot").mkdir()
+
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / "snapshot"), index)
+
+
+def test_warmup_serves_from_snapshot(tmp_path, monkeypatch):
+    index, lexical, vectors = _indexes()
+    path = str(tmp_path / "snapshot")
+    write_snapshot(path, index, lexical, name="snapshot-test")
+    monkeypatch.setenv("LOCAL_INDEX_SNAPSHOT", path)
+    monkeypatch.delenv("RETRIEVER_WARMUP", raising=False)
+    registry.clear_registry()
+
+    registry.warmup_from_env()
+    vector = registry.get_retriever(
+        {
+            "type": "elastic-local",
+            "index_name": "snapshot-test",
+            "embeddings": FixedEmbeddings(vectors[3].tolist()),
+        }
+    )
+    lexical_retriever = registry.get_retriever(
+        {"type": "elastic-local-lexical", "index_name": "snapshot-test"}
+    )
+
+    assert vector.get_relevant_documents("q", k=1)[0].metadata["uuid"] == "doc-3"
+    assert lexical_retriever.get_relevant_documents("rare")[0].page_content == (
+        "rare token"
+    )
+    registry.clear_registry()
+
+
+def test_load_snapshot_registers_under_written_name(tmp_path):
+    index, _, _ = _indexes(n=10)
+    path = str(tmp_path / "snapshot")
+    write_snapshot(path, index, name="named")
+
+    assert load_snapshot(path) == "named"
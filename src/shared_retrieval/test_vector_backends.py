@@ -0,0 +1,147 @@
+"""Tests for the MongoDB and Pinecone vector retrievers against local stand-ins."""
+
+import pytest
+
+from .encoders import HashingEncoder
+from .mongodb_retriever import MongoRetriever
+from .pinecone_retriever import PineconeRetriever
+from .standins import LocalMongoCollection, LocalPineconeIndex
+
+TEXTS = [
+    "reducers merge state updates in LangGraph",
+    "pinecone namespaces isolate tenants",
+    "mongodb atlas vector search uses numCandidates",
+]
+
+
+@pytest.fixture
+def encoder():
+    return HashingEncoder(dim=64)
+
+
+class QueryOnlyEncoder(HashingEncoder):
+    def embed_documents(self, texts):
+        raise AssertionError("queries must be embedded with embed_query")
+
+
+class TestMongoRetriever:
+    @pytest.fixture
+    def collection(self, encoder):
+        collection = LocalMongoCollection()
+        collection.insert_many(
+            [
+                {
+                    "_id": i,
+                    "content": text,
+                    "title": f"title {i}",
+                    "internal": "not projected",
+                    "embedding": encoder.embed_query(text),
+                }
+                for i, text in enumerate(TEXTS)
+            ]
+        )
+        return collection
+
+    def test_vector_search_with_projection(self, collection, encoder):
+        retriever = MongoRetriever(embeddings=encoder, collection=collection, k=2)
+
+        results = retriever.get_relevant_documents("how do reducers merge state")
+
+        assert results[0].page_content == TEXTS[0]
+        assert results[0].metadata["id"] == "0"
+        assert results[0].metadata["title"] == "title 0"
+        assert "score" in results[0].metadata
+        assert "embedding" not in results[0].metadata
+        assert "internal" not in results[0].metadata
+        assert collection.round_trips == 1
+
+    def test_pipeline_shape(self, collection, encoder):
+        retriever = MongoRetriever(embeddings=encoder, collection=collection, k=3)
+        stage = retriever._build_pipeline([0.0], 3)[0]["$vectorSearch"]
+        assert stage["limit"] == 3
+        assert stage["numCandidates"] == 30
+
+    def test_batch(self, collection):
+        retriever = MongoRetriever(
+            embeddings=QueryOnlyEncoder(dim=64), collection=collection, k=1
+        )
+        results = retriever.get_relevant_documents_batch(
+            ["reducers merge state", "pinecone namespaces"]
+        )
+        assert [doc.metadata["id"] for doc in results] == ["0", "1"]
+
+    def test_filter_runs_in_vector_search(self, collection, encoder):
+        retriever = MongoRetriever(
+            embeddings=encoder,
+            collection=collection,
+            k=2,
+            filter={"field": "title", "in": ["title 1", "title 2"]},
+        )
+
+        stage = retriever._build_pipeline([0.0], 2)[0]["$vectorSearch"]
+        assert stage["filter"] == {"title": {"$in": ["title 1", "title 2"]}}
+        results = retriever.get_relevant_documents("how do reducers merge state")
+        assert sorted(doc.metadata["id"] for doc in results) == ["1", "2"]
+
+    def test_post_filter_uses_match_stage(self, collection, encoder):
+        retriever = MongoRetriever(
+            embeddings=encoder, collection=collection, k=3, prefilter=False
+        )
+
+        pipeline = retriever._build_pipeline([0.0], 3, {"title": "title 0"})
+        assert "filter" not in pipeline[0]["$vectorSearch"]
+        assert pipeline[1] == {"$match": {"title": {"$eq": "title 0"}}}
+        results = retriever.get_relevant_documents(
+            "pinecone namespaces", filter={"title": "title 0"}
+        )
+        assert [doc.metadata["id"] for doc in results] == ["0"]
+
+
+class TestPineconeRetriever:
+    @pytest.fixture
+    def index(self, encoder):
+        index = LocalPineconeIndex()
+        index.upsert(
+            [
+                (str(i), encoder.embed_query(text), {"content": text, "source": "docs"})
+                for i, text in enumerate(TEXTS)
+            ],
+            namespace="tenant-a",
+        )
+        return index
+
+    def test_namespace_scoped_query(self, index, encoder):
+        retriever = PineconeRetriever(
+            embeddings=encoder, index=index, namespace="tenant-a", k=1
+        )
+
+        results = retriever.get_relevant_documents("pinecone namespaces")
+
+        assert results[0].page_content == TEXTS[1]
+        assert results[0].metadata["source"] == "docs"
+        assert results[0].metadata["id"] == "1"
+        assert retriever.get_relevant_documents("pinecone", namespace="other") == []
+
+    def test_batch(self, index):
+        retriever = PineconeRetriever(
+            embeddings=QueryOnlyEncoder(dim=64), index=index, namespace="tenant-a", k=1
+        )
+
+        results = retriever.get_relevant_documents_batch(
+            ["reducers merge state", "pinecone namespaces"]
+        )
+
+        assert [doc.metadata["id"] for doc in results] == ["0", "1"]
+
+    def test_metadata_filter(self, index, encoder):
+        retriever = PineconeRetriever(
+            embeddings=encoder, index=index, namespace="tenant-a", k=1
+        )
+
+        results = retriever.get_relevant_documents(
+            "pinecone namespaces", filter={"field": "content", "eq": TEXTS[2]}
+        )
+
+        assert [doc.metadata["id"] for doc in results] == ["2"]
+        blog = {"source": "blog"}
+        assert retriever.get_relevant_documents("pinecone", filter=blog) == []
@@ -0,0 +1 @@
+"""Document packing, model loading and checkpoint serialization shared by the agents."""
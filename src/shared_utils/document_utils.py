@@ -1,10 +1,236 @@
 # src/shared_utils/document_utils.py
-"""Shared document utility functions."""
-from typing import List
+"""Shared document utility functions.
 
+``pack_context`` fits retrieved documents into a prompt under a token budget:
+duplicate and overlapping chunks are dropped, the rest are ordered by
+relevance with maximal marginal relevance (MMR) so near-identical chunks do
+not crowd out other sources, and whatever does not fit is trimmed from the
+low-value tail. The packed documents are numbered for ``[n]`` citations.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.shared_retrieval.encoders import HashingEncoder
+
+DEFAULT_MAX_TOKENS = 4000
+DEFAULT_MMR_LAMBDA = 0.7
+DEFAULT_OVERLAP_THRESHOLD = 0.8
+
+# A truncated source shorter than this is not worth its citation number.
+MIN_TRUNCATED_TOKENS = 32
+
+SOURCE_SEPARATOR = "\n\n"
+
+# Words and individual punctuation marks, a close proxy for model tokens.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+_SHINGLE_SIZE = 5
+_EMPTY = Document(page_content="")
 
 
 def format_docs(docs: List[Document]) -> str:
     """Format a list of documents into a string."""
-    return "\\n\\n".join(doc.page_content for doc in docs)
+    return SOURCE_SEPARATOR.join(doc.page_content for doc in docs)
+
+
+def format_source(number: int, document: Document) -> str:
+    """Format a document as source ``[number]`` of a prompt's context."""
+    return f"[{number}] {document.page_content}"
+
+
+def format_sources(documents: Sequence[Document]) -> str:
+    """Format documents as the numbered sources ``[n]`` markers refer to."""
+    return SOURCE_SEPARATOR.join(
+        format_source(number, document)
+        for number, document in enumerate(documents, start=1)
+    )
+
+
+@dataclass
+class PackedContext:
+    """Documents packed into a prompt's context by ``pack_context``."""
+
+    text: str
+    """The numbered sources, ready for the prompt."""
+    documents: List[Document] = field(default_factory=list)
+    """The packed documents in source order: ``[n]`` is ``documents[n - 1]``.
+    The last one may be truncated."""
+    tokens: int = 0
+    """Tokens of ``text``, as counted by the packer."""
+    dropped: int = 0
+    """Input documents left out as duplicates or for lack of room."""
+
+
+@cache
+def _tiktoken_encoding(name: str) -> Any:
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def _truncator(encoding: Optional[str]) -> Callable[[str, int], str]:
+    if encoding:
+        tokenizer = _tiktoken_encoding(encoding)
+        return lambda text, limit: tokenizer.decode(tokenizer.encode(text)[:limit])
+
+    def truncate(text: str, limit: int) -> str:
+        spans = [match.span() for match in _TOKEN_RE.finditer(text)]
+        return text if len(spans) <= limit else text[: spans[limit - 1][1]]
+
+    return truncate
+
+
+def token_counter(encoding: Optional[str] = None) -> Callable[[str], int]:
+    """Return a function counting the tokens of a text.
+
+    Args:
+        encoding: ``tiktoken`` encoding name for exact model token counts. By
+            default words and punctuation marks are counted, which needs no
+            extra dependency.
+    """
+    if encoding:
+        tokenizer = _tiktoken_encoding(encoding)
+        return lambda text: len(tokenizer.encode(text))
+    return lambda text: sum(1 for _ in _TOKEN_RE.finditer(text))
+
+
+def _shingles(text: str) -> frozenset:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= _SHINGLE_SIZE:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(
+        " ".join(words[i : i + _SHINGLE_SIZE])
+        for i in range(len(words) - _SHINGLE_SIZE + 1)
+    )
+
+
+def _drop_overlapping(
+    order: Sequence[int], shingles: List[frozenset], threshold: float
+) -> List[int]:
+    # Walk from most to least relevant, so the copy that survives is the one
+    # ranked highest.
+    kept: List[int] = []
+    for i in order:
+        if not shingles[i]:
+            continue
+        covered = max(
+            (len(shingles[i] & shingles[j]) / len(shingles[i]) for j in kept),
+            default=0.0,
+        )
+        if covered < threshold:
+            kept.append(i)
+    return kept
+
+
+def _mmr_order(
+    candidates: List[int],
+    relevance: np.ndarray,
+    vectors: np.ndarray,
+    mmr_lambda: float,
+) -> List[int]:
+    order: List[int] = []
+    redundancy = np.full(len(relevance), -np.inf)
+    remaining = list(candidates)
+    while remaining:
+        scores = [
+            mmr_lambda * relevance[i] - (1 - mmr_lambda) * max(redundancy[i], 0.0)
+            for i in remaining
+        ]
+        best = remaining.pop(int(np.argmax(scores)))
+        order.append(best)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return order
+
+
+def pack_context(
+    documents: Sequence[Document],
+    query: Optional[str] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    embeddings: Optional[Embeddings] = None,
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+    overlap_threshold: float = DEFAULT_OVERLAP_THRESHOLD,
+    encoding: Optional[str] = None,
+) -> PackedContext:
+    """Pack documents into numbered sources that fit a token budget.
+
+    Args:
+        documents: Retrieved documents, most relevant first if there is no
+            ``query``.
+        query: The question the context is for. Relevance is the cosine
+            similarity of a document to it; without a query the input order
+            is the relevance order.
+        max_tokens: Token budget of the packed text.
+        embeddings: Encoder for relevance and diversity. Defaults to the
+            offline ``HashingEncoder``, which adds no model calls.
+        mmr_lambda: Trade-off between relevance (1.0) and diversity (0.0).
+        overlap_threshold: Share of a document's word shingles that may
+            already appear in a more relevant document before it is dropped
+            as a duplicate or overlapping chunk.
+        encoding: ``tiktoken`` encoding name for exact token counts; see
+            ``token_counter``.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive.")
+    if not documents:
+        return PackedContext(text="")
+    embeddings = embeddings or HashingEncoder()
+    count_tokens = token_counter(encoding)
+    truncate = _truncator(encoding)
+
+    vectors = np.asarray(
+        embeddings.embed_documents([doc.page_content for doc in documents]),
+        dtype=np.float32,
+    )
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    if query:
+        query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+        relevance = vectors @ (query_vector / max(np.linalg.norm(query_vector), 1e-12))
+    else:
+        relevance = 1.0 - np.arange(len(documents)) / len(documents)
+
+    by_relevance = sorted(range(len(documents)), key=lambda i: -relevance[i])
+    shingles = [_shingles(doc.page_content) for doc in documents]
+    candidates = _drop_overlapping(by_relevance, shingles, overlap_threshold)
+
+    packed: List[Document] = []
+    blocks: List[str] = []
+    used = 0
+    for i in _mmr_order(candidates, relevance, vectors, mmr_lambda):
+        number = len(packed) + 1
+        document = documents[i]
+        separator = count_tokens(SOURCE_SEPARATOR) if packed else 0
+        block = format_source(number, document)
+        tokens = separator + count_tokens(block)
+        truncated = used + tokens > max_tokens
+        if truncated:
+            # Trim the tail: fill what is left with the start of this source
+            # and drop everything ranked after it.
+            room = max_tokens - used - separator
+            room -= count_tokens(format_source(number, _EMPTY))
+            if room < MIN_TRUNCATED_TOKENS:
+                break
+            document = Document(
+                page_content=truncate(document.page_content, room),
+                metadata={**document.metadata, "truncated": True},
+            )
+            block = format_source(number, document)
+            tokens = separator + count_tokens(block)
+        packed.append(document)
+        blocks.append(block)
+        used += tokens
+        if truncated:
+            break
+
+    return PackedContext(
+        text=SOURCE_SEPARATOR.join(blocks),
+        documents=packed,
+        tokens=used,
+        dropped=len(documents) - len(packed),
+    )
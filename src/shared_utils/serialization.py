@@ -0,0 +1,367 @@
+# src/shared_utils/serialization.py
+"""MessagePack checkpoint serializer built on ``msgspec``.
+
+The default ``JsonPlusSerializer`` walks every value in Python to describe
+LangChain objects, which dominates checkpoint time once a state carries long
+message and document lists. ``MsgspecSerializer`` encodes the common graph
+values with fixed ``msgspec`` schemas instead:
+
+* ``Document``: ``[page_content, metadata, id]``.
+* ``BaseMessage`` subclasses: the class name and the fields that differ from
+  their defaults.
+* Dataclass states: the import path of the class and its fields.
+
+Containers, strings and numbers are handled natively by ``msgspec``. List
+subclasses and other sequences such as ``DocumentIndex`` and ``DocumentRefs``
+are stored as plain lists; their reducers rebuild them on the next update.
+Tuples, sets, dates and times, UUIDs and decimals, which ``msgspec`` would
+load back as lists or strings, are written as typed extensions. Values
+containing enums, nested dataclasses or a type ``msgspec`` cannot encode at
+all, such as ``Send`` or ``Interrupt``, are written by ``JsonPlusSerializer``
+as a whole. Checkpoints written by it are still readable, so the serializer
+can be swapped into an existing checkpointer:
+
+    checkpointer = InMemorySaver(serde=MsgspecSerializer())
+"""
+
+import dataclasses
+import importlib
+import logging
+import sys
+from collections import abc
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type
+from uuid import UUID
+
+import msgspec
+from langchain_core.documents import Document
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ChatMessage,
+    ChatMessageChunk,
+    FunctionMessage,
+    FunctionMessageChunk,
+    HumanMessage,
+    HumanMessageChunk,
+    RemoveMessage,
+    SystemMessage,
+    SystemMessageChunk,
+    ToolMessage,
+    ToolMessageChunk,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pydantic_core import PydanticUndefined
+
+logger = logging.getLogger(__name__)
+
+TYPE_TAG = "msgspec"
+
+_EXT_DOCUMENT = 1
+_EXT_MESSAGE = 2
+_EXT_DATACLASS = 3
+_EXT_TUPLE = 4
+_EXT_SET = 5
+_EXT_FROZENSET = 6
+_EXT_DATETIME = 7
+_EXT_DATE = 8
+_EXT_TIME = 9
+_EXT_TIMEDELTA = 10
+_EXT_UUID = 11
+_EXT_DECIMAL = 12
+
+_MESSAGE_CLASSES: Dict[str, Type[BaseMessage]] = {
+    cls.__name__: cls
+    for cls in (
+        AIMessage,
+        AIMessageChunk,
+        ChatMessage,
+        ChatMessageChunk,
+        FunctionMessage,
+        FunctionMessageChunk,
+        HumanMessage,
+        HumanMessageChunk,
+        RemoveMessage,
+        SystemMessage,
+        SystemMessageChunk,
+        ToolMessage,
+        ToolMessageChunk,
+    )
+}
+
+
+class _DocumentRecord(msgspec.Struct, array_like=True):
+    page_content: str
+    metadata: Dict[str, Any]
+    id: Optional[str] = None
+
+
+class _MessageRecord(msgspec.Struct, array_like=True):
+    cls: str
+    fields: Dict[str, Any]
+
+
+class _DataclassRecord(msgspec.Struct, array_like=True):
+    path: str
+    fields: Dict[str, Any]
+
+
+class _Unsupported(Exception):
+    """Raised while encoding a value ``msgspec`` has no schema for."""
+
+
+def _message_defaults(cls: Type[BaseMessage]) -> Dict[str, Any]:
+    defaults = {}
+    for name, info in cls.model_fields.items():
+        if info.default_factory is not None:
+            defaults[name] = info.default_factory()
+        elif info.default is not PydanticUndefined:
+            defaults[name] = info.default
+    return defaults
+
+
+_MESSAGE_DEFAULTS = {
+    name: _message_defaults(cls) for name, cls in _MESSAGE_CLASSES.items()
+}
+_MISSING = object()
+
+
+def _is_dataclass_instance(obj: Any) -> bool:
+    return dataclasses.is_dataclass(obj) and not isinstance(obj, type)
+
+
+# ``msgspec`` encodes these natively but would load them back as lists,
+# strings or plain values, so they are written as typed extensions instead.
+_CONTAINER_EXTS = {tuple: _EXT_TUPLE, set: _EXT_SET, frozenset: _EXT_FROZENSET}
+_SCALAR_EXTS: Dict[type, Tuple[int, Callable[[Any], Any]]] = {
+    date: (_EXT_DATE, date.isoformat),
+    timedelta: (_EXT_TIMEDELTA, lambda d: [d.days, d.seconds, d.microseconds]),
+    UUID: (_EXT_UUID, lambda u: u.bytes),
+    Decimal: (_EXT_DECIMAL, str),
+}
+_EXT_LOADERS: Dict[int, Callable[[Any], Any]] = {
+    _EXT_TUPLE: tuple,
+    _EXT_SET: set,
+    _EXT_FROZENSET: frozenset,
+    _EXT_DATETIME: datetime.fromisoformat,
+    _EXT_DATE: date.fromisoformat,
+    _EXT_TIME: time.fromisoformat,
+    _EXT_TIMEDELTA: lambda parts: timedelta(*parts),
+    _EXT_UUID: lambda raw: UUID(bytes=raw),
+    _EXT_DECIMAL: Decimal,
+}
+# Subclasses of the types above, enums, and times in zones other than UTC,
+# whose ``tzinfo`` an ISO string cannot carry, are left to the fallback.
+_LOSSY_TYPES = (
+    tuple,
+    set,
+    frozenset,
+    bytearray,
+    memoryview,
+    date,
+    time,
+    timedelta,
+    UUID,
+    Decimal,
+    Enum,
+)
+_PLAIN_TYPES = (str, int, float, bool, bytes, type(None))
+_KEY_TYPES = (str, int)
+
+
+class MsgspecSerializer(SerializerProtocol):
+    """Checkpoint serializer that writes graph values as typed MessagePack.
+
+    Implements ``dumps_typed`` and ``loads_typed``, so it can be passed as
+    ``serde`` to any LangGraph checkpointer.
+    """
+
+    def __init__(
+        self,
+        allowed_modules: Optional[Sequence[str]] = None,
+        fallback: Optional[SerializerProtocol] = None,
+    ):
+        """Initialize the serializer.
+
+        Args:
+            allowed_modules: Module prefixes whose dataclasses may be imported
+                when a checkpoint is loaded. By default only dataclasses from
+                modules that are already imported are rebuilt, so loading a
+                checkpoint never imports code.
+            fallback: Serializer for values outside the schemas and for
+                checkpoints written by another serializer; defaults to
+                ``JsonPlusSerializer``.
+        """
+        self.allowed_modules = tuple(allowed_modules or ())
+        self.fallback = fallback or JsonPlusSerializer()
+        self._encoder = msgspec.msgpack.Encoder(enc_hook=self._enc_hook)
+        self._decoder = msgspec.msgpack.Decoder(ext_hook=self._ext_hook)
+        self._record_decoders: Dict[int, Callable[[Any], Any]] = {
+            code: msgspec.msgpack.Decoder(record, ext_hook=self._ext_hook).decode
+            for code, record in (
+                (_EXT_DOCUMENT, _DocumentRecord),
+                (_EXT_MESSAGE, _MessageRecord),
+                (_EXT_DATACLASS, _DataclassRecord),
+            )
+        }
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        """Serialize ``obj`` and return it with its type tag."""
+        if obj is not None and not isinstance(obj, (bytes, bytearray)):
+            try:
+                return TYPE_TAG, self._encode(obj)
+            except (_Unsupported, TypeError, OverflowError):
+                pass
+        return self.fallback.dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        """Deserialize a ``(type tag, payload)`` pair."""
+        type_, payload = data
+        if type_ == TYPE_TAG:
+            return self._decoder.decode(payload)
+        return self.fallback.loads_typed(data)
+
+    def _encode(self, obj: Any) -> bytes:
+        if not _is_dataclass_instance(obj):
+            return self._encoder.encode(self._prepare(obj))
+        fields = self._prepare(
+            {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+        )
+        cls = type(obj)
+        record = _DataclassRecord(f"{cls.__module__}:{cls.__qualname__}", fields)
+        ext = msgspec.msgpack.Ext(_EXT_DATACLASS, self._encoder.encode(record))
+        return self._encoder.encode(ext)
+
+    def _prepare(self, obj: Any) -> Any:
+        """Return ``obj`` with the values ``msgspec`` would change wrapped.
+
+        ``msgspec`` encodes tuples, sets, dates, UUIDs and decimals natively
+        but loads them back as lists or strings, so they are replaced by typed
+        extensions. Enums, nested dataclasses and subclasses of those types
+        raise ``_Unsupported`` so the whole value is written by the fallback.
+        Containers are only copied when something inside them changes.
+        Documents and messages are prepared by ``_enc_hook``.
+        """
+        cls = type(obj)
+        if cls in _PLAIN_TYPES or isinstance(obj, (Document, BaseMessage)):
+            return obj
+        if cls in _CONTAINER_EXTS:
+            items = self._prepare_items(list(obj) if cls is not tuple else obj)
+            return self._ext(_CONTAINER_EXTS[cls], items)
+        if cls in _SCALAR_EXTS:
+            code, dump = _SCALAR_EXTS[cls]
+            return self._ext(code, dump(obj))
+        if cls in (datetime, time) and obj.tzinfo in (None, UTC):
+            return self._ext(
+                _EXT_DATETIME if cls is datetime else _EXT_TIME, obj.isoformat()
+            )
+        if isinstance(obj, dict):
+            prepared = None
+            for key, value in obj.items():
+                if type(key) not in _KEY_TYPES:
+                    raise _Unsupported(type(key).__name__)
+                new = self._prepare(value)
+                if new is not value and prepared is None:
+                    prepared = dict(obj)
+                if prepared is not None:
+                    prepared[key] = new
+            return obj if prepared is None else prepared
+        if isinstance(obj, _LOSSY_TYPES) or _is_dataclass_instance(obj):
+            raise _Unsupported(cls.__name__)
+        if isinstance(obj, abc.Sequence) and not isinstance(obj, (str, bytes)):
+            return self._prepare_items(obj)
+        return obj
+
+    def _ext(self, code: int, payload: Any) -> msgspec.msgpack.Ext:
+        return msgspec.msgpack.Ext(code, self._encoder.encode(payload))
+
+    def _prepare_items(self, items: Sequence[Any]) -> Any:
+        prepared = None
+        for index, item in enumerate(items):
+            new = self._prepare(item)
+            if new is not item and prepared is None:
+                prepared = list(items[:index])
+            if prepared is not None:
+                prepared.append(new)
+        if prepared is not None:
+            return prepared
+        return items if type(items) is list else list(items)
+
+    def _enc_hook(self, obj: Any) -> Any:
+        if isinstance(obj, Document):
+            metadata = self._prepare(obj.metadata)
+            record: Any = _DocumentRecord(obj.page_content, metadata, obj.id)
+            return msgspec.msgpack.Ext(_EXT_DOCUMENT, self._encoder.encode(record))
+        if isinstance(obj, BaseMessage):
+            name = type(obj).__name__
+            defaults = _MESSAGE_DEFAULTS.get(name)
+            if defaults is None or _MESSAGE_CLASSES[name] is not type(obj):
+                raise _Unsupported(name)
+            # Only non-default fields are written; the class fills the rest
+            # back in on load.
+            fields = {
+                key: value
+                for key, value in obj.__dict__.items()
+                if defaults.get(key, _MISSING) != value
+            }
+            record = _MessageRecord(name, self._prepare(fields))
+            return msgspec.msgpack.Ext(_EXT_MESSAGE, self._encoder.encode(record))
+        if isinstance(obj, abc.Sequence) and not isinstance(obj, (str, bytes)):
+            return list(obj)
+        raise _Unsupported(type(obj).__name__)
+
+    def _ext_hook(self, code: int, data: memoryview) -> Any:
+        load = _EXT_LOADERS.get(code)
+        if load is not None:
+            return load(self._decoder.decode(data))
+        decode = self._record_decoders.get(code)
+        if decode is None:
+            raise ValueError(f"Unknown msgspec extension code: {code}")
+        record = decode(data)
+        if code == _EXT_DOCUMENT:
+            return Document.model_construct(
+                page_content=record.page_content, metadata=record.metadata, id=record.id
+            )
+        if code == _EXT_MESSAGE:
+            cls = _MESSAGE_CLASSES.get(record.cls)
+            if cls is None:
+                raise ValueError(f"Unknown message class: {record.cls}")
+            # The fields come from a validated message, so skip validation.
+            # Passing every field also keeps pydantic from resolving the
+            # defaults itself, which dominates decode time.
+            fields = {
+                key: value.copy() if isinstance(value, (list, dict)) else value
+                for key, value in _MESSAGE_DEFAULTS[record.cls].items()
+                if key not in record.fields
+            }
+            fields.update(record.fields)
+            return cls.model_construct(**fields)
+        return self._load_dataclass(record)
+
+    def _load_dataclass(self, record: _DataclassRecord) -> Any:
+        module_name, _, qualname = record.path.partition(":")
+        module = sys.modules.get(module_name)
+        if (
+            module is None
+            and self.allowed_modules
+            and module_name.startswith(self.allowed_modules)
+        ):
+            module = importlib.import_module(module_name)
+        cls: Any = module
+        for part in qualname.split("."):
+            cls = getattr(cls, part, None)
+        if not (isinstance(cls, type) and dataclasses.is_dataclass(cls)):
+            logger.warning(
+                "Cannot rebuild %s; loading its fields as a dict", record.path
+            )
+            return record.fields
+        # Restore like pickle does: set the stored fields without running
+        # __init__ or __post_init__.
+        instance = cls.__new__(cls)
+        for key, value in record.fields.items():
+            object.__setattr__(instance, key, value)
+        return instance
@@ -0,0 +1,103 @@
+"""Tests for the token-budgeted context packer."""
+
+import pytest
+from langchain_core.documents import Document
+
+from .document_utils import (
+    format_docs,
+    format_sources,
+    pack_context,
+    token_counter,
+)
+
+count_tokens = token_counter()
+
+
+def _doc(text, uuid):
+    return Document(page_content=text, metadata={"uuid": uuid})
+
+
+RELEVANT = _doc(
+    "Reducers merge the updates of parallel nodes into the graph state.", "r"
+)
+OTHER = _doc("Checkpointers persist the graph state between runs of a thread.", "o")
+UNRELATED = _doc("The weather in Paris is mild in spring and rainy in autumn.", "u")
+
+
+def test_format_docs_separates_with_blank_lines():
+    assert format_docs([_doc("a", "1"), _doc("b", "2")]) == "a\n\nb"
+
+
+def test_numbers_sources_in_relevance_order():
+    packed = pack_context([UNRELATED, OTHER, RELEVANT], query="how do reducers merge")
+
+    assert packed.documents[0] is RELEVANT
+    assert packed.text == format_sources(packed.documents)
+    assert packed.text.startswith("[1] Reducers merge")
+    assert packed.dropped == 0
+
+
+def test_keeps_input_order_without_a_query():
+    packed = pack_context([UNRELATED, OTHER, RELEVANT])
+
+    assert packed.documents == [UNRELATED, OTHER, RELEVANT]
+
+
+def test_drops_duplicate_and_overlapping_chunks():
+    words = [f"w{i}" for i in range(40)]
+    chunk = _doc(" ".join(words[:30]), "a")
+    overlapping = _doc(" ".join(words[2:30]), "b")
+    neighbour = _doc(" ".join(words[25:]), "c")
+    duplicate = _doc(chunk.page_content, "d")
+
+    packed = pack_context([chunk, duplicate, overlapping, neighbour])
+
+    assert [doc.metadata["uuid"] for doc in packed.documents] == ["a", "c"]
+    assert packed.dropped == 2
+
+
+def test_mmr_prefers_diverse_sources():
+    near_copy = _doc(
+        "Reducers merge the updates of parallel nodes into the state.", "n"
+    )
+    documents = [RELEVANT, near_copy, OTHER]
+
+    by_relevance = pack_context(documents, overlap_threshold=1.1, mmr_lambda=1.0)
+    diverse = pack_context(documents, overlap_threshold=1.1, mmr_lambda=0.5)
+
+    assert [doc.metadata["uuid"] for doc in by_relevance.documents] == ["r", "n", "o"]
+    assert [doc.metadata["uuid"] for doc in diverse.documents] == ["r", "o", "n"]
+
+
+@pytest.mark.parametrize("max_tokens", [20, 50, 120])
+def test_stays_within_the_token_budget(max_tokens):
+    documents = [
+        _doc(" ".join(f"topic{i} word{j}" for j in range(30)), str(i)) for i in range(5)
+    ]
+
+    packed = pack_context(documents, max_tokens=max_tokens)
+
+    assert packed.tokens == count_tokens(packed.text)
+    assert packed.tokens <= max_tokens
+    assert packed.dropped == len(documents) - len(packed.documents)
+
+
+def test_trims_the_tail_source():
+    documents = [
+        _doc(" ".join(f"a{i}" for i in range(60)), "1"),
+        _doc(" ".join(f"b{i}" for i in range(100)), "2"),
+    ]
+
+    packed = pack_context(documents, max_tokens=110)
+
+    first, last = packed.documents
+    assert "truncated" not in first.metadata
+    assert last.metadata == {"uuid": "2", "truncated": True}
+    assert last.page_content.startswith("b0 b1")
+    assert packed.tokens == 110
+
+
+def test_rejects_an_empty_budget():
+    with pytest.raises(ValueError):
+        pack_context([RELEVANT], max_tokens=0)
+    assert pack_context([]).text == ""
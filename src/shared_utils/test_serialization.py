@@ -0,0 +1,248 @@
+"""Tests for the msgspec checkpoint serializer."""
+
+import operator
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Annotated, Any, List
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import END, START, StateGraph, add_messages
+from langgraph.types import Send
+
+from .serialization import TYPE_TAG, MsgspecSerializer
+
+
+@dataclass
+class Span:
+    start: int
+    end: int
+
+
+@dataclass(kw_only=True)
+class ResearchState:
+    topic: str
+    messages: Annotated[List[AnyMessage], add_messages] = field(default_factory=list)
+    documents: List[Document] = field(default_factory=list)
+    loop_step: Annotated[int, operator.add] = field(default=0)
+    info: dict[str, Any] = field(default_factory=dict)
+
+
+def _messages():
+    return [
+        SystemMessage(content="You are helpful."),
+        HumanMessage(content="What is LCEL?", id="h1"),
+        AIMessage(
+            content="",
+            id="a1",
+            tool_calls=[{"name": "search", "args": {"q": "LCEL"}, "id": "call-1"}],
+            usage_metadata={"input_tokens": 5, "output_tokens": 3, "total_tokens": 8},
+        ),
+        ToolMessage(content="LCEL docs", tool_call_id="call-1", status="error"),
+        AIMessage(content=[{"type": "text", "text": "It is a language."}]),
+        AIMessageChunk(content="partial"),
+    ]
+
+
+def _documents():
+    return [
+        Document(page_content="alpha", metadata={"uuid": "u1", "score": 0.5}),
+        Document(page_content="beta", metadata={}, id="doc-2"),
+    ]
+
+
+def _round_trip(serde, value):
+    return serde.loads_typed(serde.dumps_typed(value))
+
+
+def test_round_trips_messages_and_documents():
+    serde = MsgspecSerializer()
+    value = {"messages": _messages(), "documents": _documents(), "n": [1, 2.5, "x"]}
+
+    type_, _ = serde.dumps_typed(value)
+    restored = _round_trip(serde, value)
+
+    assert type_ == TYPE_TAG
+    assert restored == value
+    assert [type(m) for m in restored["messages"]] == [
+        type(m) for m in value["messages"]
+    ]
+    assert restored["messages"][2].tool_calls[0]["args"] == {"q": "LCEL"}
+    assert restored["documents"][1].id == "doc-2"
+
+
+def test_round_trips_dataclass_state():
+    serde = MsgspecSerializer()
+    state = ResearchState(
+        topic="lcel", messages=_messages(), documents=_documents(), loop_step=2
+    )
+
+    type_, _ = serde.dumps_typed(state)
+    restored = _round_trip(serde, state)
+
+    assert type_ == TYPE_TAG
+    assert isinstance(restored, ResearchState)
+    assert restored == state
+
+
+def test_list_subclasses_load_as_lists():
+    class Refs(list):
+        pass
+
+    assert _round_trip(MsgspecSerializer(), Refs(["a", "b"])) == ["a", "b"]
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@pytest.mark.parametrize(
+    ("value", "native"),
+    [
+        ((1, (2, "x")), True),
+        ({1, (2, 3)}, True),
+        (frozenset({"a"}), True),
+        (datetime(2024, 1, 1, 12, 30), True),
+        (datetime(2024, 1, 1, tzinfo=timezone.utc), True),
+        (datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=2))), False),
+        (date(2024, 1, 1), True),
+        (time(8, 15, 1, 20), True),
+        (timedelta(days=1, seconds=5), True),
+        (uuid.UUID(int=7), True),
+        (Decimal("1.10"), True),
+        (Color.RED, False),
+    ],
+    ids=lambda value: type(value).__name__,
+)
+def test_round_trips_types_msgspec_would_change(value, native):
+    serde = MsgspecSerializer()
+
+    for wrapped in (
+        value,
+        {"k": [value]},
+        [Document(page_content="x", metadata={"v": value})],
+        [AIMessage(content="x", additional_kwargs={"v": value})],
+        Span(0, value),
+    ):
+        restored = _round_trip(serde, wrapped)
+        assert restored == wrapped
+        (leaf,) = _leaves(restored)
+        assert type(leaf) is type(value)
+        # Enums and zones an ISO string cannot name are left to the fallback.
+        assert (serde.dumps_typed(wrapped)[0] == TYPE_TAG) == native
+
+
+def test_round_trips_mixed_types_with_the_fallback():
+    serde = MsgspecSerializer()
+    value = {
+        "t": (1, 2),
+        "d": datetime(2024, 1, 1),
+        "u": uuid.UUID(int=1),
+        "s": {1, 2},
+    }
+
+    assert _round_trip(serde, value) == value
+    assert serde.dumps_typed(value)[0] == TYPE_TAG
+
+
+def _leaves(value):
+    if isinstance(value, Span):
+        return [value.end]
+    if isinstance(value, dict):
+        return [leaf for item in value.values() for leaf in _leaves(item)]
+    if isinstance(value, list):
+        return [leaf for item in value for leaf in _leaves(item)]
+    if isinstance(value, Document):
+        return _leaves(value.metadata)
+    if isinstance(value, AIMessage):
+        return _leaves(value.additional_kwargs)
+    return [value]
+
+
+def test_is_smaller_than_default():
+    value = {"messages": _messages() * 20, "documents": _documents() * 20}
+
+    _, ours = MsgspecSerializer().dumps_typed(value)
+    _, default = JsonPlusSerializer().dumps_typed(value)
+
+    assert len(ours) < len(default)
+
+
+def test_falls_back_for_unsupported_values():
+    serde = MsgspecSerializer()
+    aware = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    for value in (
+        Send("node", {"x": 1}),
+        [Span(0, 1)],
+        {"spans": {"first": Span(2, 3)}},
+        None,
+        b"raw",
+    ):
+        assert _round_trip(serde, value) == value
+    assert serde.dumps_typed(Send("node", {}))[0] != TYPE_TAG
+    assert serde.dumps_typed([Span(0, 1)])[0] != TYPE_TAG
+    assert _round_trip(serde, {"at": aware}) == {"at": aware}
+
+
+def test_reads_checkpoints_written_by_default_serializer():
+    value = {"messages": _messages()}
+
+    assert (
+        MsgspecSerializer().loads_typed(JsonPlusSerializer().dumps_typed(value))
+        == value
+    )
+
+
+def test_unknown_dataclass_loads_as_fields():
+    serde = MsgspecSerializer()
+    payload = serde.dumps_typed(Span(1, 2))
+    patched = payload[1].replace(b"test_serialization:Span", b"test_serialization:Gone")
+
+    assert serde.loads_typed((payload[0], patched)) == {"start": 1, "end": 2}
+
+
+def test_checkpointer_resumes_graph_state():
+    def respond(state: ResearchState):
+        return {
+            "messages": [AIMessage(content=f"step {state.loop_step}")],
+            "documents": state.documents
+            + [Document(page_content=state.topic, metadata={"uuid": state.topic})],
+            "loop_step": 1,
+        }
+
+    builder = StateGraph(ResearchState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    builder.add_edge("respond", END)
+    graph = builder.compile(checkpointer=InMemorySaver(serde=MsgspecSerializer()))
+    config = {"configurable": {"thread_id": "t"}}
+
+    graph.invoke({"topic": "a", "messages": [HumanMessage(content="hi")]}, config)
+    result = graph.invoke(
+        {"topic": "b", "messages": [HumanMessage(content="again")]}, config
+    )
+
+    assert [m.content for m in result["messages"]] == [
+        "hi",
+        "step 0",
+        "again",
+        "step 1",
+    ]
+    assert [d.page_content for d in result["documents"]] == ["a", "b"]
+    assert result["loop_step"] == 2
+    snapshot = graph.get_state(config)
+    assert snapshot.values["messages"][1] == result["messages"][1]